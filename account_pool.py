@@ -0,0 +1,175 @@
+"""
+Pool de cuentas: reparto de keywords según la salud de cada cuenta.
+
+Cada cuenta arranca con su cola de trabajo (keywords, o keyword + ventana de
+fechas en el modo por ventanas; round-robin, como antes), pero las colas no
+son fijas:
+
+    - una cuenta que se queda sin trabajo le saca keywords pendientes a la
+      cuenta más atrasada (la que más tardaría en terminar su cola según su
+      ritmo, o la que está en pausa por un 429): work stealing.
+    - una cuenta que falla por auth (401/403/404) deja de tomar trabajo; su
+      cola y la keyword que estaba buscando pasan a la cuenta más sana.
+
+La salud se mide por cuenta: latencia de los pedidos (promedio móvil),
+proporción de 429, fallas de auth y tweets por minuto.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import Optional
+
+_EWMA = 0.3          # peso de la última muestra en la latencia promedio
+_PRIOR_TPM = 60.0    # tweets/min supuestos hasta medir (cuentas nuevas no arrancan en 0)
+
+
+class AccountHealth:
+    """Métricas de una cuenta durante la corrida."""
+
+    def __init__(self):
+        self.requests = 0
+        self.rate_limited = 0
+        self.auth_failures = 0
+        self.latency = None    # segundos, promedio móvil
+        self.tweets = 0
+        self.busy = 0.0        # segundos buscando keywords
+        self.keywords = 0
+
+    def record_request(self, latency: float) -> None:
+        self.requests += 1
+        self.latency = latency if self.latency is None else (1 - _EWMA) * self.latency + _EWMA * latency
+
+    def record_rate_limited(self) -> None:
+        self.requests += 1
+        self.rate_limited += 1
+
+    def record_keyword(self, tweets: int, elapsed: float) -> None:
+        self.keywords += 1
+        self.tweets += tweets
+        self.busy += elapsed
+
+    @property
+    def rate_429(self) -> float:
+        return self.rate_limited / self.requests if self.requests else 0.0
+
+    @property
+    def tweets_per_minute(self) -> float:
+        if self.busy < 1:
+            return _PRIOR_TPM
+        return self.tweets / (self.busy / 60)
+
+    def score(self) -> float:
+        """Más alto = más sana. 0 si la cuenta falló por auth."""
+        if self.auth_failures:
+            return 0.0
+        latency_penalty = 1 + (self.latency or 0)
+        return self.tweets_per_minute * (1 - self.rate_429) / latency_penalty
+
+    def summary(self) -> str:
+        latency = f"{self.latency:.1f}s" if self.latency is not None else "-"
+        return (f"{self.keywords} keywords, {self.tweets} tweets "
+                f"({self.tweets_per_minute:.0f}/min), latencia {latency}, "
+                f"429 {self.rate_429:.0%}" + (", auth ❌" if self.auth_failures else ""))
+
+
+class AccountPool:
+    """
+    Colas de keywords por cuenta con work stealing. Cada cuenta corre un
+    worker que pide trabajo con `take()` hasta recibir None.
+    """
+
+    def __init__(self, clients_info: list[dict], items: list):
+        self.accounts = {info["username"]: info for info in clients_info}
+        self.health = {name: AccountHealth() for name in self.accounts}
+        self.queues = {name: deque() for name in self.accounts}
+        self.failed = set()
+        self.retried = set()    # trabajo reasignado después de una falla de auth
+        self.in_flight = 0
+        self._cond = asyncio.Condition()
+
+        names = list(self.accounts)
+        for i, item in enumerate(items):
+            self.queues[names[i % len(names)]].append(item)
+
+    def _backlog(self, name: str) -> float:
+        """Tiempo estimado para terminar la cola de `name` (más alto = más atrasada)."""
+        if not self.queues[name]:
+            return 0.0
+        if name in self.failed:
+            return float("inf")
+        limiter = self.accounts[name].get("limiter")
+        paused = limiter is not None and limiter.paused_until > time.monotonic()
+        score = self.health[name].score() * (0.1 if paused else 1.0)
+        return len(self.queues[name]) / max(score, 1e-6)
+
+    def _next(self, name: str) -> Optional[tuple]:
+        """(trabajo, cuenta de origen) para `name`: de su cola o robado a otra."""
+        if self.queues[name]:
+            return self.queues[name].popleft(), None
+        victims = [other for other in self.queues if other != name and self.queues[other]]
+        if not victims:
+            return None
+        victim = max(victims, key=self._backlog)
+        # Se roba del final: lo primero de la cola lo va a tomar su dueña
+        return self.queues[victim].pop(), victim
+
+    async def take(self, info: dict) -> Optional[tuple]:
+        """
+        Próximo trabajo para la cuenta (y de qué cuenta se robó, o None).
+        Espera mientras otras cuentas tengan keywords en curso que puedan
+        volver a la cola; None cuando no queda nada (o la cuenta falló).
+        """
+        name = info["username"]
+        async with self._cond:
+            while True:
+                if name in self.failed:
+                    return None
+                item = self._next(name)
+                if item:
+                    self.in_flight += 1
+                    return item
+                if self.in_flight == 0:
+                    return None
+                await self._cond.wait()
+
+    async def done(self) -> None:
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def healthiest(self, exclude=()) -> Optional[dict]:
+        """Cuenta sana con mejor puntaje, prefiriendo las que no tienen cola."""
+        candidates = [name for name in self.accounts if name not in self.failed and name not in exclude]
+        if not candidates:
+            return None
+        best = max(candidates, key=lambda n: (not self.queues[n], self.health[n].score()))
+        return self.accounts[best]
+
+    async def fail_account(self, info: dict, item) -> Optional[dict]:
+        """
+        Marca la cuenta como fallida (auth) y reasigna su cola e `item` a la
+        cuenta más sana. Retorna esa cuenta, o None si fallaron todas o el
+        trabajo ya había sido reasignado una vez.
+        """
+        name = info["username"]
+        async with self._cond:
+            self.failed.add(name)
+            self.health[name].auth_failures += 1
+            target = self.healthiest()
+            if target is None:
+                self.queues[name].clear()
+                self._cond.notify_all()
+                return None
+            target_queue = self.queues[target["username"]]
+            target_queue.extend(self.queues[name])
+            self.queues[name].clear()
+            if item in self.retried:
+                self._cond.notify_all()
+                return None
+            self.retried.add(item)
+            target_queue.appendleft(item)
+            self._cond.notify_all()
+            return target
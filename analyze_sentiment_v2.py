@@ -13,15 +13,19 @@ Mejoras vs v1:
   • Reglas duras complementarias:
       - Cuentas institucionales (@comarb, @ARCA_informa, etc.)
         siempre se fuerzan a NEU (son comunicados oficiales).
+  • Cache persistente por (tweet_id, modelo, versión de reglas)
+    → ver classification_cache.py.
 """
 
 from __future__ import annotations
 
 import os
 import sys
-from functools import lru_cache
 from typing import Optional
 
+from classification_cache import get_cache
+from model_registry import backend_for, predict as _registry_predict
+
 # Silenciar logs de transformers/HF
 os.environ.setdefault("TRANSFORMERS_VERBOSITY", "error")
 os.environ.setdefault("HF_HUB_DISABLE_PROGRESS_BARS", "1")
@@ -64,32 +68,30 @@ INSTITUTIONAL_USERNAMES = NEUTRAL_USERNAMES
 # Mapeo del output de pysentimiento al vocabulario del proyecto
 _LABEL_MAP = {"POS": "positivo", "NEU": "neutro", "NEG": "negativo"}
 
+# Identifican los resultados en el cache de clasificaciones.
+# Subir RULE_VERSION al cambiar reglas (p.ej. NEUTRAL_USERNAMES) invalida el cache.
+MODEL_NAME = "pysentimiento/robertuito-sentiment-analysis"
+RULE_VERSION = "1"
 
-@lru_cache(maxsize=1)
-def _get_analyzer():
-    """Carga perezosa del modelo (~500MB la primera vez, después en cache HF)."""
-    from pysentimiento import create_analyzer
-    return create_analyzer(task="sentiment", lang="es")
 
+def _cache_model_name() -> str:
+    """Nombre de modelo para el cache: el backend ONNX int8 no da exactamente
+    las mismas probabilidades que torch, así que se cachea aparte."""
+    return MODEL_NAME + ("+onnx-int8" if backend_for("sentiment") == "onnx" else "")
 
-def classify(text: str, username: Optional[str] = None) -> dict:
-    """
-    Clasifica un tweet y devuelve toda la información disponible.
 
-    Args:
-        text:     contenido del tweet.
-        username: handle del autor sin '@' (opcional, habilita reglas).
+def _predict(inputs, workers: Optional[int] = None):
+    """Inferencia vía model_registry: el modelo (~500MB la primera vez, después
+    en cache HF) se carga una vez por proceso y se comparte la tokenización
+    con el análisis de emociones."""
+    if isinstance(inputs, str):
+        return _registry_predict("sentiment", [inputs], workers=0)[0]
+    return _registry_predict("sentiment", inputs, workers=workers)
 
-    Returns:
-        dict con keys:
-            sentiment   → "positivo" | "neutro" | "negativo"
-            score       → float en [-1, 1] (POS_proba - NEG_proba)
-            confidence  → float en [0, 1] (proba de la clase elegida)
-            probas      → {"positivo": p, "neutro": p, "negativo": p}
-            rule        → str | None (ej. "institutional_account")
-    """
-    text_clean = (text or "").strip()
-    if not text_clean:
+
+def _rule_result(text: str, username: Optional[str] = None) -> Optional[dict]:
+    """Aplica las reglas duras (sin modelo). Devuelve el resultado o None."""
+    if not (text or "").strip():
         return {
             "sentiment": "neutro",
             "score": 0.0,
@@ -108,10 +110,40 @@ def classify(text: str, username: Optional[str] = None) -> dict:
                 "probas": {"positivo": 0.0, "neutro": 1.0, "negativo": 0.0},
                 "rule": "institutional_account",
             }
+    return None
+
+
+def classify(text: str, username: Optional[str] = None, tweet_id=None) -> dict:
+    """
+    Clasifica un tweet y devuelve toda la información disponible.
+
+    Args:
+        text:     contenido del tweet.
+        username: handle del autor sin '@' (opcional, habilita reglas).
+        tweet_id: id del tweet (opcional, habilita el cache persistente).
+
+    Returns:
+        dict con keys:
+            sentiment   → "positivo" | "neutro" | "negativo"
+            score       → float en [-1, 1] (POS_proba - NEG_proba)
+            confidence  → float en [0, 1] (proba de la clase elegida)
+            probas      → {"positivo": p, "neutro": p, "negativo": p}
+            rule        → str | None (ej. "institutional_account")
+    """
+    text_clean = (text or "").strip()
+    ruled = _rule_result(text_clean, username)
+    if ruled is not None:
+        return ruled
+
+    # ── Cache ──
+    cache = get_cache() if tweet_id is not None else None
+    if cache is not None:
+        cached = cache.get(tweet_id, _cache_model_name(), RULE_VERSION)
+        if cached is not None:
+            return cached
 
     # ── Modelo neuronal ──
-    analyzer = _get_analyzer()
-    result = analyzer.predict(text_clean)
+    result = _predict(text_clean)
     probas_raw = result.probas  # {"POS": .., "NEU": .., "NEG": ..}
 
     probas = {
@@ -123,38 +155,94 @@ def classify(text: str, username: Optional[str] = None) -> dict:
     score = round(probas["positivo"] - probas["negativo"], 3)
     confidence = round(max(probas.values()), 3)
 
-    return {
+    out = {
         "sentiment": sentiment,
         "score": score,
         "confidence": confidence,
         "probas": {k: round(v, 3) for k, v in probas.items()},
         "rule": None,
     }
+    if cache is not None:
+        cache.put(tweet_id, out, _cache_model_name(), RULE_VERSION)
+    return out
 
 
-def classify_batch(texts: list[str]) -> list[dict]:
-    """Versión batch — más rápida que llamar classify() en loop."""
+def classify_batch(texts: list[str], tweet_ids: Optional[list] = None,
+                   workers: Optional[int] = None) -> list[dict]:
+    """Versión batch — más rápida que llamar classify() en loop.
+
+    Si se pasan `tweet_ids` (alineados con `texts`), los tweets ya cacheados
+    no pasan por el modelo; un id None saltea el cache para ese texto.
+    `workers` > 1 reparte la inferencia entre procesos (default:
+    CLASSIFY_WORKERS); los resultados mantienen el orden de entrada.
+    """
     if not texts:
         return []
-    analyzer = _get_analyzer()
-    results = analyzer.predict(texts)
-    out = []
-    for r in results:
-        probas = {
-            "positivo": float(r.probas["POS"]),
-            "neutro": float(r.probas["NEU"]),
-            "negativo": float(r.probas["NEG"]),
-        }
-        out.append({
-            "sentiment": _LABEL_MAP[r.output],
-            "score": round(probas["positivo"] - probas["negativo"], 3),
-            "confidence": round(max(probas.values()), 3),
-            "probas": {k: round(v, 3) for k, v in probas.items()},
-            "rule": None,
-        })
+
+    out = [None] * len(texts)
+    cache = get_cache() if tweet_ids is not None else None
+    if cache is not None:
+        keyed = [(i, tid) for i, tid in enumerate(tweet_ids) if tid is not None]
+        cached = cache.get_many([tid for _, tid in keyed], _cache_model_name(), RULE_VERSION)
+        for i, tid in keyed:
+            out[i] = cached.get(str(tid))
+
+    pending = [i for i, res in enumerate(out) if res is None]
+    if pending:
+        results = _predict([(texts[i] or "").strip() for i in pending], workers=workers)
+        fresh = {}
+        for i, r in zip(pending, results):
+            probas = {
+                "positivo": float(r.probas["POS"]),
+                "neutro": float(r.probas["NEU"]),
+                "negativo": float(r.probas["NEG"]),
+            }
+            out[i] = {
+                "sentiment": _LABEL_MAP[r.output],
+                "score": round(probas["positivo"] - probas["negativo"], 3),
+                "confidence": round(max(probas.values()), 3),
+                "probas": {k: round(v, 3) for k, v in probas.items()},
+                "rule": None,
+            }
+            if cache is not None and tweet_ids[i] is not None:
+                fresh[tweet_ids[i]] = out[i]
+        if cache is not None:
+            cache.put_many(fresh, _cache_model_name(), RULE_VERSION)
     return out
 
 
+def classify_posts(posts: list[dict], workers: Optional[int] = None) -> list[dict]:
+    """
+    Clasifica una lista de posts (formato tweets_data.json) en un solo batch.
+
+    Las reglas duras (texto vacío, cuenta institucional) se resuelven antes
+    y esos posts no pasan por el modelo; el resto va a classify_batch() con
+    sus ids para aprovechar el cache. Devuelve resultados alineados con `posts`.
+    """
+    out = [None] * len(posts)
+    texts = [(post.get("text") or "").strip() for post in posts]  # como classify()
+    batch_indices = []
+    for i, post in enumerate(posts):
+        out[i] = _rule_result(texts[i], post.get("username"))
+        if out[i] is None:
+            batch_indices.append(i)
+
+    batch_out = classify_batch(
+        [texts[i] for i in batch_indices],
+        tweet_ids=[posts[i].get("id") for i in batch_indices],
+        workers=workers,
+    )
+    for i, res in zip(batch_indices, batch_out):
+        out[i] = res
+    return out
+
+
+def cache_stats() -> dict:
+    """Hits/misses del cache de clasificaciones en este proceso."""
+    cache = get_cache()
+    return cache.stats() if cache is not None else {"hits": 0, "misses": 0}
+
+
 # Compatibilidad con el código viejo: misma firma que analyze_sentiment(text)
 def analyze_sentiment_v2(text: str, username: Optional[str] = None):
     """Drop-in para el viejo `analyze_sentiment` de main.py.
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Benchmarks del pipeline de clasificación y reporte.
+
+Genera datasets sintéticos de tweets en español (palabras y frases de
+sentiment_lexicon, negaciones, intensificadores y emojis reales) de 1k, 10k
+y 100k posts, y mide por separado:
+
+    analyze_sentiment        clasificador léxico, de a un texto
+    analyze_sentiment_batch  clasificador léxico, en batch (NumPy)
+    count_emojis             detección de emojis
+    classify_batch           clasificador v2 con el modelo reemplazado por un stub
+    enrich_in_memory         emociones (modelo stub)
+    _extract_top_ngrams      n-gramas por keyword del reporte
+    generate_html_report     render completo del dashboard
+
+Con el stub no se carga pysentimiento: se mide lo que hace el código
+alrededor del modelo (reglas, armado de resultados, resúmenes), no la
+inferencia. El cache de clasificaciones queda desactivado.
+
+Los resultados se guardan en JSON para comparar corridas (antes de subir
+MAX_TWEETS_PER_KEYWORD, o para detectar regresiones):
+
+    python benchmark.py                                  # 1k, 10k y 100k
+    python benchmark.py --sizes 1000 10000 --repeat 5
+    python benchmark.py --only generate_html_report --out bench_render.json
+    python benchmark.py --compare bench_anterior.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import copy
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Sin cache (se mide el camino completo) y sin pool de procesos (el stub vive en este proceso)
+os.environ["CLASSIFY_CACHE"] = ""
+os.environ["CLASSIFY_WORKERS"] = "0"
+
+try:
+    sys.stdout.reconfigure(encoding="utf-8")
+except Exception:
+    pass
+
+import model_registry
+from analyze_sentiment_v2 import NEUTRAL_USERNAMES, classify_batch
+from enrich_emotions import enrich_in_memory
+from main import (
+    KEYWORDS, NEGATIVE_EMOJIS, POSITIVE_EMOJIS,
+    _summarize_keyword, analyze_sentiment, analyze_sentiment_batch, count_emojis,
+)
+from report_generator import _extract_top_ngrams, generate_html_report
+from sentiment_lexicon import (
+    INTENSIFIERS, NEGATIONS, NEGATIVE_PHRASES, NEGATIVE_WORDS,
+    POSITIVE_PHRASES, POSITIVE_WORDS, SARCASM_MARKERS,
+)
+import text_tokens
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_OUT = "bench_results.json"
+
+_FILLER = (
+    "el la los las de del que en y a un una para con por se no es lo hoy ya otra vez "
+    "sistema página clave fiscal ddjj vencimiento contador cliente trámite formulario "
+    "presentación declaración jurada agip arba afip arca monotributo ingresos brutos "
+    "retenciones percepciones padrón alícuota mes semana mañana tarde todavía siempre"
+).split()
+
+
+# ═══════════════════════════════════════════════════════════════
+#  MODELO STUB
+# ═══════════════════════════════════════════════════════════════
+
+class _StubAnalyzer:
+    """Reemplaza al analyzer de pysentimiento: resultado determinístico por texto, sin inferencia."""
+
+    _LABELS = {
+        "sentiment": ("POS", "NEU", "NEG"),
+        "emotion": ("others", "joy", "sadness", "anger", "surprise", "disgust", "fear"),
+    }
+
+    def __init__(self, task: str):
+        self.labels = self._LABELS[task]
+
+    def predict(self, texts):
+        out = []
+        for text in texts:
+            h = zlib.crc32(text.encode("utf-8"))
+            weights = [((h >> (4 * i)) & 0xF) + 1 for i in range(len(self.labels))]
+            total = sum(weights)
+            probas = {label: w / total for label, w in zip(self.labels, weights)}
+            out.append(SimpleNamespace(output=max(probas, key=probas.get), probas=probas))
+        return out
+
+
+def install_stub_models() -> None:
+    for task in _StubAnalyzer._LABELS:
+        model_registry._analyzers[task] = _StubAnalyzer(task)
+
+
+# ═══════════════════════════════════════════════════════════════
+#  DATASET SINTÉTICO
+# ═══════════════════════════════════════════════════════════════
+
+_NEG_WORDS = sorted(NEGATIVE_WORDS)
+_POS_WORDS = sorted(POSITIVE_WORDS)
+_PHRASES = sorted(NEGATIVE_PHRASES) + sorted(POSITIVE_PHRASES)
+_NEGATIONS = sorted(NEGATIONS)
+_INTENSIFIERS = sorted(INTENSIFIERS)
+_SARCASM = sorted(SARCASM_MARKERS)
+
+
+def _make_text(rng: random.Random, keyword: str, emojis: list) -> str:
+    words = [keyword] if rng.random() < 0.7 else [f"#{keyword.upper()}"]
+    for _ in range(rng.randint(6, 40)):
+        r = rng.random()
+        if r < 0.12:
+            words.append(rng.choice(_NEG_WORDS))
+        elif r < 0.20:
+            words.append(rng.choice(_POS_WORDS))
+        elif r < 0.25:
+            words.append(rng.choice(_PHRASES))
+        elif r < 0.29:
+            words.append(rng.choice(_NEGATIONS))
+        elif r < 0.33:
+            words.append(rng.choice(_INTENSIFIERS))
+        elif r < 0.34:
+            words.append(rng.choice(_SARCASM))
+        else:
+            words.append(rng.choice(_FILLER))
+    for _ in range(rng.choice((0, 0, 0, 1, 1, 2, 3))):
+        words.insert(rng.randint(1, len(words)), rng.choice(emojis))
+    if rng.random() < 0.1:
+        words.append(f"https://t.co/{rng.getrandbits(40):x}")
+    return " ".join(words)
+
+
+def make_dataset(n_posts: int, seed: int = 0) -> dict:
+    """Dataset con el esquema de tweets_data.json, `n_posts` repartidos entre las keywords."""
+    rng = random.Random(seed)
+    emojis = list(POSITIVE_EMOJIS) + list(NEGATIVE_EMOJIS)
+    usernames = [f"usuario_{i}" for i in range(max(50, n_posts // 20))]
+    neutral = sorted(NEUTRAL_USERNAMES)
+    year = datetime.now().year
+    start = datetime(year, 1, 1, 9)
+
+    data = {
+        "generated_at": datetime.now().isoformat(),
+        "period": {"from": f"{year}-01-01", "to": f"{year}-12-31"},
+        "keywords": [],
+    }
+    next_id = 1_900_000_000_000_000_000
+    for k, keyword in enumerate(KEYWORDS):
+        n = n_posts // len(KEYWORDS) + (1 if k < n_posts % len(KEYWORDS) else 0)
+        posts = []
+        for _ in range(n):
+            next_id += rng.randint(1, 10**9)
+            username = rng.choice(neutral) if rng.random() < 0.03 else rng.choice(usernames)
+            text = _make_text(rng, keyword, emojis)
+            sentiment = rng.choices(("negativo", "neutro", "positivo"), weights=(5, 3, 2))[0]
+            posts.append({
+                "id": str(next_id),
+                "text": text,
+                "user": username.replace("_", " ").title(),
+                "username": username,
+                "date": str(start + timedelta(seconds=rng.randint(0, 300 * 86400))) + "+00:00",
+                "sentiment": sentiment,
+                "sentiment_score": round(rng.uniform(-1, 1), 3),
+                "emojis_found": count_emojis(text)[2],
+                "likes": int(rng.paretovariate(1.5)) - 1,
+                "retweets": int(rng.paretovariate(2.0)) - 1,
+                "replies": int(rng.paretovariate(2.0)) - 1,
+                "url": f"https://x.com/{username}/status/{next_id}",
+            })
+        posts.sort(key=lambda p: p["date"], reverse=True)
+        data["keywords"].append(_summarize_keyword({"keyword": keyword, "posts": posts}))
+    return data
+
+
+# ═══════════════════════════════════════════════════════════════
+#  CASOS
+# ═══════════════════════════════════════════════════════════════
+
+def _texts(data):
+    return [p["text"] for kw in data["keywords"] for p in kw["posts"]]
+
+
+def _cold(fn):
+    """Vacía el cache de text_tokens antes de cada medición (sin eso se mediría solo el cache)."""
+    fn.setup = text_tokens.clear_cache
+    return fn
+
+
+def _bench_analyze_sentiment(data):
+    texts = _texts(data)
+    return _cold(lambda: [analyze_sentiment(t) for t in texts])
+
+
+def _bench_analyze_sentiment_batch(data):
+    texts = _texts(data)
+    return _cold(lambda: analyze_sentiment_batch(texts))
+
+
+def _bench_count_emojis(data):
+    texts = _texts(data)
+    return lambda: [count_emojis(t) for t in texts]
+
+
+def _bench_classify_batch(data):
+    texts = _texts(data)
+    return lambda: classify_batch(texts)
+
+
+def _bench_enrich_in_memory(data):
+    copies = []
+
+    def setup():
+        copies.append(copy.deepcopy(data))  # enrich_in_memory modifica el dataset
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            enrich_in_memory(copies.pop())
+
+    run.setup = setup
+    return run
+
+
+def _bench_extract_top_ngrams(data):
+    return _cold(lambda: [_extract_top_ngrams(kw["posts"], kw["keyword"], top_n=5, min_count=2)
+                          for kw in data["keywords"]])
+
+
+def _bench_generate_html_report(data):
+    out = os.path.join(tempfile.mkdtemp(prefix="comarb-bench-"), "index.html")
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_html_report(data, out)
+
+    return _cold(run)
+
+
+CASES = {
+    "analyze_sentiment": _bench_analyze_sentiment,
+    "analyze_sentiment_batch": _bench_analyze_sentiment_batch,
+    "count_emojis": _bench_count_emojis,
+    "classify_batch": _bench_classify_batch,
+    "enrich_in_memory": _bench_enrich_in_memory,
+    "_extract_top_ngrams": _bench_extract_top_ngrams,
+    "generate_html_report": _bench_generate_html_report,
+}
+
+
+def _time(fn, repeat: int) -> list[float]:
+    """Tiempos de `repeat` llamadas, después de una de calentamiento (lru_caches, regex, etc.)."""
+    setup = getattr(fn, "setup", None)  # preparación que no se mide
+    times = []
+    for i in range(repeat + 1):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        fn()
+        if i:
+            times.append(time.perf_counter() - started)
+    return times
+
+
+def run_benchmarks(sizes, repeat: int = 3, only=None, seed: int = 0) -> dict:
+    install_stub_models()
+    results = {}
+    for n in sizes:
+        print(f"\n📦 {n:,} posts", flush=True)
+        data = make_dataset(n, seed)
+        results[str(n)] = {}
+        for name, make in CASES.items():
+            if only and name not in only:
+                continue
+            times = _time(make(data), repeat)
+            row = {
+                "best_s": round(min(times), 6),
+                "mean_s": round(statistics.mean(times), 6),
+                "per_post_us": round(min(times) / n * 1e6, 3),
+                "repeat": repeat,
+            }
+            results[str(n)][name] = row
+            print(f"   {name:<26} {row['best_s']:>9.4f}s  ({row['per_post_us']:>8.2f} µs/post)", flush=True)
+    return results
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(current: dict, previous: dict) -> None:
+    print("\n" + "═" * 60)
+    print(f"  📊 COMPARACIÓN con {previous.get('commit') or previous.get('generated_at')}")
+    print("═" * 60)
+    for size, cases in current["results"].items():
+        prev_cases = previous.get("results", {}).get(size, {})
+        for name, row in cases.items():
+            prev = prev_cases.get(name)
+            if not prev:
+                continue
+            ratio = row["best_s"] / prev["best_s"] if prev["best_s"] else float("inf")
+            mark = "🔴" if ratio > 1.10 else ("🟢" if ratio < 0.90 else "⚪")
+            print(f"   {mark} {int(size):>7,} {name:<26} {prev['best_s']:>9.4f}s → {row['best_s']:>9.4f}s  ×{ratio:.2f}")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmarks del pipeline de clasificación y reporte")
+    p.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Cantidades de posts")
+    p.add_argument("--repeat", type=int, default=3, help="Mediciones por caso (se reporta la mejor)")
+    p.add_argument("--only", nargs="+", choices=list(CASES), help="Medir solo estos casos")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--out", default=DEFAULT_OUT, help=f"JSON de resultados (default: {DEFAULT_OUT})")
+    p.add_argument("--compare", metavar="JSON", help="Resultados de una corrida anterior para comparar")
+    args = p.parse_args()
+
+    previous = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+
+    report = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "results": run_benchmarks(args.sizes, args.repeat, args.only, args.seed),
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Resultados en: {args.out}")
+
+    if previous:
+        compare(report, previous)
+
+
+if __name__ == "__main__":
+    main()
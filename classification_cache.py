@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Cache persistente de clasificaciones de sentimiento (SQLite).
+
+Guarda el resultado de `analyze_sentiment_v2.classify` por tweet, para que
+re-correr el pipeline o `compare_classifiers.py` solo pague inferencia del
+modelo por los tweets que todavía no vio.
+
+Clave: (tweet_id, model_name, rule_version)
+    tweet_id     → id del tweet (el texto de un tweet no cambia: editar
+                   genera un id nuevo)
+    model_name   → modelo de HF usado
+    rule_version → versión de las reglas duras de analyze_sentiment_v2;
+                   subirla invalida todo lo cacheado con la anterior.
+
+Configuración:
+    CLASSIFY_CACHE=<ruta>   archivo SQLite (default: classification_cache.sqlite)
+    CLASSIFY_CACHE=         (vacío) desactiva el cache
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Iterable, Optional
+
+DEFAULT_PATH = "classification_cache.sqlite"
+
+# SQLite viejo limita a 999 parámetros por consulta
+_CHUNK = 500
+
+
+class ClassificationCache:
+    """Cache (tweet_id, model_name, rule_version) → dict de classify()."""
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        # Una sola conexión compartida; el lock la protege si se usa desde threads
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS classifications (
+                   tweet_id     TEXT NOT NULL,
+                   model_name   TEXT NOT NULL,
+                   rule_version TEXT NOT NULL,
+                   result       TEXT NOT NULL,
+                   PRIMARY KEY (tweet_id, model_name, rule_version)
+               )"""
+        )
+        self._conn.commit()
+
+    def get_many(self, tweet_ids: Iterable, model_name: str, rule_version: str) -> dict:
+        """Devuelve {tweet_id: resultado} para los ids cacheados y cuenta hits/misses."""
+        ids = [str(i) for i in tweet_ids]
+        found = {}
+        with self._lock:
+            for start in range(0, len(ids), _CHUNK):
+                chunk = ids[start:start + _CHUNK]
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT tweet_id, result FROM classifications "
+                    f"WHERE model_name = ? AND rule_version = ? AND tweet_id IN ({marks})",
+                    [model_name, rule_version, *chunk],
+                ).fetchall()
+                for tid, result in rows:
+                    found[tid] = json.loads(result)
+            self.hits += len(found)
+            self.misses += len(ids) - len(found)
+        return found
+
+    def put_many(self, results: dict, model_name: str, rule_version: str) -> None:
+        """Guarda {tweet_id: resultado} (pisa lo que hubiera con la misma clave)."""
+        if not results:
+            return
+        rows = [
+            (str(tid), model_name, rule_version, json.dumps(res, ensure_ascii=False))
+            for tid, res in results.items()
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO classifications "
+                "(tweet_id, model_name, rule_version, result) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+
+    def get(self, tweet_id, model_name: str, rule_version: str) -> Optional[dict]:
+        return self.get_many([tweet_id], model_name, rule_version).get(str(tweet_id))
+
+    def put(self, tweet_id, result: dict, model_name: str, rule_version: str) -> None:
+        self.put_many({tweet_id: result}, model_name, rule_version)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_cache: Optional[ClassificationCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Optional[ClassificationCache]:
+    """Cache del proceso según CLASSIFY_CACHE, o None si está desactivado."""
+    global _cache
+    path = os.environ.get("CLASSIFY_CACHE", DEFAULT_PATH)
+    if not path:
+        return None
+    with _cache_lock:
+        if _cache is None or _cache.path != path:
+            _cache = ClassificationCache(path)
+        return _cache
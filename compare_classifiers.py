@@ -16,13 +16,14 @@ Salidas:
 Uso:
     python compare_classifiers.py
     python compare_classifiers.py --data tweets_data.json --top 25
+    python compare_classifiers.py --workers 4   # inferencia en 4 procesos
 """
 
 from __future__ import annotations
 
 import argparse
 import csv
-import json
+import heapq
 import os
 import sys
 from collections import Counter, defaultdict
@@ -33,95 +34,172 @@ try:
 except Exception:
     pass
 
-from analyze_sentiment_v2 import classify_batch, classify
+from analyze_sentiment_v2 import classify_posts, cache_stats
+from tweet_stream import DatasetWriter, iter_dataset, iter_posts
 
 DEFAULT_DATA = "tweets_data.json"
 LABELS = ["positivo", "neutro", "negativo"]
 
 
+# Posts por tanda: se clasifican, se escriben y se descartan (memoria constante)
+_CHUNK = 2048
+
+
 def load_posts(path: str):
-    """Yield (keyword, post) tuples conservando orden."""
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    for kw_block in data["keywords"]:
-        for post in kw_block.get("posts", []):
-            yield kw_block["keyword"], post
-    return data
+    """Yield (keyword, post) tuples conservando orden (en streaming)."""
+    return iter_posts(path)
+
+
+class _TopDiffs:
+    """Los `n` cambios de mayor confianza de una categoría (+ el total de casos)."""
+
+    def __init__(self, n: int, by_confidence: bool = True):
+        self.n = n
+        self.by_confidence = by_confidence
+        self.count = 0
+        self._heap = []  # (confianza, -orden, diff) → el tope del heap es el peor
+
+    def add(self, diff: dict) -> None:
+        self.count += 1
+        if not self.by_confidence:
+            if len(self._heap) < self.n:
+                self._heap.append((0, -self.count, diff))
+            return
+        item = (diff["new_confidence"], -self.count, diff)
+        if len(self._heap) < self.n:
+            heapq.heappush(self._heap, item)
+        elif item > self._heap[0]:
+            heapq.heapreplace(self._heap, item)
+
+    def items(self) -> list:
+        """Mismo orden que ordenar todos por confianza desc (estable) y cortar en n."""
+        return [d for _, _, d in sorted(self._heap, key=lambda it: (-it[0], -it[1]))]
+
+
+def _print_diffs(title: str, top: _TopDiffs) -> None:
+    if not top.count:
+        return
+    print("\n" + "═" * 70)
+    print(title.format(n=top.count))
+    print("═" * 70)
+    for d in top.items():
+        txt = d["text"].replace("\n", " ")[:130]
+        print(f"  [conf {d['new_confidence']:.2f}] @{d['username']}  ({d['keyword']})")
+        print(f"    {txt}")
 
 
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument("--data", default=DEFAULT_DATA)
+    parser.add_argument("--data", default=DEFAULT_DATA,
+                        help="JSON, Parquet o almacén SQLite de entrada")
+    parser.add_argument("--since", help="Desde (YYYY-MM-DD), solo con el almacén SQLite")
+    parser.add_argument("--until", help="Hasta (YYYY-MM-DD), solo con el almacén SQLite")
     parser.add_argument("--top", type=int, default=15,
                         help="Cantidad de ejemplos a mostrar por categoría de cambio")
     parser.add_argument("--csv", default="comparison.csv")
     parser.add_argument("--out-json", default="tweets_data_v2.json")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Procesos de inferencia en paralelo (default: CLASSIFY_WORKERS o 1)")
     args = parser.parse_args()
 
     if not os.path.exists(args.data):
         raise SystemExit(f"❌ No existe: {args.data}")
 
-    with open(args.data, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    # ── Recolectar todos los posts manteniendo referencias ──
-    all_entries = []  # (keyword, post_ref)
-    for kw_block in data["keywords"]:
-        for post in kw_block.get("posts", []):
-            all_entries.append((kw_block["keyword"], post))
-
-    n = len(all_entries)
-    print(f"📊 Total tweets a clasificar: {n}\n")
     print("⏳ Cargando RoBERTuito y clasificando (puede tardar la 1ra vez)...\n")
 
-    # ── Clasificar en batch para velocidad ──
-    # Aplicamos primero la regla de cuenta institucional (no llamar al modelo).
-    # Para el resto, usamos el batch del modelo.
-    new_results = [None] * n
-    batch_indices = []
-    batch_texts = []
-    for i, (_, post) in enumerate(all_entries):
-        username = (post.get("username") or "").lstrip("@").lower()
-        from analyze_sentiment_v2 import INSTITUTIONAL_USERNAMES
-        if username in INSTITUTIONAL_USERNAMES:
-            new_results[i] = {
-                "sentiment": "neutro",
-                "score": 0.0,
-                "confidence": 1.0,
-                "probas": {"positivo": 0.0, "neutro": 1.0, "negativo": 0.0},
-                "rule": "institutional_account",
-            }
-        else:
-            batch_indices.append(i)
-            batch_texts.append(post.get("text", ""))
-
-    batch_out = classify_batch(batch_texts) if batch_texts else []
-    for idx, res in zip(batch_indices, batch_out):
-        new_results[idx] = res
-
     # ── Estadísticas ──
     old_dist = Counter()
     new_dist = Counter()
     confusion = defaultdict(int)  # (old, new) → count
-    diffs = []  # (old, new, conf, kw, username, text, score_old, score_new)
-
-    for (kw, post), new in zip(all_entries, new_results):
-        old = post.get("sentiment", "neutro")
-        old_dist[old] += 1
-        new_dist[new["sentiment"]] += 1
-        confusion[(old, new["sentiment"])] += 1
-        if old != new["sentiment"]:
-            diffs.append({
-                "keyword": kw,
-                "username": post.get("username", ""),
-                "text": post.get("text", ""),
-                "old_sentiment": old,
-                "old_score": post.get("sentiment_score", 0),
-                "new_sentiment": new["sentiment"],
-                "new_score": new["score"],
-                "new_confidence": new["confidence"],
-                "rule": new["rule"],
-            })
+    n = 0
+    n_changed = 0
+    pos_to_neg = _TopDiffs(args.top)
+    neu_to_neg = _TopDiffs(args.top)
+    neu_to_pos = _TopDiffs(args.top)
+    neg_to_pos = _TopDiffs(args.top, by_confidence=False)
+    categories = {
+        ("positivo", "negativo"): pos_to_neg,
+        ("neutro", "negativo"): neu_to_neg,
+        ("neutro", "positivo"): neu_to_pos,
+        ("negativo", "positivo"): neg_to_pos,
+    }
+
+    # Un solo recorrido del dataset: cada tanda se clasifica y va directo al
+    # CSV y al JSON re-clasificado, sin copias del dataset en memoria.
+    pending = []  # (keyword, post)
+    new_summary = {"positivo": 0, "neutro": 0, "negativo": 0}
+
+    with open(args.csv, "w", encoding="utf-8", newline="") as csv_f, DatasetWriter(args.out_json) as out:
+        w = csv.writer(csv_f)
+        w.writerow(["keyword", "username", "old_sentiment", "old_score",
+                    "new_sentiment", "new_score", "new_confidence", "rule",
+                    "changed", "text"])
+
+        def flush():
+            nonlocal n, n_changed
+            if not pending:
+                return
+            # classify_posts aplica primero la regla de cuenta institucional (sin
+            # llamar al modelo) y manda el resto al modelo en un solo batch.
+            new_results = classify_posts([post for _, post in pending], workers=args.workers)
+            for (kw, post), new in zip(pending, new_results):
+                n += 1
+                old = post.get("sentiment", "neutro")
+                old_dist[old] += 1
+                new_dist[new["sentiment"]] += 1
+                confusion[(old, new["sentiment"])] += 1
+                if old != new["sentiment"]:
+                    n_changed += 1
+                    top = categories.get((old, new["sentiment"]))
+                    if top is not None:
+                        top.add({
+                            "keyword": kw,
+                            "username": post.get("username", ""),
+                            "text": post.get("text", ""),
+                            "old_sentiment": old,
+                            "old_score": post.get("sentiment_score", 0),
+                            "new_sentiment": new["sentiment"],
+                            "new_score": new["score"],
+                            "new_confidence": new["confidence"],
+                            "rule": new["rule"],
+                        })
+
+                # ── CSV completo ──
+                w.writerow([
+                    kw, post.get("username", ""),
+                    old, post.get("sentiment_score", 0),
+                    new["sentiment"], new["score"], new["confidence"], new["rule"] or "",
+                    "1" if old != new["sentiment"] else "0",
+                    post.get("text", "").replace("\n", " "),
+                ])
+
+                # ── JSON con la nueva clasificación aplicada ──
+                post["sentiment"] = new["sentiment"]
+                post["sentiment_score"] = new["score"]
+                post["sentiment_confidence"] = new["confidence"]
+                post["sentiment_rule"] = new["rule"]
+                new_summary[new["sentiment"]] += 1
+                out.post(kw, post)
+            pending.clear()
+            print(f"   {n} tweets clasificados...", flush=True)
+
+        for event in iter_dataset(args.data, args.since, args.until):
+            if event[0] == "meta":
+                out.meta(event[1], event[2])
+            elif event[0] == "post":
+                pending.append((event[1], event[2]))
+                if len(pending) >= _CHUNK:
+                    flush()
+            else:
+                flush()
+                block = event[1]
+                block["sentiment_summary"] = dict(new_summary)
+                out.keyword_done(block)
+                new_summary = {"positivo": 0, "neutro": 0, "negativo": 0}
+
+    print(f"\n📊 Total tweets clasificados: {n}")
+    stats = cache_stats()
+    print(f"🗄️  Cache de clasificaciones: {stats['hits']} hits / {stats['misses']} misses\n")
 
     # ── Imprimir resumen ──
     print("═" * 70)
@@ -150,89 +228,16 @@ def main():
         row += f"    {total:>5}"
         print(row)
 
-    n_changed = len(diffs)
-    print(f"\n  ✏️  Tweets que cambiaron de etiqueta: {n_changed} / {n}  ({100*n_changed/n:.1f}%)")
+    print(f"\n  ✏️  Tweets que cambiaron de etiqueta: {n_changed} / {n}  ({100*n_changed/n if n else 0:.1f}%)")
 
     # ── Falsos positivos catárticos: POS viejo → NEG nuevo ──
-    pos_to_neg = [d for d in diffs if d["old_sentiment"] == "positivo" and d["new_sentiment"] == "negativo"]
-    pos_to_neg.sort(key=lambda d: d["new_confidence"], reverse=True)
-    if pos_to_neg:
-        print("\n" + "═" * 70)
-        print(f"  🔥 POS → NEG  ({len(pos_to_neg)} casos — falsos positivos del viejo)")
-        print("═" * 70)
-        for d in pos_to_neg[:args.top]:
-            txt = d["text"].replace("\n", " ")[:130]
-            print(f"  [conf {d['new_confidence']:.2f}] @{d['username']}  ({d['keyword']})")
-            print(f"    {txt}")
-
+    _print_diffs("  🔥 POS → NEG  ({n} casos — falsos positivos del viejo)", pos_to_neg)
     # ── Neutros del viejo que ahora son NEG (sarcasmo / quejas no detectadas) ──
-    neu_to_neg = [d for d in diffs if d["old_sentiment"] == "neutro" and d["new_sentiment"] == "negativo"]
-    neu_to_neg.sort(key=lambda d: d["new_confidence"], reverse=True)
-    if neu_to_neg:
-        print("\n" + "═" * 70)
-        print(f"  😠 NEU → NEG  ({len(neu_to_neg)} casos — quejas/sarcasmo que el viejo no captó)")
-        print("═" * 70)
-        for d in neu_to_neg[:args.top]:
-            txt = d["text"].replace("\n", " ")[:130]
-            print(f"  [conf {d['new_confidence']:.2f}] @{d['username']}  ({d['keyword']})")
-            print(f"    {txt}")
-
+    _print_diffs("  😠 NEU → NEG  ({n} casos — quejas/sarcasmo que el viejo no captó)", neu_to_neg)
     # ── Neutros del viejo que ahora son POS ──
-    neu_to_pos = [d for d in diffs if d["old_sentiment"] == "neutro" and d["new_sentiment"] == "positivo"]
-    neu_to_pos.sort(key=lambda d: d["new_confidence"], reverse=True)
-    if neu_to_pos:
-        print("\n" + "═" * 70)
-        print(f"  🙂 NEU → POS  ({len(neu_to_pos)} casos)")
-        print("═" * 70)
-        for d in neu_to_pos[:args.top]:
-            txt = d["text"].replace("\n", " ")[:130]
-            print(f"  [conf {d['new_confidence']:.2f}] @{d['username']}  ({d['keyword']})")
-            print(f"    {txt}")
-
+    _print_diffs("  🙂 NEU → POS  ({n} casos)", neu_to_pos)
     # ── NEG viejo → POS nuevo (potenciales falsos negativos del viejo, o errores del v2) ──
-    neg_to_pos = [d for d in diffs if d["old_sentiment"] == "negativo" and d["new_sentiment"] == "positivo"]
-    if neg_to_pos:
-        print("\n" + "═" * 70)
-        print(f"  ⚠️  NEG → POS  ({len(neg_to_pos)} casos — REVISAR, podrían ser errores)")
-        print("═" * 70)
-        for d in neg_to_pos[:args.top]:
-            txt = d["text"].replace("\n", " ")[:130]
-            print(f"  [conf {d['new_confidence']:.2f}] @{d['username']}  ({d['keyword']})")
-            print(f"    {txt}")
-
-    # ── CSV completo ──
-    with open(args.csv, "w", encoding="utf-8", newline="") as f:
-        w = csv.writer(f)
-        w.writerow(["keyword", "username", "old_sentiment", "old_score",
-                    "new_sentiment", "new_score", "new_confidence", "rule",
-                    "changed", "text"])
-        for (kw, post), new in zip(all_entries, new_results):
-            old = post.get("sentiment", "neutro")
-            w.writerow([
-                kw, post.get("username", ""),
-                old, post.get("sentiment_score", 0),
-                new["sentiment"], new["score"], new["confidence"], new["rule"] or "",
-                "1" if old != new["sentiment"] else "0",
-                post.get("text", "").replace("\n", " "),
-            ])
-
-    # ── JSON con la nueva clasificación aplicada al dataset entero ──
-    new_data = json.loads(json.dumps(data))  # deep copy
-    idx = 0
-    for kw_block in new_data["keywords"]:
-        new_summary = {"positivo": 0, "neutro": 0, "negativo": 0}
-        for post in kw_block.get("posts", []):
-            res = new_results[idx]
-            post["sentiment"] = res["sentiment"]
-            post["sentiment_score"] = res["score"]
-            post["sentiment_confidence"] = res["confidence"]
-            post["sentiment_rule"] = res["rule"]
-            new_summary[res["sentiment"]] += 1
-            idx += 1
-        kw_block["sentiment_summary"] = new_summary
-
-    with open(args.out_json, "w", encoding="utf-8") as f:
-        json.dump(new_data, f, ensure_ascii=False, indent=2)
+    _print_diffs("  ⚠️  NEG → POS  ({n} casos — REVISAR, podrían ser errores)", neg_to_pos)
 
     print("\n" + "═" * 70)
     print(f"  📄 CSV completo:        {args.csv}")
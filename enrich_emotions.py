@@ -24,10 +24,10 @@ Importable:
 from __future__ import annotations
 
 import argparse
-import json
 import os
 import sys
 from collections import Counter
+from typing import Optional
 
 os.environ.setdefault("TRANSFORMERS_VERBOSITY", "error")
 os.environ.setdefault("HF_HUB_DISABLE_PROGRESS_BARS", "1")
@@ -46,6 +46,94 @@ _MIN_COUNT = 3        # mínimo de tweets para reportar emoción dominante
 _MIN_RATIO = 0.15     # o al menos 15% de los tweets de la keyword
 
 
+# Posts por tanda en el modo streaming (memoria constante)
+_STREAM_CHUNK = 1024
+
+
+def _set_emotion_summary(kw: dict, c: Counter) -> None:
+    """emotion_summary y emotion_dominant de una keyword a partir del conteo de sus posts."""
+    kw["emotion_summary"] = dict(c)
+
+    total_kw = sum(c.values())
+    cand = [
+        (e, n) for e, n in c.items()
+        if e != "others" and (n >= _MIN_COUNT or (total_kw and n / total_kw >= _MIN_RATIO))
+    ]
+    if cand:
+        cand.sort(key=lambda en: (-en[1], _PRIO_IDX.get(en[0], 99)))
+        kw["emotion_dominant"] = cand[0][0]
+    else:
+        kw["emotion_dominant"] = "others"
+
+
+def summarize_emotions(data: dict) -> dict:
+    """Recalcula emotion_summary y emotion_dominant de cada keyword a partir de sus posts."""
+    for kw in data["keywords"]:
+        c = Counter()
+        for post in kw.get("posts", []):
+            c[post.get("emotion", "others")] += 1
+        _set_emotion_summary(kw, c)
+    return data
+
+
+def _apply_emotions(posts: list, results) -> None:
+    for post, r in zip(posts, results):
+        post["emotion"] = r.output
+        post["emotion_probas"] = {k: round(float(v), 3) for k, v in r.probas.items()}
+
+
+def _print_distribution(total: Counter) -> None:
+    print("📊 Distribución global de emociones:")
+    for e, n in sorted(total.items(), key=lambda x: -x[1]):
+        print(f"   {e:10} {n:>4}")
+
+
+def enrich_stream(inp: str, out: str, since: Optional[str] = None, until: Optional[str] = None) -> int:
+    """
+    Igual que enrich_in_memory, pero leyendo `inp` y escribiendo `out` de a
+    tandas de posts: la memoria no depende del tamaño del archivo.
+    Devuelve la cantidad de posts procesados.
+    """
+    from model_registry import predict
+    from tweet_stream import DatasetWriter, iter_dataset
+
+    total = Counter()
+    per_kw = Counter()
+    pending = []  # (keyword, post) sin clasificar todavía
+    n = 0
+
+    def flush(writer):
+        if not pending:
+            return
+        posts = [post for _, post in pending]
+        _apply_emotions(posts, predict("emotion", [post.get("text", "") or "" for post in posts]))
+        for kw, post in pending:
+            writer.post(kw, post)
+            per_kw[post["emotion"]] += 1
+            total[post["emotion"]] += 1
+        pending.clear()
+
+    with DatasetWriter(out) as writer:
+        for event in iter_dataset(inp, since, until):
+            if event[0] == "meta":
+                writer.meta(event[1], event[2])
+            elif event[0] == "post":
+                pending.append((event[1], event[2]))
+                n += 1
+                if len(pending) >= _STREAM_CHUNK:
+                    flush(writer)
+            else:
+                flush(writer)
+                block = event[1]
+                _set_emotion_summary(block, per_kw)
+                writer.keyword_done(block)
+                per_kw.clear()
+                print(f"   {block.get('keyword')}: {sum(block['emotion_summary'].values())} tweets", flush=True)
+
+    _print_distribution(total)
+    return n
+
+
 def enrich_in_memory(data: dict) -> dict:
     """
     Enriquece in-place una estructura `data` (formato tweets_data.json)
@@ -53,8 +141,7 @@ def enrich_in_memory(data: dict) -> dict:
 
     Devuelve el mismo dict por conveniencia.
     """
-    from pysentimiento import create_analyzer
-    analyzer = create_analyzer(task="emotion", lang="es")
+    from model_registry import predict
 
     texts = []
     refs = []
@@ -64,36 +151,17 @@ def enrich_in_memory(data: dict) -> dict:
             refs.append(post)
 
     print(f"⏳ Analizando emociones de {len(texts)} tweets...")
-    results = analyzer.predict(texts) if texts else []
+    results = predict("emotion", texts)
 
-    for post, r in zip(refs, results):
-        post["emotion"] = r.output
-        post["emotion_probas"] = {k: round(float(v), 3) for k, v in r.probas.items()}
+    _apply_emotions(refs, results)
 
-    for kw in data["keywords"]:
-        c = Counter()
-        for post in kw.get("posts", []):
-            c[post.get("emotion", "others")] += 1
-        kw["emotion_summary"] = dict(c)
-
-        total_kw = sum(c.values())
-        cand = [
-            (e, n) for e, n in c.items()
-            if e != "others" and (n >= _MIN_COUNT or (total_kw and n / total_kw >= _MIN_RATIO))
-        ]
-        if cand:
-            cand.sort(key=lambda en: (-en[1], _PRIO_IDX.get(en[0], 99)))
-            kw["emotion_dominant"] = cand[0][0]
-        else:
-            kw["emotion_dominant"] = "others"
+    summarize_emotions(data)
 
     total = Counter()
     for kw in data["keywords"]:
         for post in kw.get("posts", []):
             total[post.get("emotion", "others")] += 1
-    print("📊 Distribución global de emociones:")
-    for e, n in sorted(total.items(), key=lambda x: -x[1]):
-        print(f"   {e:10} {n:>4}")
+    _print_distribution(total)
 
     return data
 
@@ -102,21 +170,17 @@ def main():
     p = argparse.ArgumentParser()
     p.add_argument("--in", dest="inp", default="tweets_data_v2.json")
     p.add_argument("--out", default="tweets_data_v2_emo.json")
+    p.add_argument("--since", help="Desde (YYYY-MM-DD), solo si --in es el almacén SQLite")
+    p.add_argument("--until", help="Hasta (YYYY-MM-DD), solo si --in es el almacén SQLite")
     args = p.parse_args()
 
     if not os.path.exists(args.inp):
         raise SystemExit(f"❌ No existe: {args.inp}")
 
-    with open(args.inp, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
     print("⏳ Cargando modelo de emociones (pysentimiento)...")
-    enrich_in_memory(data)
-
-    with open(args.out, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    n = enrich_stream(args.inp, args.out, args.since, args.until)
 
-    print(f"\n💾 Guardado: {args.out}")
+    print(f"\n💾 Guardado: {args.out} ({n} tweets)")
     print("\nAhora podés correr:")
     print(f"   python render_from_cache.py --data {args.out}")
 
@@ -25,48 +25,49 @@ import json
 import os
 import sys
 import random
-from datetime import datetime
+import shutil
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
 
 # ── Detectar modo CI ──
 CI_MODE = os.environ.get("CI", "").lower() == "true"
 OUTPUT_DIR = os.environ.get("OUTPUT_DIR", "docs")
-
-# ── Verificar e instalar dependencias ──
-def install_dependencies():
-    """Instala las dependencias necesarias."""
-    if not CI_MODE:
-        print("📦 Verificando twikit (última versión)...")
-    os.system(f"{sys.executable} -m pip install twikit --upgrade -q 2>/dev/null")
-
-    deps = {"textblob": "textblob"}
-    for module, package in deps.items():
-        try:
-            __import__(module)
-        except ImportError:
-            if not CI_MODE:
-                print(f"📦 Instalando {package}...")
-            os.system(f"{sys.executable} -m pip install {package} -q 2>/dev/null")
-
-    try:
-        from textblob import TextBlob
-        TextBlob("test").sentiment
-    except Exception:
-        if not CI_MODE:
-            print("📦 Descargando datos de TextBlob...")
-        os.system(f"{sys.executable} -m textblob.download_corpora lite -q 2>/dev/null")
-
-install_dependencies()
-
-from twikit import Client
-from textblob import TextBlob
+# Modo incremental: solo busca tweets posteriores a los ya guardados en DATA_FILE
+INCREMENTAL_MODE = os.environ.get("INCREMENTAL", "").lower() == "true"
+# Reanudar keywords cortadas (429, crash) desde el cursor guardado en SEARCH_CHECKPOINTS
+RESUME_MODE = os.environ.get("RESUME", "").lower() == "true"
+# Búsqueda por ventanas de fechas (week | month): cada keyword se parte en una query
+# por ventana y las ventanas se buscan en paralelo entre cuentas (backfill del año)
+SHARD_WINDOW = os.environ.get("SHARD_WINDOW", "").lower()
+# Métricas de la corrida (tiempos por fase, contadores) junto a DATA_FILE; ver metrics.py
+METRICS_PROMETHEUS = os.environ.get("METRICS_PROMETHEUS", "").lower() == "true"
+# Copia columnar opcional del dataset (requiere pyarrow), p.ej. tweets_data.parquet
+TWEETS_PARQUET = os.environ.get("TWEETS_PARQUET", "")
+# Almacén histórico SQLite (upsert por id + clasificación de cada corrida), p.ej. tweets.sqlite
+TWEETS_DB = os.environ.get("TWEETS_DB", "")
+
+# TextBlob (polarity en inglés, 10% del score léxico) es opt-in: LEXICON_TEXTBLOB=true
+# Requiere `pip install textblob` y `python -m textblob.download_corpora lite`.
+LEXICON_TEXTBLOB = os.environ.get("LEXICON_TEXTBLOB", "").lower() == "true"
+
+# twikit, textblob, pysentimiento y torch se importan recién donde se usan:
+# importar main (o render_from_cache) no instala ni descarga nada.
 from report_generator import generate_html_report
 from sentiment_lexicon import (
     NEGATIVE_WORDS, POSITIVE_WORDS,
     NEGATIVE_PHRASES, POSITIVE_PHRASES,
     NEGATIONS, INTENSIFIERS, SARCASM_MARKERS,
 )
+from matchers import EmojiScanner, PhraseMatcher
+from raw_log import RawTweetLog, discard as discard_raw_log, get_log_path as get_raw_log_path
+from search_checkpoints import SearchCheckpoints, get_checkpoints_path
+from rate_limiter import AccountRateLimiter, is_rate_limited, rate_limit_reset
+from account_pool import AccountPool
+import metrics
+import text_tokens
 # Clasificador v2: pysentimiento (RoBERTuito) — reemplaza al lexicon+TextBlob
-from analyze_sentiment_v2 import classify as _classify_v2
+from analyze_sentiment_v2 import classify_posts as _classify_posts_v2
 
 # ── Parche para twikit: corrige regex de X.com (formato webpack actual) ──
 def _patch_twikit_transaction():
@@ -108,7 +109,13 @@ def _patch_twikit_transaction():
     except Exception as e:
         print(f"⚠️  No se pudo aplicar parche twikit: {e}")
 
-_patch_twikit_transaction()
+
+@lru_cache(maxsize=1)
+def _twikit_client_class():
+    """Importa twikit (y le aplica el parche) la primera vez que se necesita un Client."""
+    from twikit import Client
+    _patch_twikit_transaction()
+    return Client
 
 # ── Configuración ──
 KEYWORDS = ["comarb", "sifere", "sircar", "sirpei", "sircreb", "sircupa", "sirtac"]
@@ -171,6 +178,10 @@ NEGATIVE_EMOJIS = {
 }
 
 
+# Ambas tablas compiladas en un solo scanner: una pasada por texto
+_EMOJI_SCANNER = EmojiScanner({"positivo": POSITIVE_EMOJIS, "negativo": NEGATIVE_EMOJIS})
+
+
 def count_emojis(text):
     """
     Cuenta emojis positivos y negativos en un texto.
@@ -180,17 +191,12 @@ def count_emojis(text):
     neg_score = 0.0
     found_emojis = []
 
-    for emoji, weight in POSITIVE_EMOJIS.items():
-        count = text.count(emoji)
-        if count > 0:
+    for emoji, kind, weight, count in _EMOJI_SCANNER.scan(text):
+        if kind == "positivo":
             pos_score += weight * count
-            found_emojis.append({"emoji": emoji, "type": "positivo", "count": count})
-
-    for emoji, weight in NEGATIVE_EMOJIS.items():
-        count = text.count(emoji)
-        if count > 0:
+        else:
             neg_score += weight * count
-            found_emojis.append({"emoji": emoji, "type": "negativo", "count": count})
+        found_emojis.append({"emoji": emoji, "type": kind, "count": count})
 
     return pos_score, neg_score, found_emojis
 
@@ -199,12 +205,17 @@ def count_emojis(text):
 #  ANÁLISIS DE SENTIMIENTO (con emojis)
 # ═══════════════════════════════════════════════════════════════
 
-def _score_phrases(text_lower, phrase_dict):
-    """Busca frases multi-palabra en el texto y suma sus pesos."""
+# Todas las frases del léxico en un solo autómata: una pasada por tweet
+_PHRASE_MATCHER = PhraseMatcher(list(NEGATIVE_PHRASES) + list(POSITIVE_PHRASES))
+
+
+def _score_phrases(found_phrases, phrase_dict):
+    """Suma los pesos de las frases encontradas que pertenecen a `phrase_dict`."""
     score = 0.0
     matched = []
-    for phrase, weight in phrase_dict.items():
-        if phrase in text_lower:
+    for phrase in found_phrases:
+        weight = phrase_dict.get(phrase)
+        if weight is not None:
             score += weight
             matched.append(phrase)
     return score, matched
@@ -267,22 +278,41 @@ def analyze_sentiment(text):
     1. Diccionario de frases argentinas (multi-palabra)
     2. Diccionario de palabras con negaciones e intensificadores
     3. Diccionario de emojis con pesos
-    4. TextBlob (polarity en inglés como complemento menor)
+    4. TextBlob (polarity en inglés como complemento menor, solo con LEXICON_TEXTBLOB=true)
     5. Heurística de sarcasmo argentino
 
     Retorna: (sentimiento, score, detalles_emojis)
     """
-    text_lower = text.lower()
-    tokens = text_lower.split()
+    normalized = text_tokens.get(text)
+    text_lower = normalized.lower
+    tokens = normalized.words
 
-    # ── 1. Frases multi-palabra ──
-    neg_phrase_score, neg_phrases = _score_phrases(text_lower, NEGATIVE_PHRASES)
-    pos_phrase_score, pos_phrases = _score_phrases(text_lower, POSITIVE_PHRASES)
+    # ── 1. Frases multi-palabra (con límites de palabra) ──
+    found_phrases = _PHRASE_MATCHER.find(text_lower)
+    neg_phrase_score, neg_phrases = _score_phrases(found_phrases, NEGATIVE_PHRASES)
+    pos_phrase_score, pos_phrases = _score_phrases(found_phrases, POSITIVE_PHRASES)
 
     # ── 2. Palabras individuales con contexto ──
     pos_word_score, neg_word_score = _score_words_with_context(text_lower, tokens)
 
-    # ── 3. Sarcasmo: si hay marcadores positivos junto con señales negativas, neutralizar ──
+    # ── 3. Sarcasmo ──
+    pos_word_score = _discount_sarcasm(text_lower, pos_word_score, neg_phrase_score, neg_word_score)
+
+    # ── 4. Emojis ──
+    emoji_pos, emoji_neg, emoji_details = count_emojis(text)
+
+    # ── 5. TextBlob ──
+    tb_polarity = _textblob_polarity(text)
+
+    sentiment, score = _combine_scores(
+        pos_word_score, neg_word_score, pos_phrase_score, neg_phrase_score,
+        emoji_pos, emoji_neg, tb_polarity,
+    )
+    return sentiment, score, emoji_details
+
+
+def _discount_sarcasm(text_lower, pos_word_score, neg_phrase_score, neg_word_score):
+    """Si hay marcadores positivos junto con señales negativas, neutralizar su aporte."""
     has_negative_signal = neg_phrase_score > 0 or neg_word_score > 0
     if has_negative_signal:
         for marker in SARCASM_MARKERS:
@@ -290,18 +320,36 @@ def analyze_sentiment(text):
                 # Descontar el aporte positivo del marcador
                 if marker in POSITIVE_WORDS:
                     pos_word_score = max(0, pos_word_score - POSITIVE_WORDS[marker])
+    return pos_word_score
 
-    # ── 4. Emojis ──
-    emoji_pos, emoji_neg, emoji_details = count_emojis(text)
 
-    # ── 5. TextBlob ──
+@lru_cache(maxsize=1)
+def _textblob_class():
+    """TextBlob si LEXICON_TEXTBLOB=true y está instalado; si no, None."""
+    if not LEXICON_TEXTBLOB:
+        return None
+    try:
+        from textblob import TextBlob
+        return TextBlob
+    except ImportError:
+        print("⚠️  LEXICON_TEXTBLOB=true pero textblob no está instalado; se ignora.")
+        return None
+
+
+def _textblob_polarity(text):
+    TextBlob = _textblob_class()
+    if TextBlob is None:
+        return 0
     try:
         blob = TextBlob(text)
-        tb_polarity = blob.sentiment.polarity
+        return blob.sentiment.polarity
     except Exception:
-        tb_polarity = 0
+        return 0
+
 
-    # ── Score combinado (ponderado) ──
+def _combine_scores(pos_word_score, neg_word_score, pos_phrase_score, neg_phrase_score,
+                    emoji_pos, emoji_neg, tb_polarity):
+    """Score combinado (ponderado) → (sentimiento, score redondeado)."""
     word_component = (pos_word_score - neg_word_score) * 0.40
     phrase_component = (pos_phrase_score - neg_phrase_score) * 0.25
     emoji_component = (emoji_pos - emoji_neg) * 0.25
@@ -316,7 +364,130 @@ def analyze_sentiment(text):
     else:
         sentiment = "neutro"
 
-    return sentiment, round(combined_score, 3), emoji_details
+    return sentiment, round(combined_score, 3)
+
+
+# ═══════════════════════════════════════════════════════════════
+#  ANÁLISIS DE SENTIMIENTO EN BATCH (vectorizado con NumPy)
+# ═══════════════════════════════════════════════════════════════
+
+@lru_cache(maxsize=1)
+def _lexicon_arrays():
+    """
+    Vocabulario del léxico → id entero (0 = fuera del léxico) y, por id:
+    es_negación, es_intensificador, multiplicador, peso negativo, peso positivo.
+    Misma precedencia que _score_words_with_context: negación > intensificador > palabra.
+    """
+    import numpy as np
+
+    vocab = {}
+    for table in (NEGATIONS, INTENSIFIERS, NEGATIVE_WORDS, POSITIVE_WORDS):
+        for token in table:
+            vocab.setdefault(token, len(vocab) + 1)
+
+    size = len(vocab) + 1
+    is_negation = np.zeros(size, dtype=bool)
+    is_intensifier = np.zeros(size, dtype=bool)
+    multiplier = np.ones(size)
+    neg_weight = np.zeros(size)
+    pos_weight = np.zeros(size)
+    for token, i in vocab.items():
+        if token in NEGATIONS:
+            is_negation[i] = True
+        elif token in INTENSIFIERS:
+            is_intensifier[i] = True
+            multiplier[i] = INTENSIFIERS[token]
+        else:
+            weight = NEGATIVE_WORDS.get(token, 0) or POSITIVE_WORDS.get(token, 0)
+            if token in NEGATIVE_WORDS:
+                neg_weight[i] = weight
+            else:
+                pos_weight[i] = weight
+    return vocab, is_negation, is_intensifier, multiplier, neg_weight, pos_weight
+
+
+def _score_words_batch(token_lists):
+    """
+    Versión vectorizada de _score_words_with_context para muchos textos.
+    Retorna (pos_scores, neg_scores) como arrays, uno por texto, idénticos
+    al cálculo escalar.
+    """
+    import numpy as np
+
+    vocab, is_negation, is_intensifier, multiplier, neg_weight, pos_weight = _lexicon_arrays()
+    n_docs = len(token_lists)
+    lengths = np.fromiter((len(t) for t in token_lists), dtype=np.int64, count=n_docs)
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(n_docs), np.zeros(n_docs)
+
+    ids = np.fromiter((vocab.get(tok, 0) for toks in token_lists for tok in toks),
+                      dtype=np.int64, count=total)
+    doc = np.repeat(np.arange(n_docs), lengths)
+    doc_start = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    position = np.arange(total)
+
+    neg_tok = is_negation[ids]
+    int_tok = is_intensifier[ids]
+    content = ~(neg_tok | int_tok)            # tokens que consumen modificadores
+    content_upto = np.cumsum(content)          # tokens de contenido hasta i (inclusive)
+    content_before = content_upto - content    # ... hasta i (exclusive)
+
+    # Negación: afecta las 2 palabras de contenido siguientes a la última negación del texto
+    last_neg = np.maximum.accumulate(np.where(neg_tok, position, -1))
+    negated = (last_neg >= doc_start) & (content_before - content_upto[last_neg] < 2)
+
+    # Intensificador: vale para la primera palabra de contenido después de él
+    last_int = np.maximum.accumulate(np.where(int_tok, position, -1))
+    boosted = (last_int >= doc_start) & (content_before == content_upto[last_int])
+    mult = np.where(boosted, multiplier[ids[last_int]], 1.0)
+
+    w_neg = neg_weight[ids] * mult
+    w_pos = pos_weight[ids] * mult
+    pos_contrib = np.where(negated, w_neg * 0.7, w_pos)
+    neg_contrib = np.where(negated, w_pos * 0.7, w_neg)
+    pos_contrib[~content] = 0.0
+    neg_contrib[~content] = 0.0
+
+    # bincount acumula en orden → mismas sumas de punto flotante que el loop escalar
+    pos_scores = np.bincount(doc, weights=pos_contrib, minlength=n_docs)
+    neg_scores = np.bincount(doc, weights=neg_contrib, minlength=n_docs)
+    return pos_scores, neg_scores
+
+
+def analyze_sentiment_batch(texts, tweet_ids=None):
+    """
+    analyze_sentiment() para una lista de textos: tokeniza todo una vez y
+    calcula palabras/negaciones/intensificadores del corpus entero con NumPy.
+    Con `tweet_ids` (alineados con `texts`) la normalización queda cacheada
+    por tweet y el reporte la reutiliza.
+    Retorna una lista de (sentimiento, score, detalles_emojis), idéntica a
+    llamar analyze_sentiment() texto por texto.
+    """
+    ids = tweet_ids if tweet_ids is not None else [None] * len(texts)
+    normalized = [text_tokens.get(text, tid) for text, tid in zip(texts, ids)]
+    lowered = [n.lower for n in normalized]
+    pos_words, neg_words = _score_words_batch([n.words for n in normalized])
+
+    results = []
+    for i, (text, text_lower) in enumerate(zip(texts, lowered)):
+        found_phrases = _PHRASE_MATCHER.find(text_lower)
+        neg_phrase_score, _ = _score_phrases(found_phrases, NEGATIVE_PHRASES)
+        pos_phrase_score, _ = _score_phrases(found_phrases, POSITIVE_PHRASES)
+
+        pos_word_score = float(pos_words[i])
+        neg_word_score = float(neg_words[i])
+        pos_word_score = _discount_sarcasm(text_lower, pos_word_score, neg_phrase_score, neg_word_score)
+
+        emoji_pos, emoji_neg, emoji_details = count_emojis(text)
+        tb_polarity = _textblob_polarity(text)
+
+        sentiment, score = _combine_scores(
+            pos_word_score, neg_word_score, pos_phrase_score, neg_phrase_score,
+            emoji_pos, emoji_neg, tb_polarity,
+        )
+        results.append((sentiment, score, emoji_details))
+    return results
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -590,7 +761,7 @@ def load_multi_cookies_from_secret():
 
 def create_client():
     """Crea un Client de twikit. La inicialización de client_transaction se hace automáticamente."""
-    return Client("es-AR", user_agent=USER_AGENT)
+    return _twikit_client_class()("es-AR", user_agent=USER_AGENT)
 
 
 async def setup_multi_clients(cookie_accounts):
@@ -655,11 +826,223 @@ def save_multi_cookies(clients_info):
 #  SCRAPING
 # ═══════════════════════════════════════════════════════════════
 
-async def search_keyword_with_client(client, keyword, since_date, until_date, seen_ids=None):
+def _summarize_keyword(keyword_data):
+    """Recalcula sentiment_summary, emoji_stats y total_found a partir de los posts."""
+    summary = {"positivo": 0, "negativo": 0, "neutro": 0}
+    emoji_stats = {"total_positive_emojis": 0, "total_negative_emojis": 0, "top_emojis": {}}
+    emoji_counter = {}
+
+    for post in keyword_data["posts"]:
+        summary[post["sentiment"]] += 1
+        for ed in post.get("emojis_found", []):
+            emoji = ed["emoji"]
+            emoji_counter[emoji] = emoji_counter.get(emoji, 0) + ed["count"]
+            if ed["type"] == "positivo":
+                emoji_stats["total_positive_emojis"] += ed["count"]
+            else:
+                emoji_stats["total_negative_emojis"] += ed["count"]
+
+    top_emojis = sorted(emoji_counter.items(), key=lambda x: x[1], reverse=True)[:10]
+    emoji_stats["top_emojis"] = dict(top_emojis)
+
+    keyword_data["sentiment_summary"] = summary
+    keyword_data["emoji_stats"] = emoji_stats
+    keyword_data["total_found"] = len(keyword_data["posts"])
+    return keyword_data
+
+
+# ── Modo incremental ──
+
+def load_previous_data():
+    """Carga el DATA_FILE de la corrida anterior, o None si no existe / está roto."""
+    if not os.path.exists(DATA_FILE):
+        return None
+    try:
+        with open(DATA_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"⚠️  No se pudo leer {DATA_FILE} ({e}), se hace búsqueda completa.")
+        return None
+
+
+def _high_water_marks(previous):
+    """
+    Marca de agua por keyword a partir del dataset previo.
+    Retorna {keyword: {"date": str, "ids": set}}; solo incluye keywords
+    con posts guardados.
+    """
+    marks = {}
+    for kw in (previous or {}).get("keywords", []):
+        posts = kw.get("posts", [])
+        if not posts:
+            continue
+        ids = {str(p["id"]) for p in posts}
+        marks[kw["keyword"]] = {
+            "date": max(p.get("date", "") for p in posts),
+            "ids": ids,
+        }
+    return marks
+
+
+def _is_known_tweet(tweet_id, high_water):
+    """True si el tweet está guardado en el dataset previo (un id más viejo que
+    no se guardó, p.ej. por el tope por keyword, no cuenta como conocido)."""
+    return str(tweet_id) in high_water["ids"]
+
+
+def merge_incremental(data, previous):
+    """
+    Fusiona in-place los posts recién bajados en `data` con los del dataset
+    previo (dedup por id, orden por fecha desc) y recalcula los resúmenes.
+    Se descartan posts previos anteriores al inicio del período actual.
+    Una keyword sin resultado en esta corrida (p.ej. fallaron todas las
+    cuentas antes de buscarla) conserva sus posts guardados.
+    """
+    since_date = data["period"]["from"]
+    prev_by_kw = {kw["keyword"]: kw for kw in (previous or {}).get("keywords", [])}
+
+    searched = {kw["keyword"] for kw in data["keywords"]}
+    for keyword in KEYWORDS:
+        if keyword in searched or keyword not in prev_by_kw:
+            continue
+        data["keywords"].append({
+            "keyword": keyword,
+            "posts": [],
+            "error": "Sin búsqueda en esta corrida, se muestran los datos guardados",
+        })
+    data["keywords"].sort(key=lambda kw: KEYWORDS.index(kw["keyword"]))
+
+    for kw in data["keywords"]:
+        prev = prev_by_kw.get(kw["keyword"])
+        if not prev:
+            continue
+        new_ids = {str(p["id"]) for p in kw["posts"]}
+        old_posts = [
+            p for p in prev.get("posts", [])
+            if str(p["id"]) not in new_ids and p.get("date", "")[:10] >= since_date
+        ]
+        n_new = len(kw["posts"])
+        kw["posts"] = kw["posts"] + old_posts
+        kw["posts"].sort(key=lambda x: x["date"], reverse=True)
+        _summarize_keyword(kw)
+        print(f"  📥 #{kw['keyword'].upper()}: {n_new} nuevos + {len(old_posts)} guardados = {kw['total_found']}")
+    return data
+
+
+def _search_query(keyword, since_date, until_date):
+    return f"{keyword} lang:es since:{since_date} until:{until_date}"
+
+
+# ── Modo por ventanas de fechas ──
+
+def _date_windows(since_date, until_date, size):
+    """
+    Parte [since_date, until_date) en ventanas semanales o mensuales
+    ("week" / "month"), de la más nueva a la más vieja. `until` es
+    exclusivo, como en la query de búsqueda.
+    """
+    start = datetime.strptime(since_date, "%Y-%m-%d").date()
+    end = datetime.strptime(until_date, "%Y-%m-%d").date()
+    windows = []
+    while start < end:
+        if size == "month":
+            nxt = (start.replace(day=1) + timedelta(days=32)).replace(day=1)
+        else:
+            nxt = start + timedelta(days=7)
+        nxt = min(nxt, end)
+        windows.append((start.isoformat(), nxt.isoformat()))
+        start = nxt
+    return windows[::-1] or [(since_date, until_date)]
+
+
+def _shard_key(keyword, window):
+    """Clave del trabajo en el log crudo, checkpoints y resultados: keyword o keyword@desde."""
+    return f"{keyword}@{window[0]}" if window else keyword
+
+
+def _merge_shards(keyword, shards):
+    """Une las ventanas de una keyword: dedup por id, orden por fecha desc y resúmenes."""
+    keyword_data = {"keyword": keyword, "posts": []}
+    ids = set()
+    for shard in shards:
+        for post in shard["posts"]:
+            if str(post["id"]) not in ids:
+                ids.add(str(post["id"]))
+                keyword_data["posts"].append(post)
+    keyword_data["posts"].sort(key=lambda x: x["date"], reverse=True)
+    _summarize_keyword(keyword_data)
+    errors = [shard["error"] for shard in shards if "error" in shard]
+    if errors:
+        print(f"  ⚠️ #{keyword.upper()}: {len(errors)}/{len(shards)} ventana(s) con error ({errors[0]})")
+        if len(errors) == len(shards):
+            keyword_data["error"] = errors[0]
+    print(f"  🧩 #{keyword.upper()}: {len(shards)} ventana(s) → {keyword_data['total_found']} tweets")
+    return keyword_data
+
+
+RATE_LIMIT_RETRIES = 3  # reintentos por pedido ante 429 (la pausa la decide el limitador)
+
+
+async def _limited_request(limiter, tag, request, health=None):
+    """
+    Hace `request()` (búsqueda o página siguiente) respetando el rate limiter
+    de la cuenta. Ante un 429 la cuenta entera se pausa (hasta el reset que
+    informa X, o con backoff + jitter) y se reintenta. Retorna None si sigue
+    en 429 después de los reintentos; otros errores se propagan.
+    Con `health` (AccountHealth) se registran latencia y 429.
+    """
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        await limiter.acquire()
+        started = time.monotonic()
+        try:
+            result = await request()
+        except Exception as e:
+            if not is_rate_limited(e):
+                raise
+            if health:
+                health.record_rate_limited()
+            wait = limiter.on_rate_limited(rate_limit_reset(e))
+            metrics.inc("rate_limited", account=limiter.name)
+            metrics.observe("rate_limit_wait", wait, account=limiter.name)
+            if attempt == RATE_LIMIT_RETRIES:
+                return None
+            print(f"    {tag} (429, @{limiter.name} en pausa {wait:.0f}s...)", flush=True)
+            continue
+        limiter.on_success()
+        latency = time.monotonic() - started
+        if health:
+            health.record_request(latency)
+        metrics.observe("search_request", latency, account=limiter.name)
+        return result
+    return None
+
+
+async def search_keyword_with_client(client, keyword, since_date, until_date, seen_ids=None, high_water=None,
+                                     raw_log=None, checkpoints=None, resume_from=None, limiter=None, health=None,
+                                     key=None):
     """Busca un keyword con un client específico. Retorna keyword_data.
-    seen_ids: set compartido entre búsquedas para evitar tweets duplicados."""
+    seen_ids:   set compartido entre búsquedas para evitar tweets duplicados.
+    high_water: marca de agua del dataset previo (modo incremental), ver
+                _high_water_marks(). Si una página trae solo tweets ya
+                conocidos, se deja de paginar.
+    raw_log:    RawTweetLog de la corrida; cada tweet se agrega apenas se
+                baja, y lo ya capturado para la keyword (corrida anterior
+                cortada, o intento fallido con otra cuenta) se incluye.
+    checkpoints: SearchCheckpoints; después de cada página se guarda el
+                cursor de la siguiente.
+    resume_from: checkpoint pendiente de la keyword: se sigue con su query
+                desde su cursor en vez de empezar por la primera página.
+                Las páginas que faltan son más viejas que lo guardado, así
+                que al reanudar no se usa `high_water` (cortaría enseguida).
+    limiter:    AccountRateLimiter de la cuenta (compartido entre sus keywords).
+    health:     AccountHealth de la cuenta (latencia y 429 de cada pedido).
+    key:        clave en raw_log/checkpoints; por defecto la keyword, en el
+                modo por ventanas "keyword@desde" (ver _shard_key)."""
     if seen_ids is None:
         seen_ids = set()
+    key = key or keyword
+    if limiter is None:
+        limiter = AccountRateLimiter()
     keyword_data = {
         "keyword": keyword,
         "posts": [],
@@ -668,68 +1051,71 @@ async def search_keyword_with_client(client, keyword, since_date, until_date, se
         "total_found": 0
     }
 
-    try:
-        tweet_list = []
-        all_emoji_counter = {}
-        query = f"{keyword} lang:es since:{since_date} until:{until_date}"
+    tag = f"#{key.upper()}"
 
-        # ── Búsqueda inicial con retry ante 429 ──
-        tweets = None
-        for attempt in range(2):
-            try:
-                tweets = await client.search_tweet(query, "Latest")
-                break
-            except Exception as init_err:
-                if "429" in str(init_err):
-                    wait = 60 * (attempt + 1)
-                    print(f" (429, esperando {wait}s...)", end="", flush=True)
-                    await asyncio.sleep(wait)
-                else:
-                    raise
+    try:
+        tweet_list = raw_log.captured(key) if raw_log else []
+        logged_ids = {t["id"] for t in tweet_list}  # ya capturados: no cuentan como página vacía
+        query = _search_query(keyword, since_date, until_date)
+
+        # ── Reanudar desde el último cursor guardado ──
+        cursor = None
+        already = 0  # tweets de páginas anteriores que no están en tweet_list (ya guardados)
+        if resume_from:
+            high_water = None
+            query, cursor = resume_from["query"], resume_from["cursor"]
+            already = max(0, resume_from.get("fetched", 0) - len(tweet_list))
+            print(f"    {tag} reanudando desde el cursor guardado ({resume_from.get('fetched', 0)} tweets ya bajados)",
+                  flush=True)
+        max_tweets = MAX_TWEETS_PER_KEYWORD - already
+
+        # ── Búsqueda inicial (rate limiter de la cuenta, retry ante 429) ──
+        tweets = await _limited_request(limiter, tag, lambda: client.search_tweet(query, "Latest", cursor=cursor),
+                                        health)
 
         if not tweets:
-            print(f" → No se pudo iniciar búsqueda (rate limit)")
+            print(f"    {tag} → No se pudo iniciar búsqueda (rate limit)")
             keyword_data["error"] = "Rate limit en búsqueda inicial"
             return keyword_data
 
         empty_pages = 0  # Páginas consecutivas sin tweets nuevos
+        interrupted = False  # la paginación se cortó antes de terminar (queda el checkpoint)
 
         while tweets:
             count_before = len(tweet_list)
+            page_all_known = high_water is not None
+            page_logged = 0
 
             for tweet in tweets:
-                if len(tweet_list) >= MAX_TWEETS_PER_KEYWORD:
+                if high_water is not None and not _is_known_tweet(tweet.id, high_water):
+                    page_all_known = False
+
+                if len(tweet_list) >= max_tweets:
                     break
 
-                # Saltar tweets ya vistos (duplicados dentro o entre búsquedas)
+                # Saltar tweets ya vistos (duplicados dentro o entre búsquedas).
+                # Chequeo y alta van sin `await` en el medio: con varias keywords
+                # corriendo como tareas asyncio, nadie puede intercalarse acá.
                 if tweet.id in seen_ids:
+                    if tweet.id in logged_ids:
+                        page_logged += 1
+                    else:
+                        metrics.inc("duplicates_skipped", keyword=keyword)
                     continue
                 seen_ids.add(tweet.id)
 
-                # Clasificación con pysentimiento v2 (con regla de cuentas neutras)
-                _username = tweet.user.screen_name if tweet.user else None
-                _v2 = _classify_v2(tweet.text, username=_username)
-                sentiment = _v2["sentiment"]
-                score = _v2["score"]
+                # El sentimiento se completa al final, en un solo batch por keyword.
                 # Emojis se siguen contando aparte para las estadísticas del dashboard
                 _, _, emoji_details = count_emojis(tweet.text)
 
-                for ed in emoji_details:
-                    emoji = ed["emoji"]
-                    all_emoji_counter[emoji] = all_emoji_counter.get(emoji, 0) + ed["count"]
-                    if ed["type"] == "positivo":
-                        keyword_data["emoji_stats"]["total_positive_emojis"] += ed["count"]
-                    else:
-                        keyword_data["emoji_stats"]["total_negative_emojis"] += ed["count"]
-
                 tweet_info = {
                     "id": tweet.id,
                     "text": tweet.text,
                     "user": tweet.user.name if tweet.user else "Desconocido",
                     "username": tweet.user.screen_name if tweet.user else "unknown",
                     "date": str(tweet.created_at_datetime) if tweet.created_at_datetime else str(tweet.created_at),
-                    "sentiment": sentiment,
-                    "sentiment_score": score,
+                    "sentiment": None,
+                    "sentiment_score": None,
                     "emojis_found": emoji_details,
                     "likes": tweet.favorite_count or 0,
                     "retweets": tweet.retweet_count or 0,
@@ -737,81 +1123,254 @@ async def search_keyword_with_client(client, keyword, since_date, until_date, se
                     "url": f"https://x.com/{tweet.user.screen_name}/status/{tweet.id}" if tweet.user else None
                 }
                 tweet_list.append(tweet_info)
-                keyword_data["sentiment_summary"][sentiment] += 1
+                if raw_log:
+                    raw_log.append(key, tweet_info)
 
             new_tweets = len(tweet_list) - count_before
-            print(f" → {len(tweet_list)}...", end="", flush=True)
+            metrics.inc("pages", keyword=keyword)
+            metrics.inc("tweets_fetched", new_tweets, keyword=keyword)
+            print(f"    {tag} → {len(tweet_list)}...", flush=True)
+            if checkpoints:
+                checkpoints.update(key, query, getattr(tweets, "next_cursor", None), len(tweet_list) + already)
 
-            if len(tweet_list) >= MAX_TWEETS_PER_KEYWORD:
+            if len(tweet_list) >= max_tweets:
+                break
+
+            # Incremental: la página ya no trae nada posterior a lo guardado
+            if page_all_known:
+                print(f"    {tag} (alcanzó tweets ya guardados, cortando)", flush=True)
                 break
 
             # Cortar si no hay tweets nuevos en 3 páginas consecutivas
-            if new_tweets == 0:
+            if new_tweets == 0 and not page_logged:
                 empty_pages += 1
                 if empty_pages >= 3:
-                    print(" (sin tweets nuevos, cortando)", end="", flush=True)
+                    print(f"    {tag} (sin tweets nuevos, cortando)", flush=True)
                     break
             else:
                 empty_pages = 0
 
-            # ── Paginación con retry ante 429 ──
-            next_page = None
-            for attempt in range(2):
-                try:
-                    next_page = await tweets.next()
-                    break
-                except Exception as page_err:
-                    if "429" in str(page_err):
-                        wait = 60 * (attempt + 1)
-                        print(f" (429, esperando {wait}s...)", end="", flush=True)
-                        await asyncio.sleep(wait)
-                    else:
-                        break
+            # ── Paginación (el limitador marca el ritmo, retry ante 429) ──
+            try:
+                next_page = await _limited_request(limiter, tag, tweets.next, health)
+            except Exception:
+                next_page = None
 
             if next_page is None:
+                interrupted = True
+                if checkpoints:
+                    print(f"    {tag} (paginación cortada, se guardó el cursor para reanudar)", flush=True)
                 break
             tweets = next_page
 
-            await asyncio.sleep(3)
+        if checkpoints and not interrupted:
+            checkpoints.complete(key, query, len(tweet_list) + already)
 
-        tweet_list.sort(key=lambda x: x["date"], reverse=True)
-        keyword_data["posts"] = tweet_list
-        keyword_data["total_found"] = len(tweet_list)
+        await _finish_keyword(keyword_data, tweet_list)
 
-        top_emojis = sorted(all_emoji_counter.items(), key=lambda x: x[1], reverse=True)[:10]
-        keyword_data["emoji_stats"]["top_emojis"] = dict(top_emojis)
+    except Exception as e:
+        print(f"    {tag} → Error: {e}")
+        keyword_data["error"] = str(e)
 
-        print(f" → {len(tweet_list)} tweets ✓")
-        s = keyword_data["sentiment_summary"]
-        es = keyword_data["emoji_stats"]
-        print(f"      Sentimiento: +{s['positivo']} ~{s['neutro']} -{s['negativo']}")
-        if es["total_positive_emojis"] or es["total_negative_emojis"]:
-            top_3 = " ".join([e for e, _ in top_emojis[:5]])
-            print(f"      Emojis: 😊{es['total_positive_emojis']} 😡{es['total_negative_emojis']}  Top: {top_3}")
+    return keyword_data
 
+
+async def _finish_keyword(keyword_data, tweet_list):
+    """Clasifica los tweets de la keyword, arma los resúmenes y los imprime."""
+    tag = f"#{keyword_data['keyword'].upper()}"
+
+    # ── Clasificación con pysentimiento v2 (batch, con regla de cuentas neutras) ──
+    # Corre en un thread para que las búsquedas de otras cuentas sigan paginando.
+    if tweet_list:
+        print(f"    {tag} clasificando {len(tweet_list)} tweets...", flush=True)
+        with metrics.timer("classification", keyword=keyword_data["keyword"]):
+            v2_results = await asyncio.to_thread(_classify_posts_v2, tweet_list)
+        metrics.inc("tweets_classified", len(tweet_list), keyword=keyword_data["keyword"])
+        for tweet_info, v2 in zip(tweet_list, v2_results):
+            tweet_info["sentiment"] = v2["sentiment"]
+            tweet_info["sentiment_score"] = v2["score"]
+
+    keyword_data["posts"] = tweet_list
+    _summarize_keyword(keyword_data)
+    tweet_list.sort(key=lambda x: x["date"], reverse=True)
+    top_emojis = list(keyword_data["emoji_stats"]["top_emojis"].items())
+
+    print(f"    {tag} → {len(tweet_list)} tweets ✓")
+    s = keyword_data["sentiment_summary"]
+    es = keyword_data["emoji_stats"]
+    print(f"      {tag} Sentimiento: +{s['positivo']} ~{s['neutro']} -{s['negativo']}")
+    if es["total_positive_emojis"] or es["total_negative_emojis"]:
+        top_3 = " ".join([e for e, _ in top_emojis[:5]])
+        print(f"      {tag} Emojis: 😊{es['total_positive_emojis']} 😡{es['total_negative_emojis']}  Top: {top_3}")
+    return keyword_data
+
+
+async def _keyword_from_log(keyword, raw_log, key=None):
+    """keyword_data de una keyword (o ventana, `key`) que la corrida anterior ya había terminado de buscar."""
+    key = key or keyword
+    keyword_data = {
+        "keyword": keyword,
+        "posts": [],
+        "sentiment_summary": {"positivo": 0, "negativo": 0, "neutro": 0},
+        "emoji_stats": {"total_positive_emojis": 0, "total_negative_emojis": 0, "top_emojis": {}},
+        "total_found": 0
+    }
+    print(f"\n  ♻️  #{key.upper()} ya estaba completa en el log ({len(raw_log.posts.get(key, []))} tweets)", flush=True)
+    try:
+        await _finish_keyword(keyword_data, raw_log.captured(key))
     except Exception as e:
-        print(f" → Error: {e}")
+        print(f"    #{key.upper()} → Error: {e}")
         keyword_data["error"] = str(e)
-
     return keyword_data
 
 
+async def _search_newer(info, pool, keyword, key, since_date, until_date, seen_ids, high_water, resumed,
+                        raw_log=None, checkpoints=None):
+    """
+    Después de terminar una paginación reanudada (páginas viejas), busca
+    desde la primera página los tweets publicados desde entonces, hasta
+    llegar a lo que bajó la paginación reanudada (o a lo ya guardado, si
+    hay `high_water` del modo incremental).
+    Retorna la unión de ambas búsquedas (o solo `resumed` si esta falla).
+    """
+    print(f"    #{key.upper()} buscando tweets más nuevos que los reanudados...", flush=True)
+    resumed_ids = {str(p["id"]) for p in resumed["posts"]}
+    if high_water:
+        known = {**high_water, "ids": high_water["ids"] | resumed_ids}
+    else:
+        known = {"date": None, "ids": resumed_ids}
+    newer = await search_keyword_with_client(info["client"], keyword, since_date, until_date, seen_ids, known,
+                                             raw_log, checkpoints, None, _account_limiter(info),
+                                             pool.health[info["username"]], key)
+    if "error" in newer:
+        print(f"    #{key.upper()} → no se pudieron buscar los más nuevos ({newer['error']}), quedan los reanudados")
+        return resumed
+    return _merge_shards(keyword, [resumed, newer])
+
+
+def _is_auth_error(error_msg):
+    """Errores que indican una cuenta inutilizable (suspendida, cookies vencidas, etc.)."""
+    return bool(error_msg) and ("404" in error_msg or "401" in error_msg or "403" in error_msg)
+
+
+def _account_limiter(info):
+    """Rate limiter de la cuenta (se crea la primera vez que se usa)."""
+    if "limiter" not in info:
+        info["limiter"] = AccountRateLimiter(info["username"])
+    return info["limiter"]
+
+
+async def _run_account_worker(info, pool, since_date, until_date, seen_ids, results, high_waters=None,
+                              raw_log=None, checkpoints=None):
+    """
+    Worker de una cuenta: toma trabajo del AccountPool hasta que no quede
+    nada. Cada trabajo es (keyword, ventana): ventana None busca el período
+    entero; en el modo por ventanas es (desde, hasta) y el resultado queda en
+    `results` bajo _shard_key(keyword, ventana). Los workers de todas las cuentas corren como tareas asyncio, así
+    que las búsquedas de distintas cuentas avanzan en paralelo; una cuenta
+    que termina su cola le saca keywords pendientes a la más atrasada.
+
+    Si la cuenta falla por auth (401/403/404) deja de tomar trabajo: la
+    keyword (una sola vez) y el resto de su cola pasan a la cuenta más sana.
+
+    Con `high_waters` (modo incremental) la query de cada keyword arranca en
+    el día del tweet más nuevo ya guardado.
+
+    Con `raw_log`, las keywords que una corrida anterior (cortada) ya había
+    terminado salen del log sin volver a buscarse.
+
+    Con `checkpoints`, una keyword que quedó a medias sigue desde su último
+    cursor: siempre en modo RESUME, y al retomar el log crudo o al pasar a
+    otra cuenta solo si la query es la misma.
+
+    Los pedidos pasan por el AccountRateLimiter de la cuenta (info["limiter"]),
+    el mismo para todas las keywords que busque.
+    """
+    high_waters = high_waters or {}
+    name = info["username"]
+    label = f" (@{name})" if name != "default" else ""
+    while True:
+        item = await pool.take(info)
+        if item is None:
+            return
+        (keyword, window), stolen_from = item
+        key = _shard_key(keyword, window)
+        try:
+            if raw_log and key in raw_log.done:
+                results[key] = await _keyword_from_log(keyword, raw_log, key)
+                continue
+
+            high_water = high_waters.get(keyword)
+            if window:
+                kw_since, kw_until = window
+            else:
+                kw_since = max(since_date, high_water["date"][:10]) if high_water else since_date
+                kw_until = until_date
+
+            note = f" ← tomada de @{stolen_from}" if stolen_from else ""
+            span = f" [{kw_since} → {kw_until})" if window else ""
+            print(f"\n  [{KEYWORDS.index(keyword) + 1}/{len(KEYWORDS)}] Buscando: #{keyword.upper()}{span}{label}{note}",
+                  flush=True)
+
+            query = _search_query(keyword, kw_since, kw_until)
+            resume_from = None
+            if checkpoints:
+                if RESUME_MODE:
+                    resume_from = checkpoints.pending(key)
+                elif item[0] in pool.retried or (raw_log and raw_log.resumed):
+                    # Sigue desde la última página que bajó la cuenta que falló
+                    resume_from = checkpoints.pending(key, query)
+
+            started = time.monotonic()
+            keyword_data = await search_keyword_with_client(info["client"], keyword, kw_since, kw_until, seen_ids,
+                                                            high_water, raw_log, checkpoints, resume_from,
+                                                            _account_limiter(info), pool.health[name], key)
+            if resume_from and "error" not in keyword_data and not checkpoints.pending(key):
+                keyword_data = await _search_newer(info, pool, keyword, key, kw_since, kw_until, seen_ids,
+                                                   high_water, keyword_data, raw_log, checkpoints)
+            # Si dio error 404 o de auth, la cuenta sale del pool y la keyword pasa a otra
+            error_msg = keyword_data.get("error", "")
+            if not _is_auth_error(error_msg):
+                pool.health[name].record_keyword(len(keyword_data["posts"]), time.monotonic() - started)
+            else:
+                print(f"\n  ⚠️ Cuenta @{name} falló ({error_msg}), reasignando sus keywords...")
+                target = await pool.fail_account(info, item[0])
+                if target:
+                    print(f"  🔄 Reintentando #{keyword.upper()} con @{target['username']}", flush=True)
+                    continue
+                if not pool.healthiest():
+                    print(f"\n  ⚠️ Todas las cuentas fallaron, no se puede buscar #{keyword.upper()}")
+
+            results[key] = keyword_data
+            if raw_log and "error" not in keyword_data:
+                raw_log.mark_done(key)
+
+            if PAUSE_BETWEEN_KEYWORDS > 0:
+                await asyncio.sleep(PAUSE_BETWEEN_KEYWORDS)
+        finally:
+            await pool.done()
+
+
 async def scrape_tweets():
-    """Scraping principal con distribución de keywords entre cuentas."""
+    """Scraping principal: las keywords se reparten entre cuentas y cada cuenta
+    procesa su cola en paralelo con las demás."""
 
     # ── Intentar cargar multi-cuenta ──
     clients_info = []
     if CI_MODE:
         cookie_accounts = load_multi_cookies_from_secret()
         if cookie_accounts:
-            clients_info = await setup_multi_clients(cookie_accounts)
+            with metrics.timer("login"):
+                clients_info = await setup_multi_clients(cookie_accounts)
 
     # ── Fallback: cuenta única (legacy) ──
     if not clients_info:
         account_mgr = AccountManager()
         client = create_client()
 
-        if not await do_login(client, account_mgr):
+        with metrics.timer("login"):
+            logged_in = await do_login(client, account_mgr)
+        if not logged_in:
             print("\n❌ No se pudo autenticar con Twitter/X.")
             if CI_MODE:
                 print("   Revisá el secret TWITTER_COOKIES.")
@@ -835,57 +1394,94 @@ async def scrape_tweets():
     print("\n" + "═" * 60)
     print("  🔍 BUSCANDO TWEETS")
     if n_clients > 1:
-        print(f"  🔄 {n_clients} cuentas — keywords distribuidas:")
+        print(f"  🔄 {n_clients} cuentas — keywords distribuidas (se rebalancean según la salud de cada cuenta):")
         for i, kw in enumerate(KEYWORDS):
             acc = clients_info[i % n_clients]
             print(f"     {kw.upper()} → @{acc['username']}")
     print("═" * 60)
 
-    seen_ids = set()  # IDs de tweets ya procesados (evita duplicados entre keywords)
-    failed_accounts = set()  # Cuentas que dieron error (404, suspendidas, etc.)
-
-    for i, keyword in enumerate(KEYWORDS):
-        # Elegir cuenta, saltando las que fallaron
-        info = None
-        if n_clients > 1:
-            original_idx = i % n_clients
-            for offset in range(n_clients):
-                candidate = clients_info[(original_idx + offset) % n_clients]
-                if candidate["username"] not in failed_accounts:
-                    info = candidate
-                    break
-            if info is None:
-                print(f"\n  ⚠️ Todas las cuentas fallaron, no se puede buscar #{keyword.upper()}")
-                continue
-        else:
-            info = clients_info[0]
+    if SHARD_WINDOW not in ("", "week", "month"):
+        print(f"  ⚠️ SHARD_WINDOW={SHARD_WINDOW!r} no válido (week | month), se busca el período entero")
+    shard_window = SHARD_WINDOW if SHARD_WINDOW in ("week", "month") else ""
 
-        client = info["client"]
-        label = f"@{info['username']}" if info["username"] != "default" else ""
-
-        print(f"\n  [{i+1}/{len(KEYWORDS)}] Buscando: #{keyword.upper()}{' (' + label + ')' if label else ''}", end="", flush=True)
-
-        keyword_data = await search_keyword_with_client(client, keyword, since_date, until_date, seen_ids)
-
-        # Si dio error 404 o de auth, marcar la cuenta como fallida y reintentar con otra
-        error_msg = keyword_data.get("error", "")
-        if error_msg and ("404" in error_msg or "401" in error_msg or "403" in error_msg):
-            print(f"\n  ⚠️ Cuenta @{info['username']} falló ({error_msg}), reintentando con otra cuenta...")
-            failed_accounts.add(info["username"])
-            # Buscar otra cuenta disponible
-            retry_info = None
-            for ci in clients_info:
-                if ci["username"] not in failed_accounts:
-                    retry_info = ci
-                    break
-            if retry_info:
-                print(f"  🔄 Reintentando #{keyword.upper()} con @{retry_info['username']}", end="", flush=True)
-                keyword_data = await search_keyword_with_client(retry_info["client"], keyword, since_date, until_date, seen_ids)
+    seen_ids = set()  # IDs de tweets ya procesados (evita duplicados entre keywords)
 
-        all_data["keywords"].append(keyword_data)
+    # ── Modo incremental / RESUME: partir de lo ya guardado ──
+    previous = load_previous_data() if (INCREMENTAL_MODE or RESUME_MODE) else None
+    high_waters = _high_water_marks(previous) if INCREMENTAL_MODE else {}
+    if INCREMENTAL_MODE:
+        print(f"  ♻️  Modo incremental: {len(high_waters)} keyword(s) con datos previos")
+    for hw in _high_water_marks(previous).values():
+        seen_ids.update(hw["ids"])
+
+    # ── Checkpoints de paginación ──
+    checkpoints_path = get_checkpoints_path()
+    checkpoints = SearchCheckpoints(checkpoints_path) if checkpoints_path else None
+    if RESUME_MODE and checkpoints:
+        pending = [key for key in checkpoints.entries if checkpoints.pending(key)]
+        print(f"  ⏯️  Modo RESUME: {len(pending)} keyword(s) con paginación pendiente"
+              + (f" ({', '.join(pending)})" if pending else ""))
+
+    # ── Log crudo de la corrida: si la anterior se cortó, retomar desde ahí ──
+    raw_log_path = get_raw_log_path()
+    raw_log = RawTweetLog(raw_log_path, since_date, until_date) if raw_log_path else None
+    if raw_log and raw_log.resumed:
+        n_logged = sum(len(p) for p in raw_log.posts.values())
+        print(f"  ♻️  Reanudando desde {raw_log_path}: {n_logged} tweets ya capturados, "
+              f"{len(raw_log.done)} keyword(s) completas")
+        seen_ids.update(raw_log.ids())
+
+    results = {}  # keyword (o keyword@desde) → keyword_data (se reordena según KEYWORDS al final)
+
+    # ── Trabajo: una búsqueda por keyword, o una por keyword y ventana de fechas ──
+    shards = {}
+    for keyword in KEYWORDS:
+        if shard_window:
+            hw = high_waters.get(keyword)
+            kw_since = max(since_date, hw["date"][:10]) if hw else since_date
+            shards[keyword] = _date_windows(kw_since, until_date, shard_window)
+        else:
+            shards[keyword] = [None]
+    # Ventanas intercaladas entre keywords: las más recientes de cada una primero
+    items = [(kw, ws[i]) for i in range(max(len(ws) for ws in shards.values()))
+             for kw, ws in shards.items() if i < len(ws)]
+    if shard_window:
+        print(f"  🧩 Modo por ventanas ({shard_window}): {len(items)} búsquedas para {len(KEYWORDS)} keywords")
+
+    # ── Pool de cuentas: colas round-robin con work stealing; un worker asyncio por cuenta ──
+    pool = AccountPool(clients_info, items)
+    try:
+        await asyncio.gather(*[
+            _run_account_worker(info, pool, since_date, until_date, seen_ids, results, high_waters,
+                                raw_log, checkpoints)
+            for info in clients_info
+        ])
+    finally:
+        if raw_log:
+            raw_log.close()
 
-        if i < len(KEYWORDS) - 1 and PAUSE_BETWEEN_KEYWORDS > 0:
-            await asyncio.sleep(PAUSE_BETWEEN_KEYWORDS)
+    for info in clients_info:
+        name = info["username"]
+        limiter = f" · {info['limiter'].summary()}" if "limiter" in info else ""
+        print(f"  ⏱️  @{name}: {pool.health[name].summary()}{limiter}")
+        health = pool.health[name]
+        metrics.METRICS.set("account_tweets_per_minute", round(health.tweets_per_minute, 2), account=name)
+        metrics.METRICS.set("account_rate_429", round(health.rate_429, 4), account=name)
+        if "limiter" in info:
+            metrics.METRICS.set("account_learned_rps", round(info["limiter"].rate, 4), account=name)
+
+    if shard_window:
+        print()
+        for keyword, windows in shards.items():
+            done = [results[key] for key in (_shard_key(keyword, w) for w in windows) if key in results]
+            if done:
+                results[keyword] = _merge_shards(keyword, done)
+
+    all_data["keywords"] = [results[kw] for kw in KEYWORDS if kw in results]
+
+    if previous:
+        print()
+        merge_incremental(all_data, previous)
 
     # ── Re-guardar cookies al final ──
     if n_clients > 0:
@@ -897,11 +1493,18 @@ async def scrape_tweets():
 def save_data(data):
     with open(DATA_FILE, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
-    docs_data = os.path.join(OUTPUT_DIR, "tweets_data.json")
-    with open(docs_data, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    # La copia de docs/ es el mismo archivo: se copia en vez de serializar de nuevo
+    shutil.copyfile(DATA_FILE, os.path.join(OUTPUT_DIR, "tweets_data.json"))
     print(f"\n💾 Datos guardados en: {DATA_FILE}")
 
+    if TWEETS_PARQUET:
+        try:
+            from tweet_store import write_parquet
+            write_parquet(data, TWEETS_PARQUET)
+            print(f"💾 Parquet guardado en: {TWEETS_PARQUET}")
+        except Exception as e:
+            print(f"⚠️  No se pudo guardar {TWEETS_PARQUET}: {e}")
+
 
 async def main():
     print("\n" + "═" * 60)
@@ -915,8 +1518,10 @@ async def main():
 
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    data = await scrape_tweets()
+    with metrics.timer("scrape"):
+        data = await scrape_tweets()
     save_data(data)
+    discard_raw_log(get_raw_log_path())  # los datos ya están a salvo en DATA_FILE
 
     # ── Enriquecer con análisis de emociones (pysentimiento) ──
     print("\n" + "═" * 60)
@@ -924,15 +1529,26 @@ async def main():
     print("═" * 60)
     try:
         from enrich_emotions import enrich_in_memory
-        enrich_in_memory(data)
+        with metrics.timer("emotion_enrichment"):
+            enrich_in_memory(data)
         save_data(data)  # Re-guardar con emociones incluidas
     except Exception as e:
         print(f"  ⚠️  No se pudieron analizar emociones: {e}")
 
+    if TWEETS_DB:
+        try:
+            from tweet_warehouse import TweetWarehouse
+            run_id = TweetWarehouse(TWEETS_DB).ingest(data)
+            print(f"\n🗄️  Corrida #{run_id} guardada en el almacén {TWEETS_DB}")
+        except Exception as e:
+            print(f"\n⚠️  No se pudo actualizar el almacén {TWEETS_DB}: {e}")
+
     print("\n" + "═" * 60)
     print("  📄 GENERANDO REPORTE HTML")
     print("═" * 60)
-    generate_html_report(data, REPORT_FILE)
+    with metrics.timer("html_render"):
+        generate_html_report(data, REPORT_FILE)
+    metrics.observe("run", (datetime.now() - metrics.METRICS.started_at).total_seconds())
 
     total_tweets = sum(k["total_found"] for k in data["keywords"])
     total_pos = sum(k["sentiment_summary"]["positivo"] for k in data["keywords"])
@@ -951,6 +1567,13 @@ async def main():
     print(f"  🎭 Emojis detectados: {total_emoji_pos} positivos, {total_emoji_neg} negativos")
     print(f"\n  📄 Reporte HTML: {os.path.abspath(REPORT_FILE)}")
     print(f"  💾 Datos JSON:   {os.path.abspath(DATA_FILE)}")
+    metrics_path = metrics.get_metrics_path(DATA_FILE)
+    if metrics_path:
+        try:
+            for path in metrics.METRICS.write(metrics_path, METRICS_PROMETHEUS):
+                print(f"  ⏱️  Métricas:     {os.path.abspath(path)}")
+        except OSError as e:
+            print(f"  ⚠️  No se pudieron guardar las métricas: {e}")
 
     if CI_MODE:
         print(f"\n  🌐 El reporte se publicará en GitHub Pages automáticamente.")
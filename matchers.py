@@ -0,0 +1,150 @@
+"""
+═══════════════════════════════════════════════════════════════
+  Matchers precompilados para el léxico de sentimiento
+  Se construyen una vez al importar y recorren cada tweet en una pasada.
+═══════════════════════════════════════════════════════════════
+
+PhraseMatcher: autómata Aho-Corasick sobre tokens (palabras) para las
+frases multi-palabra de sentiment_lexicon. Al trabajar por tokens, los
+límites de palabra salen solos: "no anda" no matchea dentro de
+"no andaba", y "de 10" no matchea en "de 100".
+
+EmojiScanner: una clase de caracteres compilada ubica en una pasada los
+code points con los que empieza algún emoji y ahí se toma el match más
+largo. Cada secuencia multi-code-point
+(ZWJ como "❤️‍🔥" o "🤦‍♂️") cuenta como un solo emoji, los tonos de piel
+se ignoran ("👍🏽" cuenta como "👍") y el selector de variación U+FE0F
+es opcional ("❤" y "❤️" son lo mismo).
+"""
+
+import re
+from collections import deque
+
+# Palabras, o signos de puntuación sueltos (cada signo es un token propio,
+# así "no, anda" no se confunde con "no anda")
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def tokenize_for_match(text_lower):
+    return _TOKEN_RE.findall(text_lower)
+
+
+class PhraseMatcher:
+    """
+    Aho-Corasick por tokens: encuentra todas las frases presentes en el
+    texto (incluidas las que se solapan, p.ej. "se trabó" y
+    "se trabó sifere") en una sola pasada, sin importar cuántas frases haya.
+    """
+
+    def __init__(self, phrases):
+        self.phrases = []
+        self._goto = [{}]     # estado → {token: estado}
+        self._fail = [0]      # estado → estado de fallback
+        self._out = [()]      # estado → índices de frases que terminan acá
+
+        for phrase in phrases:
+            tokens = tokenize_for_match(phrase.lower())
+            if not tokens:
+                continue
+            state = 0
+            for tok in tokens:
+                nxt = self._goto[state].get(tok)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][tok] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = nxt
+            self._out[state] = self._out[state] + (len(self.phrases),)
+            self.phrases.append(phrase)
+
+        # Links de fallo por BFS; cada estado hereda las salidas de su fallback
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for tok, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and tok not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(tok, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text_lower):
+        """Frases presentes en `text_lower` (cada una una sola vez, en orden de aparición)."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        seen = set()
+        found = []
+        for tok in _TOKEN_RE.findall(text_lower):
+            while state and tok not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(tok, 0)
+            for idx in out[state]:
+                if idx not in seen:
+                    seen.add(idx)
+                    found.append(self.phrases[idx])
+        return found
+
+
+# Modificadores de tono de piel (U+1F3FB–U+1F3FF): se descartan antes de escanear
+_SKIN_TONES_RE = re.compile("[\U0001F3FB-\U0001F3FF]")
+_VS16 = "\ufe0f"
+
+
+def _char_ranges_class(codepoints, max_gap=256):
+    """Clase de caracteres "[a-b...]" con rangos que cubren `codepoints`
+    (se fusionan los que están a menos de `max_gap` de distancia)."""
+    ranges = []
+    for cp in sorted(codepoints):
+        if ranges and cp - ranges[-1][1] < max_gap:
+            ranges[-1][1] = cp
+        else:
+            ranges.append([cp, cp])
+    return "[" + "".join(f"{re.escape(chr(a))}-{re.escape(chr(b))}" for a, b in ranges) + "]"
+
+
+class EmojiScanner:
+    """
+    Cuenta emojis de varias tablas {emoji: peso} en una sola pasada.
+    scan() devuelve (emoji, etiqueta, peso, cantidad) en el orden de las
+    tablas, solo para los emojis presentes.
+    """
+
+    def __init__(self, tables):
+        # tables: {etiqueta: {emoji: peso}}, p.ej. {"positivo": {...}, "negativo": {...}}
+        self.entries = []       # índice → (emoji, etiqueta, peso)
+        self._index = {}        # variante escrita → índice
+        for label, table in tables.items():
+            for emoji, weight in table.items():
+                idx = len(self.entries)
+                self.entries.append((emoji, label, weight))
+                for variant in (emoji, emoji.replace(_VS16, "")):
+                    self._index.setdefault(_SKIN_TONES_RE.sub("", variant), idx)
+        self._max_len = max((len(v) for v in self._index), default=0)
+        # La regex solo ubica candidatos: rangos de code points que cubren el
+        # inicio de todos los emojis (una clase por rangos es mucho más rápida
+        # para sre que una lista de 100+ caracteres sueltos). En cada candidato
+        # se busca el match más largo en el diccionario.
+        self._start_re = re.compile(_char_ranges_class({ord(v[0]) for v in self._index}))
+
+    def scan(self, text):
+        if not text or text.isascii():
+            return []
+        if _SKIN_TONES_RE.search(text):
+            text = _SKIN_TONES_RE.sub("", text)
+        counts = {}
+        index = self._index
+        consumed = 0
+        for m in self._start_re.finditer(text):
+            i = m.start()
+            if i < consumed:
+                continue  # cae dentro de una secuencia ya contada (p.ej. el 🔥 de ❤️‍🔥)
+            for length in range(min(self._max_len, len(text) - i), 0, -1):
+                idx = index.get(text[i:i + length])
+                if idx is not None:
+                    counts[idx] = counts.get(idx, 0) + 1
+                    consumed = i + length
+                    break
+        return [(*self.entries[idx], counts[idx]) for idx in sorted(counts)]
@@ -0,0 +1,151 @@
+"""
+Métricas de la corrida: tiempos por fase y contadores.
+
+Un registro global (METRICS) que main.py va llenando: login, cada pedido
+de búsqueda, cada pausa por 429, clasificación, emociones y render del
+HTML, más contadores de tweets bajados, duplicados salteados y páginas por
+keyword. Al final se escribe como JSON junto a tweets_data.json (y, si se
+pide, en formato de texto de Prometheus), para saber si una corrida lenta
+fue por Twitter, por el modelo o por el render.
+
+    with timer("classification", keyword="sifere"):
+        ...
+    inc("tweets_fetched", keyword="sifere")
+
+Configuración:
+    METRICS_FILE=<ruta>        JSON de métricas (default: metrics.json; vacío lo desactiva)
+    METRICS_PROMETHEUS=true    además lo escribe en formato Prometheus (metrics.prom)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional
+
+DEFAULT_PATH = "metrics.json"
+_PREFIX = "comarb_"
+
+
+def _key(name: str, labels: dict) -> tuple:
+    return (name, tuple(sorted(labels.items())))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    """Contadores, gauges y timers con labels (como en Prometheus)."""
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self.counters = {}   # (name, labels) → valor
+        self.gauges = {}     # (name, labels) → valor
+        self.timers = {}     # (name, labels) → {"count", "total", "min", "max"}
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = _key(name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels) -> None:
+        self.gauges[_key(name, labels)] = value
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        stats = self.timers.get(_key(name, labels))
+        if stats is None:
+            self.timers[_key(name, labels)] = {"count": 1, "total": seconds, "min": seconds, "max": seconds}
+            return
+        stats["count"] += 1
+        stats["total"] += seconds
+        stats["min"] = min(stats["min"], seconds)
+        stats["max"] = max(stats["max"], seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Mide el bloque (sirve también alrededor de un `await`)."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    # ── Exportación ──
+
+    def to_dict(self) -> dict:
+        def rows(store, value_of):
+            out = {}
+            for (name, labels), value in sorted(store.items()):
+                out.setdefault(name, []).append({"labels": dict(labels), **value_of(value)})
+            return out
+
+        return {
+            "started_at": self.started_at.isoformat(),
+            "finished_at": datetime.now().isoformat(),
+            "counters": rows(self.counters, lambda v: {"value": v}),
+            "gauges": rows(self.gauges, lambda v: {"value": v}),
+            "timers": rows(self.timers, lambda s: {
+                "count": s["count"],
+                "total_s": round(s["total"], 4),
+                "mean_s": round(s["total"] / s["count"], 4),
+                "min_s": round(s["min"], 4),
+                "max_s": round(s["max"], 4),
+            }),
+        }
+
+    def to_prometheus(self) -> str:
+        def fmt(name, labels, value):
+            label_txt = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+            return f"{name}{{{label_txt}}} {value:g}" if label_txt else f"{name} {value:g}"
+
+        lines = []
+        for kind, store in (("counter", self.counters), ("gauge", self.gauges)):
+            seen = set()
+            for (name, labels), value in sorted(store.items()):
+                metric = _PREFIX + name + ("_total" if kind == "counter" else "")
+                if metric not in seen:
+                    lines.append(f"# TYPE {metric} {kind}")
+                    seen.add(metric)
+                lines.append(fmt(metric, labels, value))
+        for kind, suffix in (("summary", ""), ("gauge", "_max")):
+            seen = set()
+            for (name, labels), s in sorted(self.timers.items()):
+                metric = f"{_PREFIX}{name}_seconds{suffix}"
+                if metric not in seen:
+                    lines.append(f"# TYPE {metric} {kind}")
+                    seen.add(metric)
+                if kind == "summary":
+                    lines.append(fmt(metric + "_count", labels, s["count"]))
+                    lines.append(fmt(metric + "_sum", labels, s["total"]))
+                else:
+                    lines.append(fmt(metric, labels, s["max"]))
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str, prometheus: bool = False) -> list[str]:
+        """Escribe el JSON (y el .prom con el mismo nombre). Retorna las rutas escritas."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        written = [path]
+        if prometheus:
+            prom_path = os.path.splitext(path)[0] + ".prom"
+            with open(prom_path, "w", encoding="utf-8") as f:
+                f.write(self.to_prometheus())
+            written.append(prom_path)
+        return written
+
+
+METRICS = Metrics()
+inc = METRICS.inc
+observe = METRICS.observe
+timer = METRICS.timer
+
+
+def get_metrics_path(data_file: str) -> Optional[str]:
+    """Ruta del JSON según METRICS_FILE (default: metrics.json junto a `data_file`), o None."""
+    path = os.environ.get("METRICS_FILE")
+    if path is None:
+        return os.path.join(os.path.dirname(data_file), DEFAULT_PATH)
+    return path or None
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Registro de modelos pysentimiento compartido por todo el proceso.
+
+Sentimiento (analyze_sentiment_v2) y emociones (enrich_emotions) usan
+modelos RoBERTuito distintos pero con el mismo preprocesamiento de tweets
+y el mismo tokenizer. Este módulo:
+
+  • carga cada analyzer una sola vez por proceso (antes enrich_in_memory
+    creaba uno nuevo en cada llamada);
+  • preprocesa y tokeniza cada texto una sola vez: si emociones corre
+    después de sentimiento sobre los mismos tweets, reutiliza los ids;
+  • permite correr varias tareas sobre el mismo batch tokenizado
+    (predict_tasks);
+  • arma los batches por largo en tokens (length_buckets) en vez de un
+    batch fijo con padding al texto más largo, y reporta tokens/seg.
+
+Uso:
+    from model_registry import predict, predict_tasks
+    preds = predict("sentiment", textos)               # [Prediction, ...]
+    both = predict_tasks(textos, ("sentiment", "emotion"))
+    both["emotion"][0].output, both["emotion"][0].probas
+
+Si la versión de pysentimiento no expone lo necesario para tokenizar por
+fuera (model/tokenizer/preprocessing_args), se cae a `analyzer.predict`.
+
+Backend: SENTIMENT_BACKEND=onnx cambia el modelo de sentimiento por la
+versión ONNX int8 de onnx_backend.py (default: torch).
+
+Modo paralelo (opt-in): `predict(task, textos, workers=N)` o la variable
+CLASSIFY_WORKERS=N reparten los textos entre N procesos, cada uno con su
+propio modelo cargado una vez; el resultado vuelve en el orden original.
+Conviene para re-clasificar corpus grandes en runners con varios cores.
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Sequence
+
+os.environ.setdefault("TRANSFORMERS_VERBOSITY", "error")
+os.environ.setdefault("HF_HUB_DISABLE_PROGRESS_BARS", "1")
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
+LANG = "es"
+_MAX_LENGTH = 128          # largo con el que se entrenó RoBERTuito
+# Presupuesto por batch: filas × largo del texto más largo del batch.
+# 4096 = 32 textos de 128 tokens (el batch de pysentimiento en el peor caso).
+_MAX_TOKENS = int(os.environ.get("INFER_MAX_TOKENS", "4096"))
+_TOKEN_CACHE_SIZE = 50_000  # textos tokenizados que se recuerdan entre pasadas
+_SHARDS_PER_WORKER = 4     # shards más chicos que N → mejor reparto si unos tardan más
+
+
+class Prediction(NamedTuple):
+    """Mismo contrato que AnalyzerOutput de pysentimiento (.output / .probas)."""
+    output: object
+    probas: dict
+
+
+_analyzers: dict = {}
+# Un modelo, una inferencia a la vez: el scraper clasifica desde threads
+# (asyncio.to_thread). RLock porque get_analyzer se llama con el lock tomado.
+_lock = threading.RLock()
+_token_cache: "OrderedDict[tuple, list]" = OrderedDict()
+
+
+def backend_for(task: str) -> str:
+    """"onnx" si SENTIMENT_BACKEND=onnx y la tarea es sentimiento; si no, "torch"."""
+    if task == "sentiment" and os.environ.get("SENTIMENT_BACKEND", "torch").lower() == "onnx":
+        return "onnx"
+    return "torch"
+
+
+def get_analyzer(task: str):
+    """Analyzer de pysentimiento para `task` ("sentiment", "emotion", ...), cargado una vez."""
+    with _lock:
+        if task not in _analyzers:
+            if backend_for(task) == "onnx":
+                from onnx_backend import OnnxAnalyzer
+                _analyzers[task] = OnnxAnalyzer(task)
+            else:
+                from pysentimiento import create_analyzer
+                _analyzers[task] = create_analyzer(task=task, lang=LANG)
+        return _analyzers[task]
+
+
+def _supports_shared_tokens(analyzer) -> bool:
+    return all(hasattr(analyzer, attr) for attr in ("model", "tokenizer", "preprocessing_args"))
+
+
+def _tokenizer_key(analyzer) -> tuple:
+    """
+    Identifica tokenizer + preprocesamiento. Dos analyzers con la misma clave
+    producen exactamente los mismos ids, así que comparten el cache.
+    """
+    key = getattr(analyzer, "_comarb_token_key", None)
+    if key is None:
+        vocab = analyzer.tokenizer.get_vocab()
+        key = (
+            hash(frozenset(vocab.items())),
+            repr(sorted(analyzer.preprocessing_args.items())),
+        )
+        analyzer._comarb_token_key = key
+    return key
+
+
+_preprocess_tweet = None
+
+
+def _get_preprocess_tweet():
+    """
+    preprocess_tweet de pysentimiento. Si el paquete todavía no se importó
+    (backend ONNX), se carga solo pysentimiento/preprocessing.py (depende de
+    `emoji` y `re`): `import pysentimiento` ejecuta su __init__, que trae el
+    analyzer, transformers y torch.
+    """
+    global _preprocess_tweet
+    if _preprocess_tweet is None:
+        import sys
+        if "pysentimiento" in sys.modules:
+            from pysentimiento.preprocessing import preprocess_tweet
+        else:
+            import importlib.util
+            spec = importlib.util.find_spec("pysentimiento")  # no ejecuta el __init__
+            if spec is None or not spec.submodule_search_locations:
+                raise ImportError("pysentimiento no está instalado: pip install pysentimiento")
+            path = os.path.join(list(spec.submodule_search_locations)[0], "preprocessing.py")
+            module_spec = importlib.util.spec_from_file_location("_pysentimiento_preprocessing", path)
+            module = importlib.util.module_from_spec(module_spec)
+            module_spec.loader.exec_module(module)
+            preprocess_tweet = module.preprocess_tweet
+        _preprocess_tweet = preprocess_tweet
+    return _preprocess_tweet
+
+
+def _encode(analyzer, texts: Sequence[str]) -> list[list[int]]:
+    """Preprocesa + tokeniza, reutilizando lo ya tokenizado por cualquier tarea compatible."""
+    preprocess_tweet = _get_preprocess_tweet()
+
+    key = _tokenizer_key(analyzer)
+    out = [None] * len(texts)
+    missing = []
+    for i, text in enumerate(texts):
+        ids = _token_cache.get((key, text))
+        if ids is not None:
+            _token_cache.move_to_end((key, text))
+            out[i] = ids
+        else:
+            missing.append(i)
+
+    if missing:
+        prepped = [
+            preprocess_tweet(texts[i], lang=LANG, **analyzer.preprocessing_args)
+            for i in missing
+        ]
+        encoded = analyzer.tokenizer(prepped, truncation=True, max_length=_MAX_LENGTH)["input_ids"]
+        for i, ids in zip(missing, encoded):
+            out[i] = ids
+            _token_cache[(key, texts[i])] = ids
+        while len(_token_cache) > _TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+    return out
+
+
+def length_buckets(lengths: Sequence[int], max_tokens: int = _MAX_TOKENS) -> list[list[int]]:
+    """
+    Agrupa índices por largo: ordena de menor a mayor y corta un bucket
+    cuando (filas + 1) × largo máximo superaría `max_tokens`. Así cada batch
+    se paddea a un largo parecido al de sus textos. Un texto que solo ya
+    supera el presupuesto va en su propio bucket.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    buckets = []
+    current = []
+    for i in order:
+        # orden ascendente → el recién llegado es el más largo del bucket
+        if current and (len(current) + 1) * lengths[i] > max_tokens:
+            buckets.append(current)
+            current = []
+        current.append(i)
+    if current:
+        buckets.append(current)
+    return buckets
+
+
+# Estadísticas acumuladas por tarea: textos, tokens reales, tokens con padding, segundos
+batch_stats: dict = {}
+
+
+def _record_stats(task: str, n_texts: int, tokens: int, padded: int, seconds: float) -> None:
+    st = batch_stats.setdefault(task, {"texts": 0, "tokens": 0, "padded_tokens": 0, "seconds": 0.0})
+    st["texts"] += n_texts
+    st["tokens"] += tokens
+    st["padded_tokens"] += padded
+    st["seconds"] += seconds
+    tps = tokens / seconds if seconds > 0 else 0.0
+    waste = 100 * (padded - tokens) / padded if padded else 0.0
+    print(f"   ⚡ {task}: {n_texts} textos, {tokens} tokens en {seconds:.1f}s "
+          f"({tps:,.0f} tok/s, padding {waste:.0f}%)")
+
+
+def _torch_probs(model, input_ids: list, attention: list, multilabel: bool) -> list:
+    """Probabilidades por fila con el modelo torch, para un batch ya paddeado."""
+    import torch
+
+    device = next(model.parameters()).device
+    with torch.no_grad():
+        logits = model(
+            input_ids=torch.tensor(input_ids, dtype=torch.long, device=device),
+            attention_mask=torch.tensor(attention, dtype=torch.long, device=device),
+        ).logits
+    probs = torch.sigmoid(logits) if multilabel else torch.softmax(logits, dim=-1)
+    return probs.cpu().tolist()
+
+
+def _forward(analyzer, encoded: list[list[int]], task: str = "") -> list[Prediction]:
+    """Corre el modelo sobre ids ya tokenizados (en buckets por largo) y arma
+    las Prediction en el orden original. Sirve para torch y para ONNX
+    (analyzers con run_probs, ver onnx_backend.py)."""
+    model = analyzer.model
+    id2label = model.config.id2label
+    multilabel = model.config.problem_type == "multi_label_classification"
+    pad_id = analyzer.tokenizer.pad_token_id
+    run_probs = getattr(analyzer, "run_probs", None)
+    if run_probs is None:
+        model.eval()
+
+    preds = [None] * len(encoded)
+    padded = 0
+    started = time.perf_counter()
+    for bucket in length_buckets([len(ids) for ids in encoded]):
+        chunk = [encoded[i] for i in bucket]
+        width = max(len(ids) for ids in chunk)
+        padded += width * len(chunk)
+        input_ids = [ids + [pad_id] * (width - len(ids)) for ids in chunk]
+        attention = [[1] * len(ids) + [0] * (width - len(ids)) for ids in chunk]
+        if run_probs is not None:
+            rows = run_probs(input_ids, attention, multilabel)
+        else:
+            rows = _torch_probs(model, input_ids, attention, multilabel)
+        for i, row in zip(bucket, rows):
+            probas = {id2label[j]: p for j, p in enumerate(row)}
+            if multilabel:
+                output = [lbl for lbl, p in probas.items() if p > 0.5]
+            else:
+                output = max(probas, key=probas.get)
+            preds[i] = Prediction(output, probas)
+
+    _record_stats(task, len(encoded), sum(len(ids) for ids in encoded),
+                  padded, time.perf_counter() - started)
+    return preds
+
+
+def default_workers() -> int:
+    """Procesos de inferencia según CLASSIFY_WORKERS (0/1 = en este proceso)."""
+    try:
+        return max(0, int(os.environ.get("CLASSIFY_WORKERS", "0") or 0))
+    except ValueError:
+        return 0
+
+
+# ── Pool de procesos (modo paralelo) ──
+
+_pool = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def _init_worker(tasks: tuple, threads: int) -> None:
+    """Inicializa un proceso del pool: limita threads de torch y precarga los modelos."""
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass  # backend ONNX sin torch instalado
+    for task in tasks:
+        get_analyzer(task)
+
+
+def _predict_shard(tasks: tuple, texts: list) -> dict:
+    # workers=0: el proceso hereda CLASSIFY_WORKERS y sin esto armaría su propio pool
+    return predict_tasks(texts, tasks, workers=0)
+
+
+def _get_pool(workers: int, tasks: tuple):
+    global _pool, _pool_workers
+    from concurrent.futures import ProcessPoolExecutor
+    import multiprocessing
+
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown()
+            threads = max(1, (os.cpu_count() or 1) // workers)
+            # spawn: hacer fork de un proceso con torch cargado puede colgarse
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(tuple(tasks), threads),
+            )
+            _pool_workers = workers
+        return _pool
+
+
+@atexit.register
+def _shutdown_pool() -> None:
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+
+
+def _predict_parallel(texts: list, tasks: tuple, workers: int) -> dict:
+    pool = _get_pool(workers, tasks)
+    n_shards = min(len(texts), workers * _SHARDS_PER_WORKER)
+    size = -(-len(texts) // n_shards)
+    shards = [texts[i:i + size] for i in range(0, len(texts), size)]
+    results = {task: [] for task in tasks}
+    # map devuelve los shards en el orden en que se enviaron
+    for shard_out in pool.map(_predict_shard, [tasks] * len(shards), shards):
+        for task in tasks:
+            results[task].extend(shard_out[task])
+    return results
+
+
+def predict(task: str, texts: Sequence[str], workers: int | None = None) -> list[Prediction]:
+    """Predicciones de `task` para `texts`, en el mismo orden."""
+    return predict_tasks(texts, (task,), workers=workers)[task]
+
+
+def predict_tasks(texts: Sequence[str], tasks: Sequence[str] = ("sentiment", "emotion"),
+                  workers: int | None = None) -> dict:
+    """
+    Corre varias tareas sobre los mismos textos: se tokeniza una vez por
+    tokenizer compatible y cada modelo recibe el mismo batch de ids.
+    Con workers > 1 los textos se reparten entre procesos (ver arriba).
+    Devuelve {task: [Prediction, ...]}.
+    """
+    texts = list(texts)
+    results = {}
+    if not texts:
+        return {task: [] for task in tasks}
+
+    if workers is None:
+        workers = default_workers()
+    if workers > 1 and len(texts) > 1:
+        return _predict_parallel(texts, tuple(tasks), workers)
+
+    with _lock:
+        for task in tasks:
+            analyzer = get_analyzer(task)
+            if _supports_shared_tokens(analyzer):
+                results[task] = _forward(analyzer, _encode(analyzer, texts), task)
+            else:
+                results[task] = [Prediction(r.output, r.probas) for r in analyzer.predict(texts)]
+    return results
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Backend ONNX (int8) para el clasificador de sentimiento.
+
+Exporta RoBERTuito a ONNX, le aplica cuantización dinámica int8 y lo corre
+con onnxruntime: menos CPU por tweet y mucha menos memoria que el modelo
+fp32 de torch. Se activa con:
+
+    SENTIMENT_BACKEND=onnx python main.py
+
+La primera vez exporta el modelo (necesita torch + pysentimiento, como
+siempre) y lo deja en ONNX_CACHE_DIR (default ~/.cache/comarb-onnx); las
+corridas siguientes cargan el .onnx y el tokenizer sin importar torch. De
+pysentimiento (que sigue instalado) se usa solo preprocessing.py, cargado
+sin pasar por el __init__ del paquete (ver model_registry._get_preprocess_tweet).
+
+Dependencias extra (opcionales):
+    pip install onnxruntime onnx
+
+Chequeo de paridad contra torch (acuerdo de etiquetas):
+    python onnx_backend.py --parity
+    python onnx_backend.py --parity --data tweets_data.json --limit 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+try:
+    sys.stdout.reconfigure(encoding="utf-8")
+except Exception:
+    pass
+
+CACHE_DIR = os.environ.get("ONNX_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "comarb-onnx"))
+_OPSET = 14
+
+
+def _require_onnxruntime():
+    if importlib.util.find_spec("onnxruntime") is None:
+        raise RuntimeError(
+            "SENTIMENT_BACKEND=onnx requiere onnxruntime: pip install onnxruntime onnx"
+        )
+
+
+def _task_dir(task: str) -> str:
+    return os.path.join(CACHE_DIR, task)
+
+
+def export_quantized(task: str) -> str:
+    """
+    Exporta el modelo de `task` a ONNX y lo cuantiza a int8 (pesos de las
+    capas lineales). Guarda junto al .onnx el tokenizer y un meta.json con
+    lo necesario para predecir sin torch. Devuelve el directorio.
+    """
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from pysentimiento import create_analyzer
+
+    out_dir = _task_dir(task)
+    os.makedirs(out_dir, exist_ok=True)
+    fp32_path = os.path.join(out_dir, "model.onnx")
+    int8_path = os.path.join(out_dir, "model.int8.onnx")
+
+    print(f"⏳ Exportando modelo '{task}' a ONNX (solo la primera vez)...")
+    analyzer = create_analyzer(task=task, lang="es")
+    model = analyzer.model
+    model.eval()
+
+    class _LogitsOnly(torch.nn.Module):
+        def __init__(self, inner):
+            super().__init__()
+            self.inner = inner
+
+        def forward(self, input_ids, attention_mask):
+            return self.inner(input_ids=input_ids, attention_mask=attention_mask).logits
+
+    dummy = analyzer.tokenizer(["hola mundo"], return_tensors="pt")
+    torch.onnx.export(
+        _LogitsOnly(model),
+        (dummy["input_ids"], dummy["attention_mask"]),
+        fp32_path,
+        input_names=["input_ids", "attention_mask"],
+        output_names=["logits"],
+        dynamic_axes={
+            "input_ids": {0: "batch", 1: "sequence"},
+            "attention_mask": {0: "batch", 1: "sequence"},
+            "logits": {0: "batch"},
+        },
+        opset_version=_OPSET,
+    )
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    os.remove(fp32_path)
+
+    analyzer.tokenizer.save_pretrained(out_dir)
+    meta = {
+        "id2label": {str(k): v for k, v in model.config.id2label.items()},
+        "problem_type": model.config.problem_type,
+        "preprocessing_args": dict(getattr(analyzer, "preprocessing_args", {}) or {}),
+    }
+    with open(os.path.join(out_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    print(f"✅ Modelo ONNX int8 guardado en {out_dir}")
+    return out_dir
+
+
+class OnnxAnalyzer:
+    """
+    Analyzer con la misma forma que el de pysentimiento para model_registry
+    (.model.config, .tokenizer, .preprocessing_args), pero la inferencia la
+    hace onnxruntime vía run_probs().
+    """
+
+    def __init__(self, task: str):
+        _require_onnxruntime()
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        out_dir = _task_dir(task)
+        int8_path = os.path.join(out_dir, "model.int8.onnx")
+        if not os.path.exists(int8_path) or not os.path.exists(os.path.join(out_dir, "meta.json")):
+            export_quantized(task)
+
+        with open(os.path.join(out_dir, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        self.task = task
+        self.tokenizer = AutoTokenizer.from_pretrained(out_dir)
+        self.preprocessing_args = meta["preprocessing_args"]
+        self.model = SimpleNamespace(config=SimpleNamespace(
+            id2label={int(k): v for k, v in meta["id2label"].items()},
+            problem_type=meta["problem_type"],
+        ))
+        self.session = ort.InferenceSession(int8_path, providers=["CPUExecutionProvider"])
+
+    def run_probs(self, input_ids: list, attention: list, multilabel: bool) -> list:
+        """Probabilidades por fila para un batch ya paddeado (listas de ints)."""
+        import numpy as np
+
+        logits = self.session.run(
+            ["logits"],
+            {
+                "input_ids": np.asarray(input_ids, dtype=np.int64),
+                "attention_mask": np.asarray(attention, dtype=np.int64),
+            },
+        )[0]
+        if multilabel:
+            probs = 1.0 / (1.0 + np.exp(-logits))
+        else:
+            shifted = np.exp(logits - logits.max(axis=-1, keepdims=True))
+            probs = shifted / shifted.sum(axis=-1, keepdims=True)
+        return probs.tolist()
+
+
+def parity_check(texts: list[str], task: str = "sentiment") -> dict:
+    """Compara etiquetas y probabilidades ONNX int8 vs torch sobre `texts`."""
+    from pysentimiento import create_analyzer
+    import model_registry
+
+    torch_an = create_analyzer(task=task, lang="es")
+    onnx_an = OnnxAnalyzer(task)
+
+    torch_preds = model_registry._forward(torch_an, model_registry._encode(torch_an, texts), f"{task}/torch")
+    onnx_preds = model_registry._forward(onnx_an, model_registry._encode(onnx_an, texts), f"{task}/onnx")
+
+    agree = sum(1 for a, b in zip(torch_preds, onnx_preds) if a.output == b.output)
+    max_diff = max(
+        (abs(a.probas[k] - b.probas[k]) for a, b in zip(torch_preds, onnx_preds) for k in a.probas),
+        default=0.0,
+    )
+    return {
+        "n": len(texts),
+        "agreement": agree / len(texts) if texts else 1.0,
+        "max_proba_diff": max_diff,
+    }
+
+
+def main():
+    p = argparse.ArgumentParser(description="Backend ONNX int8 para sentimiento")
+    p.add_argument("--export", action="store_true", help="Exportar/cuantizar el modelo y salir")
+    p.add_argument("--parity", action="store_true", help="Comparar ONNX int8 vs torch")
+    p.add_argument("--data", default="tweets_data.json")
+    p.add_argument("--limit", type=int, default=1000)
+    args = p.parse_args()
+
+    if args.export:
+        export_quantized("sentiment")
+        return
+
+    if args.parity:
+        if not os.path.exists(args.data):
+            raise SystemExit(f"❌ No existe: {args.data}")
+        with open(args.data, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        texts = [
+            post.get("text", "") or ""
+            for kw in data["keywords"] for post in kw.get("posts", [])
+        ][:args.limit]
+        if not texts:
+            raise SystemExit("❌ El dataset no tiene tweets para comparar.")
+        r = parity_check(texts)
+        print(f"📊 Paridad ONNX int8 vs torch sobre {r['n']} tweets:")
+        print(f"   Acuerdo de etiquetas: {100 * r['agreement']:.1f}%")
+        print(f"   Máx. diferencia de probabilidad: {r['max_proba_diff']:.3f}")
+        return
+
+    p.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Rate limiter por cuenta (token bucket asíncrono con backoff adaptativo).
+
+Cada cuenta de Twitter/X tiene un limitador compartido por todas las
+keywords que busca. Antes de cada pedido (búsqueda inicial o página
+siguiente) se toma un token; los tokens se reponen a `rate` pedidos por
+segundo, que se va ajustando solo:
+
+    - pedido OK          → el ritmo sube de a poco (aumento aditivo)
+    - 429 Too Many Req.  → el ritmo baja a la mitad (disminución multiplicativa)
+                           y la cuenta entera se pausa:
+                             · hasta `x-rate-limit-reset` si twikit lo trae
+                               (TooManyRequests.rate_limit_reset), o
+                             · un backoff exponencial con jitter si no.
+
+Así se reemplazan las pausas fijas (3s entre páginas, 60s/120s ante un
+429) por el ritmo más rápido que la cuenta aguanta.
+
+Configuración:
+    RATE_LIMIT_RPS=0.33       ritmo inicial (pedidos/s por cuenta)
+    RATE_LIMIT_MAX_RPS=1.0    techo del ritmo aprendido
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import time
+from typing import Optional
+
+INITIAL_RATE = float(os.environ.get("RATE_LIMIT_RPS", 1 / 3))  # = la pausa fija de 3s de antes
+MAX_RATE = float(os.environ.get("RATE_LIMIT_MAX_RPS", 1.0))
+MIN_RATE = 1 / 60
+BURST = 2                  # pedidos seguidos permitidos con el bucket lleno
+INCREASE = 0.05            # pedidos/s que se suman por cada pedido OK
+DECREASE = 0.5             # factor ante un 429
+BACKOFF_BASE = 15.0        # segundos, primer 429 sin reset conocido
+BACKOFF_MAX = 15 * 60.0    # la ventana de rate limit de X es de 15 minutos
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    """True si la excepción es un 429 (twikit.errors.TooManyRequests u otro error con "429")."""
+    return type(exc).__name__ == "TooManyRequests" or "429" in str(exc)
+
+
+def rate_limit_reset(exc: BaseException) -> Optional[float]:
+    """Epoch (segundos) en que se libera la cuenta, si el 429 trae x-rate-limit-reset."""
+    reset = getattr(exc, "rate_limit_reset", None)
+    if reset is None:
+        headers = getattr(exc, "headers", None) or {}
+        reset = headers.get("x-rate-limit-reset")
+    try:
+        return float(reset) if reset is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class AccountRateLimiter:
+    """Token bucket de una cuenta, compartido entre las keywords que la usan."""
+
+    def __init__(self, name: str = "default", rate: float = INITIAL_RATE):
+        self.name = name
+        self.rate = min(max(rate, MIN_RATE), MAX_RATE)
+        self.tokens = 1.0
+        self.paused_until = 0.0   # time.monotonic() hasta el que la cuenta no pide nada
+        self.failures = 0         # 429 seguidos (para el backoff exponencial)
+        self.requests = 0
+        self.rate_limited = 0
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(BURST, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Espera hasta poder hacer un pedido (en orden de llegada entre keywords)."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= 1 - 1e-9:  # tolerancia de redondeo del refill
+                    self.tokens = max(0.0, self.tokens - 1)
+                    self.requests += 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def on_success(self) -> None:
+        self.failures = 0
+        self.rate = min(MAX_RATE, self.rate + INCREASE)
+
+    def on_rate_limited(self, reset_at: Optional[float] = None) -> float:
+        """
+        Registra un 429 y pausa la cuenta. `reset_at` es el epoch de
+        x-rate-limit-reset (si se conoce). Retorna los segundos de pausa.
+        """
+        self.failures += 1
+        self.rate_limited += 1
+        self.rate = max(MIN_RATE, self.rate * DECREASE)
+        self.tokens = 0.0
+
+        if reset_at is not None:
+            wait = max(0.0, reset_at - time.time()) + random.uniform(1, 3)
+            wait = min(wait, BACKOFF_MAX)
+        else:
+            wait = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (self.failures - 1))
+            wait *= random.uniform(0.5, 1.0)  # jitter: las cuentas no reintentan todas juntas
+
+        now = time.monotonic()
+        self.paused_until = max(self.paused_until, now + wait)
+        self._updated = now
+        return self.paused_until - now
+
+    def summary(self) -> str:
+        return (f"{self.requests} pedidos, {self.rate_limited} × 429, "
+                f"ritmo final {self.rate * 60:.0f}/min")
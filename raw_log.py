@@ -0,0 +1,143 @@
+"""
+Log crudo de la corrida (JSONL, solo append).
+
+Cada tweet se escribe como una línea apenas se baja, antes de clasificar
+nada; si el job de CI se corta a mitad de scrape_tweets, la próxima
+corrida retoma desde el log: los tweets ya capturados no se vuelven a
+procesar y las keywords que habían terminado no se vuelven a buscar.
+Cuando los datos quedan guardados (save_data), el log se borra.
+
+Formato (una línea JSON por registro):
+    {"run": {"since": "...", "until": "..."}}        encabezado
+    {"keyword": "sifere", "tweet": {...}}            tweet capturado
+    {"keyword": "sifere", "done": true}              keyword terminada
+
+El log se retoma mientras el período nuevo cubra al del encabezado (un
+"Re-run jobs" después de medianoche, o la corrida programada siguiente,
+solo corren `until` hacia adelante): los tweets capturados se conservan y
+solo se vuelven a buscar las keywords que no habían terminado. Un log de
+un período que no se cubre (p.ej. de otro año) se descarta. Una última
+línea cortada a la mitad por el crash se ignora.
+
+Configuración:
+    RAW_LOG=<ruta>   archivo del log (default: raw_tweets.jsonl)
+    RAW_LOG=         (vacío) lo desactiva
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Optional
+
+DEFAULT_PATH = "raw_tweets.jsonl"
+
+# fsync cada tantos registros: no pagar un fsync por tweet, pero perder
+# como mucho esa cantidad si se cae la máquina (un crash del proceso no
+# pierde nada: cada línea ya está en el buffer del sistema operativo)
+_FSYNC_EVERY = 50
+
+
+class RawTweetLog:
+    """Log JSONL de los tweets capturados en la corrida, con reanudación."""
+
+    def __init__(self, path: str, since_date: str, until_date: str):
+        self.path = path
+        self.run = {"since": since_date, "until": until_date}
+        self.posts = {}      # keyword → [tweet, ...] (lo capturado, en orden)
+        self.done = set()    # keywords completas
+        self._unsynced = 0
+
+        resumed = self._load() if os.path.exists(path) else False
+        self._f = open(path, "a" if resumed else "w", encoding="utf-8")
+        if resumed and not self._ends_with_newline():
+            self._f.write("\n")  # cerrar la línea que quedó cortada
+        if not resumed:
+            self._write({"run": self.run})
+            self.sync()
+
+    def _covers(self, run) -> bool:
+        """True si el período de esta corrida incluye al del log (`run`)."""
+        try:
+            return self.run["since"] <= run["since"] and run["until"] <= self.run["until"]
+        except (KeyError, TypeError):
+            return False
+
+    def _load(self) -> bool:
+        """Lee un log previo de un período que este cubre. False si no sirve para reanudar."""
+        with open(self.path, "r", encoding="utf-8") as f:
+            header = f.readline()
+            try:
+                if not self._covers(json.loads(header).get("run")):
+                    return False
+            except (json.JSONDecodeError, AttributeError):
+                return False
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # línea cortada por el crash
+                keyword = rec.get("keyword")
+                if "tweet" in rec:
+                    self.posts.setdefault(keyword, []).append(rec["tweet"])
+                elif rec.get("done"):
+                    self.done.add(keyword)
+        return True
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return True
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    @property
+    def resumed(self) -> bool:
+        return bool(self.posts or self.done)
+
+    def ids(self) -> set:
+        return {post["id"] for posts in self.posts.values() for post in posts}
+
+    def captured(self, keyword: str) -> list:
+        """Tweets ya capturados para `keyword` (copias, se pueden modificar)."""
+        return [dict(post) for post in self.posts.get(keyword, [])]
+
+    def _write(self, rec: dict) -> None:
+        line = json.dumps(rec, ensure_ascii=False)
+        self._f.write(line + "\n")
+        self._f.flush()
+        self._unsynced += 1
+        if self._unsynced >= _FSYNC_EVERY:
+            self.sync()
+
+    def append(self, keyword: str, post: dict) -> None:
+        self.posts.setdefault(keyword, []).append(dict(post))
+        self._write({"keyword": keyword, "tweet": post})
+
+    def mark_done(self, keyword: str) -> None:
+        self.done.add(keyword)
+        self._write({"keyword": keyword, "done": True})
+        self.sync()
+
+    def sync(self) -> None:
+        if not self._f.closed:
+            self._f.flush()
+            os.fsync(self._f.fileno())
+        self._unsynced = 0
+
+    def close(self) -> None:
+        if not self._f.closed:
+            self.sync()
+            self._f.close()
+
+
+def get_log_path() -> Optional[str]:
+    """Ruta del log según RAW_LOG, o None si está desactivado."""
+    return os.environ.get("RAW_LOG", DEFAULT_PATH) or None
+
+
+def discard(path: Optional[str]) -> None:
+    """Borra el log una vez que los datos de la corrida quedaron guardados."""
+    if path and os.path.exists(path):
+        os.remove(path)
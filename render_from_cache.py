@@ -6,10 +6,11 @@ sin tocar Twitter ni los tokens/cookies.
 Uso:
     python render_from_cache.py
     python render_from_cache.py --data otro.json --out salida.html
+    python render_from_cache.py --data tweets_data.parquet   # requiere pyarrow
+    python render_from_cache.py --data tweets.sqlite --since 2025-01-01 --until 2025-03-31
 """
 
 import argparse
-import json
 import os
 import sys
 import webbrowser
@@ -21,6 +22,7 @@ except Exception:
     pass
 
 from report_generator import generate_html_report
+from tweet_store import load_dataset
 
 DEFAULT_DATA = "tweets_data.json"
 DEFAULT_OUT = os.path.join("docs", "index.html")
@@ -28,7 +30,9 @@ DEFAULT_OUT = os.path.join("docs", "index.html")
 
 def main():
     parser = argparse.ArgumentParser(description="Render HTML desde cache JSON")
-    parser.add_argument("--data", default=DEFAULT_DATA, help=f"JSON de entrada (default: {DEFAULT_DATA})")
+    parser.add_argument("--data", default=DEFAULT_DATA, help=f"JSON, Parquet o almacén SQLite de entrada (default: {DEFAULT_DATA})")
+    parser.add_argument("--since", help="Desde (YYYY-MM-DD), solo con el almacén SQLite")
+    parser.add_argument("--until", help="Hasta (YYYY-MM-DD), solo con el almacén SQLite")
     parser.add_argument("--out", default=DEFAULT_OUT, help=f"HTML de salida (default: {DEFAULT_OUT})")
     parser.add_argument("--no-open", action="store_true", help="No abrir el navegador al terminar")
     args = parser.parse_args()
@@ -36,8 +40,7 @@ def main():
     if not os.path.exists(args.data):
         raise SystemExit(f"❌ No existe el archivo de datos: {args.data}")
 
-    with open(args.data, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = load_dataset(args.data, args.since, args.until)
 
     os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
     generate_html_report(data, args.out)
@@ -4,41 +4,13 @@ Crea un dashboard interactivo con los datos scrapados.
 """
 
 import json as _json
-import re
+import os
+import string
+import types
 from collections import Counter, defaultdict
 from datetime import datetime
 
-
-# Stopwords castellano + ruido típico de Twitter (lista compacta, no exhaustiva)
-_STOPWORDS = set("""
-a al algo algun alguna algunas alguno algunos ante antes aquel aquella aquellas aquello aquellos aqui
-asi aun aunque cada como con contra cual cuales cuando cuanto cuantos da de del desde donde dos
-el ella ellas ello ellos en entre era eran eras eres es esa esas ese eso esos esta estaba estaban
-estado estamos estan estar estas este esto estos estoy fue fuera fueron ha habia haber habia
-habian han has hasta hay he hizo igual la las le les lo los mas me mi mis mucho muchos muy nada
-ni no nos nosotros nuestra nuestras nuestro nuestros o os otra otras otro otros para pero poco
-por porque que quien quienes se sea sean ser si sido siendo sin sobre solo son soy su sus tambien
-tanto te tener tengo ti tiene tienen toda todas todo todos tras tu tus un una unas uno unos usted
-ustedes va vamos van varios ver vos vosotros y ya yo eso ese esa esos esas mismo misma esta este
-estos estas hacer hace haces hago hizo hicieron lo la le les nos nuestro nuestra ya solo bien mal
-ahora aqui alli ahi cuando como porque cual quien donde mientras pues entonces tambien tampoco
-todavia siempre nunca jamas mientras quiza quizas tal vez asi luego despues antes hoy mañana ayer
-soy son fui fuiste fueron sere seras sera seremos seran sea seas seamos sean siendo sido le lo
-http https www com co rt via vi
-""".split())
-
-
-def _tokenize(text):
-    """Limpia y tokeniza para extracción de n-gramas."""
-    if not text:
-        return []
-    t = text.lower()
-    t = re.sub(r"http\S+|www\.\S+", " ", t)        # urls
-    t = re.sub(r"@\w+", " ", t)                    # menciones
-    t = re.sub(r"#(\w+)", r"\1", t)                # hashtags → palabra
-    t = re.sub(r"[^\wáéíóúüñ\s]", " ", t)         # quitar puntuación
-    tokens = [w for w in t.split() if len(w) > 2 and not w.isdigit() and w not in _STOPWORDS]
-    return tokens
+import text_tokens
 
 
 _MAX_MERGED_TOKENS = 6
@@ -46,16 +18,19 @@ _MAX_MERGED_TOKENS = 6
 
 def _merge_overlapping(selected):
     """Combina n-gramas que se solapan en ≥2 tokens consecutivos, hasta MAX tokens.
-    Ej: 'activa menem scioli' + 'menem scioli pareja' → 'activa menem scioli pareja'."""
+    Ej: 'activa menem scioli' + 'menem scioli pareja' → 'activa menem scioli pareja'.
+    Opera sobre el pool chico de candidatos (3 × top_n); los tokens de cada
+    frase se separan una sola vez."""
+    tokens = [s["phrase"].split() for s in selected]
     changed = True
     while changed:
         changed = False
         for i in range(len(selected)):
+            a = tokens[i]
             for j in range(len(selected)):
                 if i == j:
                     continue
-                a = selected[i]["phrase"].split()
-                b = selected[j]["phrase"].split()
+                b = tokens[j]
                 max_ov = min(len(a), len(b)) - 1
                 for k in range(max_ov, 1, -1):
                     if a[-k:] == b[:k]:
@@ -64,13 +39,14 @@ def _merge_overlapping(selected):
                             continue
                         if len(set(merged_tokens)) != len(merged_tokens):
                             continue  # rechazar merges con tokens duplicados
-                        merged_phrase = " ".join(merged_tokens)
                         merged_count = max(selected[i]["count"], selected[j]["count"])
                         merged_sent = selected[i]["sentiment"] if selected[i]["count"] >= selected[j]["count"] else selected[j]["sentiment"]
-                        new_item = {"phrase": merged_phrase, "count": merged_count, "sentiment": merged_sent}
+                        new_item = {"phrase": " ".join(merged_tokens), "count": merged_count, "sentiment": merged_sent}
                         for idx in sorted([i, j], reverse=True):
                             selected.pop(idx)
+                            tokens.pop(idx)
                         selected.append(new_item)
+                        tokens.append(merged_tokens)
                         changed = True
                         break
                 if changed:
@@ -87,30 +63,66 @@ def _merge_overlapping(selected):
     return final
 
 
+class _NgramCounts:
+    """
+    Conteo de bi/tri/4-gramas de un conjunto de posts, con los tokens
+    pasados a ids enteros: cada n-grama es una tupla de ints y se cuenta
+    con Counter.update (un llamado por post y por sentimiento), sin armar el
+    texto de cada n-grama ni un Counter por frase. El texto se arma solo
+    para los candidatos (count ≥ min_count).
+    """
+
+    def __init__(self, posts, kw_low):
+        self.vocab = {}
+        self.totals = Counter()
+        self.by_sentiment = {}   # sentimiento → Counter(n-grama)
+        self.post_grams = []     # (sentimiento, n-gramas) por post, en orden (desempates)
+        vocab = self.vocab
+        for p in posts:
+            terms = text_tokens.get(p.get("text", ""), p.get("id")).terms
+            ids = [vocab.setdefault(w, len(vocab)) for w in terms if w != kw_low]
+            grams = []
+            for n in (2, 3, 4):
+                grams.extend(zip(*(ids[i:] for i in range(n))))
+            sent = p.get("sentiment", "neutro")
+            self.totals.update(grams)
+            if sent not in self.by_sentiment:
+                self.by_sentiment[sent] = Counter()
+            self.by_sentiment[sent].update(grams)
+            self.post_grams.append((sent, grams))
+        self.words = list(vocab)  # id → token
+
+    def phrase(self, gram):
+        return " ".join([self.words[i] for i in gram])
+
+    def candidates(self, min_count):
+        """[(frase, count, n-grama)] por frecuencia desc, largo desc y texto."""
+        items = [(self.phrase(g), c, g) for g, c in self.totals.items() if c >= min_count]
+        items.sort(key=lambda x: (-x[1], -len(x[0]), x[0]))
+        return items
+
+    def dominant_sentiment(self, gram):
+        """Sentimiento más frecuente del n-grama; en empate, el que apareció primero."""
+        per_sent = [(s, c[gram]) for s, c in self.by_sentiment.items() if c[gram]]
+        best = max(c for _, c in per_sent)
+        tied = {s for s, c in per_sent if c == best}
+        if len(tied) == 1:
+            return tied.pop()
+        for sent, grams in self.post_grams:
+            if sent in tied and gram in grams:
+                return sent
+
+
 def _extract_top_ngrams(posts, keyword, top_n=5, min_count=2):
     """Extrae top n-gramas (bi/tri/4-gramas) por frecuencia, mergeando solapamientos.
     Devuelve lista de dicts {phrase, count, sentiment}."""
     kw_low = (keyword or "").lower()
-    counts = Counter()
-    sent_acc = defaultdict(lambda: Counter())  # phrase -> Counter(sentiment)
-    for p in posts:
-        toks = [w for w in _tokenize(p.get("text", "")) if w != kw_low]
-        sent = p.get("sentiment", "neutro")
-        for n in (2, 3, 4):
-            for i in range(len(toks) - n + 1):
-                gram = tuple(toks[i:i + n])
-                if kw_low in gram:
-                    continue
-                phrase = " ".join(gram)
-                counts[phrase] += 1
-                sent_acc[phrase][sent] += 1
+    counts = _NgramCounts(posts, kw_low)
     # Orden: por frecuencia desc, longitud desc (más informativo gana empates).
-    items = [(p, c) for p, c in counts.items() if c >= min_count]
-    items.sort(key=lambda x: (-x[1], -len(x[0]), x[0]))
     selected = []
     # Sobreasignar para tener margen antes del merge final
     pool_target = top_n * 3
-    for phrase, count in items:
+    for phrase, count, gram in counts.candidates(min_count):
         # ¿Hay un n-grama seleccionado que contiene a este con count ≥?
         if any(phrase in s["phrase"] and s["count"] >= count for s in selected):
             continue
@@ -118,14 +130,12 @@ def _extract_top_ngrams(posts, keyword, top_n=5, min_count=2):
         replaced = False
         for i, s in enumerate(selected):
             if s["phrase"] in phrase and s["count"] == count:
-                dom_sent = sent_acc[phrase].most_common(1)[0][0]
-                selected[i] = {"phrase": phrase, "count": count, "sentiment": dom_sent}
+                selected[i] = {"phrase": phrase, "count": count, "sentiment": counts.dominant_sentiment(gram)}
                 replaced = True
                 break
         if replaced:
             continue
-        dom_sent = sent_acc[phrase].most_common(1)[0][0]
-        selected.append({"phrase": phrase, "count": count, "sentiment": dom_sent})
+        selected.append({"phrase": phrase, "count": count, "sentiment": counts.dominant_sentiment(gram)})
         if len(selected) >= pool_target:
             break
     # Merge de n-gramas solapados (suffix de uno == prefix del otro, ≥2 tokens)
@@ -151,6 +161,154 @@ def _emo_meta(name):
     return EMOTION_META.get(name or "others", EMOTION_META["others"])
 
 
+# ═══════════════════════════════════════════════════════════════
+#  RENDER: templates precompilados y escritura por bloques
+# ═══════════════════════════════════════════════════════════════
+
+_CHUNK_CHARS = 256 * 1024   # caracteres por escritura al archivo
+
+
+class _Template:
+    """
+    Template con la sintaxis de str.format, parseado una sola vez al importar.
+    `format()` arma un fragmento chico (una tarjeta); `stream()` genera el
+    texto por partes y acepta como valor de un campo una lista o generador
+    de fragmentos (p.ej. las tarjetas de posts), que se emiten de a uno sin
+    juntar la página entera en memoria.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.parts = [(literal, field) for literal, field, _, _ in string.Formatter().parse(source)]
+
+    def format(self, **fields):
+        return self.source.format(**fields)
+
+    def stream(self, **fields):
+        for literal, field in self.parts:
+            if literal:
+                yield literal
+            if field is not None:
+                yield from _chunks(fields[field])
+
+
+def _chunks(value):
+    """Fragmentos de texto de un valor: str, número o lista/generador (anidable)."""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, (list, tuple, types.GeneratorType)):
+        for item in value:
+            yield from _chunks(item)
+    else:
+        yield format(value)
+
+
+def _write_chunked(output_file, chunks, chunk_size=_CHUNK_CHARS):
+    """
+    Escribe los fragmentos juntándolos en bloques de ~chunk_size caracteres.
+    Se escribe a un .tmp y se renombra al final: si el render falla a mitad,
+    el reporte anterior queda intacto.
+    """
+    tmp = output_file + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            block, size = [], 0
+            for chunk in chunks:
+                block.append(chunk)
+                size += len(chunk)
+                if size >= chunk_size:
+                    f.write("".join(block))
+                    block, size = [], 0
+            f.write("".join(block))
+        os.replace(tmp, output_file)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _post_card(i, post):
+    url_html = ""
+    if post.get("url"):
+        url_html = f'<a href="{post["url"]}" target="_blank" class="post-link">🔗 Ver en Twitter/X</a>'
+
+    # Emoción (opcional, si el JSON está enriquecido)
+    emo_pill_html = ""
+    if post.get("emotion") and post["emotion"] != "others":
+        emo_pill_html = _EMOTION_PILL.format(**_emo_meta(post["emotion"]))
+
+    return _POST_CARD.format(
+        sentiment=post["sentiment"],
+        delay=i * 0.05,
+        user=post.get("user", "Desconocido"),
+        username=post.get("username", "unknown"),
+        emo_pill_html=emo_pill_html,
+        date=post.get("date", "Sin fecha")[:10],
+        text=post["text"],
+        likes=post.get("likes", 0),
+        retweets=post.get("retweets", 0),
+        replies=post.get("replies", 0),
+        url_html=url_html,
+    )
+
+
+def _keyword_section(kw):
+    """Sección de una keyword; las tarjetas de posts se generan a medida que se escriben."""
+    s = kw["sentiment_summary"]
+    total = s["positivo"] + s["negativo"] + s["neutro"]
+    pct_pos = round((s["positivo"] / total * 100) if total > 0 else 0)
+    pct_neg = round((s["negativo"] / total * 100) if total > 0 else 0)
+    pct_neu = 100 - pct_pos - pct_neg if total > 0 else 0
+
+    dominant = "neutro"
+    if s["negativo"] >= s["positivo"] and s["negativo"] >= s["neutro"]:
+        dominant = "negativo"
+    elif s["positivo"] >= s["neutro"]:
+        dominant = "positivo"
+
+    error_html = ""
+    if kw.get("error"):
+        error_html = f'<div class="error-badge">⚠️ {kw["error"][:100]}</div>'
+
+    # Emoción dominante por keyword (si los datos vienen enriquecidos)
+    kw_emo_html = ""
+    kw_emo_dom = kw.get("emotion_dominant")
+    if kw_emo_dom and kw_emo_dom != "others":
+        kw_emo_html = _KEYWORD_EMOTION.format(
+            keyword=kw["keyword"].upper(),
+            count=kw.get("emotion_summary", {}).get(kw_emo_dom, 0),
+            **_emo_meta(kw_emo_dom),
+        )
+
+    posts = kw["posts"]
+    return _KEYWORD_SECTION.stream(
+        keyword=kw["keyword"],
+        keyword_upper=kw["keyword"].upper(),
+        dominant=dominant,
+        total_found=kw["total_found"],
+        pct_pos=pct_pos, pct_neu=pct_neu, pct_neg=pct_neg,
+        kw_emo_html=kw_emo_html,
+        positivo=s["positivo"], neutro=s["neutro"], negativo=s["negativo"],
+        error_html=error_html,
+        posts=(_post_card(i, p) for i, p in enumerate(posts)) if posts else _NO_POSTS,
+    )
+
+
+def _timeline_fields(i, p):
+    """Campos de un ítem del timeline / top de likes."""
+    text = p.get("text", "")
+    return {
+        "delay": i * 0.03,
+        "sentiment": p["sentiment"],
+        "keyword": p["keyword"].upper(),
+        "username": p.get("username", "unknown"),
+        "date": p.get("date", "")[:10],
+        "likes": p.get("likes", 0),
+        "text": p["text"][:280],
+        "ellipsis": "..." if len(text) > 280 else "",
+    }
+
+
 def generate_html_report(data, output_file):
     """Genera un reporte HTML completo a partir de los datos."""
 
@@ -192,7 +350,7 @@ def generate_html_report(data, output_file):
     top_liked_posts = sorted(all_posts, key=lambda x: x.get("likes", 0) or 0, reverse=True)[:12]
 
     # ── N-gramas asociados por keyword ──
-    ngrams_html = ""
+    ngram_cards = []
     ngrams_empty_kws = []
     for kw in data["keywords"]:
         grams = _extract_top_ngrams(kw.get("posts", []), kw["keyword"], top_n=5, min_count=2)
@@ -201,114 +359,162 @@ def generate_html_report(data, output_file):
             continue
         max_c = max(g["count"] for g in grams)
         min_c = min(g["count"] for g in grams)
-        pills = ""
+        pills = []
         for g in grams:
             # Tamaño proporcional: 11px (min) → 18px (max)
             if max_c == min_c:
                 size = 14
             else:
                 size = 11 + round(7 * (g["count"] - min_c) / (max_c - min_c))
-            pills += (
-                f'<span class="ngram-pill {g["sentiment"]}" '
-                f'style="font-size:{size}px" title="{g["count"]} menciones">'
-                f'{g["phrase"]} <em>{g["count"]}</em></span>'
-            )
-        ngrams_html += f"""
-        <div class="ngram-card">
-            <div class="ngram-kw">#{kw['keyword'].upper()}</div>
-            <div class="ngram-pills">{pills}</div>
-        </div>
-        """
+            pills.append(_NGRAM_PILL.format(size=size, **g))
+        ngram_cards.append(_NGRAM_CARD.format(keyword=kw["keyword"].upper(), pills="".join(pills)))
     ngrams_empty_html = (
         f'<span class="ngrams-empty-note">— sin frases frecuentes: {", ".join(ngrams_empty_kws)}</span>'
         if ngrams_empty_kws else ""
     )
 
-    # ── Generar tarjetas de keywords ──
-    keyword_sections = ""
+    # ── Timeline reciente y top con más likes ──
+    timeline_items = [_TIMELINE_ITEM.format(**_timeline_fields(i, p)) for i, p in enumerate(recent_posts)]
+    top_liked_items = [_TOP_LIKED_ITEM.format(**_timeline_fields(i, p)) for i, p in enumerate(top_liked_posts)]
+
+    # ── Daily evolution data ──
+    daily_counts = defaultdict(lambda: {"positivo": 0, "negativo": 0, "neutro": 0})
     for kw in data["keywords"]:
+        for p in kw["posts"]:
+            day = p.get("date", "")[:10]
+            if day:
+                daily_counts[day][p["sentiment"]] += 1
+    sorted_days = sorted(daily_counts.keys())
+    daily_labels_json = _json.dumps(sorted_days)
+    daily_pos_json = _json.dumps([daily_counts[d]["positivo"] for d in sorted_days])
+    daily_neg_json = _json.dumps([daily_counts[d]["negativo"] for d in sorted_days])
+    daily_neu_json = _json.dumps([daily_counts[d]["neutro"] for d in sorted_days])
+
+    # ── Stacked bar chart data ──
+    sorted_kws = sorted(data["keywords"], key=lambda k: k["total_found"], reverse=True)
+    stacked_labels = []
+    stacked_pos = []
+    stacked_neu = []
+    stacked_neg = []
+    stacked_pos_n = []
+    stacked_neu_n = []
+    stacked_neg_n = []
+    for kw in sorted_kws:
         s = kw["sentiment_summary"]
         total = s["positivo"] + s["negativo"] + s["neutro"]
-        pct_pos = round((s["positivo"] / total * 100) if total > 0 else 0)
-        pct_neg = round((s["negativo"] / total * 100) if total > 0 else 0)
-        pct_neu = 100 - pct_pos - pct_neg if total > 0 else 0
-
-        dominant = "neutro"
-        if s["negativo"] >= s["positivo"] and s["negativo"] >= s["neutro"]:
-            dominant = "negativo"
-        elif s["positivo"] >= s["neutro"]:
-            dominant = "positivo"
-
-        posts_html = ""
-        for i, post in enumerate(kw["posts"]):
-            sent_class = post["sentiment"]
-            url_html = ""
-            if post.get("url"):
-                url_html = f'<a href="{post["url"]}" target="_blank" class="post-link">🔗 Ver en Twitter/X</a>'
-
-            # Emoción (opcional, si el JSON está enriquecido)
-            emo_pill_html = ""
-            if post.get("emotion") and post["emotion"] != "others":
-                em = _emo_meta(post["emotion"])
-                emo_pill_html = (
-                    f'<span class="emotion-pill" title="Emoción dominante: {em["label"]}" '
-                    f'style="color:{em["color"]};border-color:{em["color"]}33;background:{em["color"]}1a">'
-                    f'{em["emoji"]} {em["label"]}</span>'
-                )
-
-            posts_html += f"""
-            <div class="post-card {sent_class}" style="animation-delay: {i * 0.05}s">
+        stacked_labels.append(f"{kw['keyword'].upper()} ({total})")
+        stacked_pos.append(round((s["positivo"] / total * 100), 1) if total > 0 else 0)
+        stacked_neu.append(round((s["neutro"] / total * 100), 1) if total > 0 else 0)
+        stacked_neg.append(round((s["negativo"] / total * 100), 1) if total > 0 else 0)
+        stacked_pos_n.append(s["positivo"])
+        stacked_neu_n.append(s["neutro"])
+        stacked_neg_n.append(s["negativo"])
+    stacked_labels_json = _json.dumps(stacked_labels)
+    stacked_pos_json = _json.dumps(stacked_pos)
+    stacked_neu_json = _json.dumps(stacked_neu)
+    stacked_neg_json = _json.dumps(stacked_neg)
+    stacked_pos_n_json = _json.dumps(stacked_pos_n)
+    stacked_neu_n_json = _json.dumps(stacked_neu_n)
+    stacked_neg_n_json = _json.dumps(stacked_neg_n)
+
+    # ── HTML completo ──
+    generated_at = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
+    period_from = data["period"]["from"]
+    period_to = data["period"]["to"]
+
+    emotion_card = _EMOTION_CARD.format(**emo_meta_global) if has_emotions else ""
+
+    page = _PAGE.stream(
+        period_from=period_from, period_to=period_to, generated_at=generated_at,
+        total_tweets=total_tweets, total_pos=total_pos, total_neg=total_neg, total_neu=total_neu,
+        most_active=kw_most_active["keyword"].upper(),
+        most_negative=kw_most_negative["keyword"].upper(),
+        emotion_card=emotion_card,
+        ngrams_empty_html=ngrams_empty_html, ngram_cards=ngram_cards,
+        timeline_items=timeline_items, top_liked_items=top_liked_items,
+        keyword_sections=(_keyword_section(kw) for kw in data["keywords"]),
+        stacked_labels_json=stacked_labels_json,
+        stacked_pos_json=stacked_pos_json, stacked_neu_json=stacked_neu_json, stacked_neg_json=stacked_neg_json,
+        stacked_pos_n_json=stacked_pos_n_json, stacked_neu_n_json=stacked_neu_n_json,
+        stacked_neg_n_json=stacked_neg_n_json,
+        daily_labels_json=daily_labels_json,
+        daily_pos_json=daily_pos_json, daily_neu_json=daily_neu_json, daily_neg_json=daily_neg_json,
+    )
+    _write_chunked(output_file, page)
+
+    print(f"\n  ✅ Reporte generado: {output_file}")
+    print(f"  📊 {total_tweets} tweets analizados")
+    print(f"  📈 {total_pos} positivos | {total_neu} neutros | {total_neg} negativos")
+
+
+# ═══════════════════════════════════════════════════════════════
+#  TEMPLATES (sintaxis de str.format: {campo}; llaves literales {{ }})
+# ═══════════════════════════════════════════════════════════════
+
+_NGRAM_PILL = _Template(
+    '<span class="ngram-pill {sentiment}" '
+    'style="font-size:{size}px" title="{count} menciones">'
+    '{phrase} <em>{count}</em></span>'
+)
+
+_NGRAM_CARD = _Template("""
+        <div class="ngram-card">
+            <div class="ngram-kw">#{keyword}</div>
+            <div class="ngram-pills">{pills}</div>
+        </div>
+        """)
+
+_EMOTION_PILL = _Template(
+    '<span class="emotion-pill" title="Emoción dominante: {label}" '
+    'style="color:{color};border-color:{color}33;background:{color}1a">'
+    '{emoji} {label}</span>'
+)
+
+_KEYWORD_EMOTION = _Template(
+    '<span class="kw-emotion" title="Emoción dominante en {keyword}" '
+    'style="color:{color};border-color:{color}33;background:{color}1a">'
+    '{emoji} {label} ({count})</span>'
+)
+
+_POST_CARD = _Template("""
+            <div class="post-card {sentiment}" style="animation-delay: {delay}s">
                 <div class="post-header">
                     <div class="post-user">
                         <span class="post-avatar">@</span>
                         <div>
-                            <span class="post-name">{post.get('user', 'Desconocido')}</span>
-                            <span class="post-handle">@{post.get('username', 'unknown')}</span>
+                            <span class="post-name">{user}</span>
+                            <span class="post-handle">@{username}</span>
                         </div>
                     </div>
                     <div class="post-meta">
-                        <span class="sentiment-pill {sent_class}">{post['sentiment']}</span>
+                        <span class="sentiment-pill {sentiment}">{sentiment}</span>
                         {emo_pill_html}
-                        <span class="post-date">{post.get('date', 'Sin fecha')[:10]}</span>
+                        <span class="post-date">{date}</span>
                     </div>
                 </div>
-                <p class="post-text">{post['text']}</p>
+                <p class="post-text">{text}</p>
                 <div class="post-footer">
                     <div class="post-stats">
-                        <span>❤️ {post.get('likes', 0)}</span>
-                        <span>🔁 {post.get('retweets', 0)}</span>
-                        <span>💬 {post.get('replies', 0)}</span>
+                        <span>❤️ {likes}</span>
+                        <span>🔁 {retweets}</span>
+                        <span>💬 {replies}</span>
                     </div>
                     {url_html}
                 </div>
             </div>
-            """
-
-        error_html = ""
-        if kw.get("error"):
-            error_html = f'<div class="error-badge">⚠️ {kw["error"][:100]}</div>'
-
-        # Emoción dominante por keyword (si los datos vienen enriquecidos)
-        kw_emo_html = ""
-        kw_emo_dom = kw.get("emotion_dominant")
-        if kw_emo_dom and kw_emo_dom != "others":
-            em = _emo_meta(kw_emo_dom)
-            n_emo = kw.get("emotion_summary", {}).get(kw_emo_dom, 0)
-            kw_emo_html = (
-                f'<span class="kw-emotion" title="Emoción dominante en {kw["keyword"].upper()}" '
-                f'style="color:{em["color"]};border-color:{em["color"]}33;background:{em["color"]}1a">'
-                f'{em["emoji"]} {em["label"]} ({n_emo})</span>'
-            )
-
-        keyword_sections += f"""
-        <div class="keyword-section" id="kw-{kw['keyword']}">
-            <div class="kw-header" onclick="toggleSection('{kw['keyword']}')">
+            """)
+
+_NO_POSTS = '<div class="no-posts">No se encontraron tweets para esta palabra clave.</div>'
+
+_KEYWORD_SECTION = _Template("""
+        <div class="keyword-section" id="kw-{keyword}">
+            <div class="kw-header" onclick="toggleSection('{keyword}')">
                 <div class="kw-title-area">
                     <div class="kw-icon {dominant}">#</div>
                     <div>
-                        <h3 class="kw-title">{kw['keyword'].upper()}</h3>
+                        <h3 class="kw-title">{keyword_upper}</h3>
                         <div class="kw-subtitle">
-                            <span>{kw['total_found']} tweets</span>
+                            <span>{total_found} tweets</span>
                             <div class="mini-bar">
                                 <div class="mini-pos" style="width:{pct_pos}%"></div>
                                 <div class="mini-neu" style="width:{pct_neu}%"></div>
@@ -319,100 +525,54 @@ def generate_html_report(data, output_file):
                     </div>
                 </div>
                 <div class="kw-stats-right">
-                    <span class="stat-pos">{s['positivo']}+</span>
-                    <span class="stat-neu">{s['neutro']}~</span>
-                    <span class="stat-neg">{s['negativo']}−</span>
-                    <span class="toggle-arrow collapsed" id="arrow-{kw['keyword']}">▾</span>
+                    <span class="stat-pos">{positivo}+</span>
+                    <span class="stat-neu">{neutro}~</span>
+                    <span class="stat-neg">{negativo}−</span>
+                    <span class="toggle-arrow collapsed" id="arrow-{keyword}">▾</span>
                 </div>
             </div>
             {error_html}
-            <div class="kw-posts hidden" id="posts-{kw['keyword']}">
-                {posts_html if posts_html else '<div class="no-posts">No se encontraron tweets para esta palabra clave.</div>'}
+            <div class="kw-posts hidden" id="posts-{keyword}">
+                {posts}
             </div>
         </div>
-        """
-
-    # ── Timeline reciente ──
-    timeline_html = ""
-    for i, p in enumerate(recent_posts):
-        timeline_html += f"""
-        <div class="timeline-item" style="animation-delay: {i * 0.03}s">
-            <div class="timeline-dot {p['sentiment']}"></div>
+        """)
+
+_TIMELINE_ITEM = _Template("""
+        <div class="timeline-item" style="animation-delay: {delay}s">
+            <div class="timeline-dot {sentiment}"></div>
             <div class="timeline-content">
                 <div class="timeline-top">
-                    <span class="timeline-kw">#{p['keyword'].upper()}</span>
-                    <span class="timeline-user">@{p.get('username', 'unknown')}</span>
-                    <span class="timeline-date">{p.get('date', '')[:10]}</span>
+                    <span class="timeline-kw">#{keyword}</span>
+                    <span class="timeline-user">@{username}</span>
+                    <span class="timeline-date">{date}</span>
                 </div>
-                <p class="timeline-text">{p['text'][:280]}{'...' if len(p.get('text','')) > 280 else ''}</p>
+                <p class="timeline-text">{text}{ellipsis}</p>
             </div>
         </div>
-        """
-
-    # ── Top 10 con más likes ──
-    top_liked_html = ""
-    for i, p in enumerate(top_liked_posts):
-        top_liked_html += f"""
-        <div class="timeline-item" style="animation-delay: {i * 0.03}s">
-            <div class="timeline-dot {p['sentiment']}"></div>
+        """)
+
+_TOP_LIKED_ITEM = _Template("""
+        <div class="timeline-item" style="animation-delay: {delay}s">
+            <div class="timeline-dot {sentiment}"></div>
             <div class="timeline-content">
                 <div class="timeline-top">
-                    <span class="timeline-kw">#{p['keyword'].upper()}</span>
-                    <span class="timeline-user">@{p.get('username', 'unknown')}</span>
-                    <span class="timeline-date">{p.get('date', '')[:10]}</span>
-                    <span class="timeline-likes">❤️ {p.get('likes', 0)}</span>
+                    <span class="timeline-kw">#{keyword}</span>
+                    <span class="timeline-user">@{username}</span>
+                    <span class="timeline-date">{date}</span>
+                    <span class="timeline-likes">❤️ {likes}</span>
                 </div>
-                <p class="timeline-text">{p['text'][:280]}{'...' if len(p.get('text','')) > 280 else ''}</p>
+                <p class="timeline-text">{text}{ellipsis}</p>
             </div>
         </div>
-        """
-
-    # ── Daily evolution data ──
-    daily_counts = defaultdict(lambda: {"positivo": 0, "negativo": 0, "neutro": 0})
-    for kw in data["keywords"]:
-        for p in kw["posts"]:
-            day = p.get("date", "")[:10]
-            if day:
-                daily_counts[day][p["sentiment"]] += 1
-    sorted_days = sorted(daily_counts.keys())
-    daily_labels_json = _json.dumps(sorted_days)
-    daily_pos_json = _json.dumps([daily_counts[d]["positivo"] for d in sorted_days])
-    daily_neg_json = _json.dumps([daily_counts[d]["negativo"] for d in sorted_days])
-    daily_neu_json = _json.dumps([daily_counts[d]["neutro"] for d in sorted_days])
-
-    # ── Stacked bar chart data ──
-    sorted_kws = sorted(data["keywords"], key=lambda k: k["total_found"], reverse=True)
-    stacked_labels = []
-    stacked_pos = []
-    stacked_neu = []
-    stacked_neg = []
-    stacked_pos_n = []
-    stacked_neu_n = []
-    stacked_neg_n = []
-    for kw in sorted_kws:
-        s = kw["sentiment_summary"]
-        total = s["positivo"] + s["negativo"] + s["neutro"]
-        stacked_labels.append(f"{kw['keyword'].upper()} ({total})")
-        stacked_pos.append(round((s["positivo"] / total * 100), 1) if total > 0 else 0)
-        stacked_neu.append(round((s["neutro"] / total * 100), 1) if total > 0 else 0)
-        stacked_neg.append(round((s["negativo"] / total * 100), 1) if total > 0 else 0)
-        stacked_pos_n.append(s["positivo"])
-        stacked_neu_n.append(s["neutro"])
-        stacked_neg_n.append(s["negativo"])
-    stacked_labels_json = _json.dumps(stacked_labels)
-    stacked_pos_json = _json.dumps(stacked_pos)
-    stacked_neu_json = _json.dumps(stacked_neu)
-    stacked_neg_json = _json.dumps(stacked_neg)
-    stacked_pos_n_json = _json.dumps(stacked_pos_n)
-    stacked_neu_n_json = _json.dumps(stacked_neu_n)
-    stacked_neg_n_json = _json.dumps(stacked_neg_n)
+        """)
 
-    # ── HTML completo ──
-    generated_at = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-    period_from = data["period"]["from"]
-    period_to = data["period"]["to"]
+_EMOTION_CARD = _Template("""<div class="stat-card" style="animation-delay:0.3s">
+                <div class="stat-label">Emoción Dominante</div>
+                <div class="stat-value" style="color:{color}">{emoji} {label}</div>
+            </div>""")
 
-    html = f"""<!DOCTYPE html>
+_PAGE = _Template("""<!DOCTYPE html>
 <html lang="es">
 <head>
     <meta charset="UTF-8">
@@ -831,16 +991,13 @@ def generate_html_report(data, output_file):
             </div>
             <div class="stat-card" style="animation-delay:0.2s">
                 <div class="stat-label">Más Activo</div>
-                <div class="stat-value c-blue">#{kw_most_active['keyword'].upper()}</div>
+                <div class="stat-value c-blue">#{most_active}</div>
             </div>
             <div class="stat-card" style="animation-delay:0.25s">
                 <div class="stat-label">Más Criticado</div>
-                <div class="stat-value c-orange">#{kw_most_negative['keyword'].upper()}</div>
+                <div class="stat-value c-orange">#{most_negative}</div>
             </div>
-            {f'''<div class="stat-card" style="animation-delay:0.3s">
-                <div class="stat-label">Emoción Dominante</div>
-                <div class="stat-value" style="color:{emo_meta_global["color"]}">{emo_meta_global["emoji"]} {emo_meta_global["label"]}</div>
-            </div>''' if has_emotions else ''}
+            {emotion_card}
         </div>
 
         <!-- Chart -->
@@ -855,7 +1012,7 @@ def generate_html_report(data, output_file):
         <div class="ngrams-section">
             <div class="section-title">🏷 Frases asociadas por palabra clave (top 5) {ngrams_empty_html}</div>
             <div class="ngrams-grid">
-                {ngrams_html}
+                {ngram_cards}
             </div>
         </div>
 
@@ -872,11 +1029,11 @@ def generate_html_report(data, output_file):
             <div class="timeline-grid">
                 <div>
                     <div class="section-title">⏱ Publicaciones más recientes (todas las palabras)</div>
-                    {timeline_html}
+                    {timeline_items}
                 </div>
                 <div>
                     <div class="section-title">❤️ Top 12 con más likes</div>
-                    {top_liked_html}
+                    {top_liked_items}
                 </div>
             </div>
         </div>
@@ -1057,11 +1214,4 @@ def generate_html_report(data, output_file):
         }});
     </script>
 </body>
-</html>"""
-
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write(html)
-
-    print(f"\n  ✅ Reporte generado: {output_file}")
-    print(f"  📊 {total_tweets} tweets analizados")
-    print(f"  📈 {total_pos} positivos | {total_neu} neutros | {total_neg} negativos")
+</html>""")
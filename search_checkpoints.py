@@ -0,0 +1,80 @@
+"""
+Checkpoints de paginación por keyword (JSON).
+
+Después de cada página se guarda la query y el cursor de la página
+siguiente (`Result.next_cursor` de twikit). Si la keyword se corta antes
+de terminar (429 después de los reintentos, error de red, crash), el
+checkpoint queda pendiente y la próxima corrida puede seguir desde ese
+cursor con `client.search_tweet(query, "Latest", cursor=...)` en vez de
+volver a pedir las páginas que ya se bajaron.
+
+    {"sifere": {"query": "sifere lang:es since:... until:...",
+                "cursor": "DAABCgAB...", "fetched": 120, "complete": false,
+                "updated_at": "2025-06-01T11:03:12"}}
+
+Configuración:
+    SEARCH_CHECKPOINTS=<ruta>   archivo (default: search_checkpoints.json)
+    SEARCH_CHECKPOINTS=         (vacío) los desactiva
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime
+from typing import Optional
+
+DEFAULT_PATH = "search_checkpoints.json"
+
+
+class SearchCheckpoints:
+    """Cursor de la última página bajada por keyword, persistido en disco."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"⚠️  No se pudo leer {path} ({e}), se ignoran los checkpoints.")
+
+    def pending(self, keyword: str, query: Optional[str] = None) -> Optional[dict]:
+        """Checkpoint sin terminar de `keyword` (si se pasa `query`, solo si coincide)."""
+        entry = self.entries.get(keyword)
+        if not entry or entry.get("complete") or not entry.get("cursor"):
+            return None
+        if query is not None and entry.get("query") != query:
+            return None
+        return entry
+
+    def update(self, keyword: str, query: str, cursor: Optional[str], fetched: int) -> None:
+        """Página procesada: el próximo pedido arranca en `cursor`."""
+        self._set(keyword, query, cursor, fetched, complete=False)
+
+    def complete(self, keyword: str, query: str, fetched: int) -> None:
+        """La paginación terminó normalmente (sin más páginas, tope o tweets ya conocidos)."""
+        self._set(keyword, query, None, fetched, complete=True)
+
+    def _set(self, keyword, query, cursor, fetched, complete) -> None:
+        self.entries[keyword] = {
+            "query": query,
+            "cursor": cursor,
+            "fetched": fetched,
+            "complete": complete,
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        self._save()
+
+    def _save(self) -> None:
+        # Escritura atómica: un crash a mitad no deja el archivo roto
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+
+def get_checkpoints_path() -> Optional[str]:
+    """Ruta según SEARCH_CHECKPOINTS, o None si están desactivados."""
+    return os.environ.get("SEARCH_CHECKPOINTS", DEFAULT_PATH) or None
@@ -0,0 +1,96 @@
+"""
+PhraseMatcher y EmojiScanner contra el puntaje por substrings que usaba
+main.py antes de los matchers: mismos resultados cuando las frases y los
+emojis aparecen sueltos, y las diferencias buscadas en los bordes.
+"""
+
+import random
+
+import pytest
+
+import main
+from matchers import EmojiScanner, PhraseMatcher
+from sentiment_lexicon import NEGATIVE_PHRASES, POSITIVE_PHRASES
+
+_ZWJ = "\u200d"
+_FILLER = ["hoy", "otra vez", "la página", "sifere", "con el sistema", "gente", "mañana"]
+
+
+def _old_score_phrases(text_lower, phrase_dict):
+    score = 0.0
+    matched = []
+    for phrase, weight in phrase_dict.items():
+        if phrase in text_lower:
+            score += weight
+            matched.append(phrase)
+    return score, matched
+
+
+def _old_count_emojis(text):
+    pos_score = 0.0
+    neg_score = 0.0
+    found_emojis = []
+    for emoji, weight in main.POSITIVE_EMOJIS.items():
+        count = text.count(emoji)
+        if count > 0:
+            pos_score += weight * count
+            found_emojis.append({"emoji": emoji, "type": "positivo", "count": count})
+    for emoji, weight in main.NEGATIVE_EMOJIS.items():
+        count = text.count(emoji)
+        if count > 0:
+            neg_score += weight * count
+            found_emojis.append({"emoji": emoji, "type": "negativo", "count": count})
+    return pos_score, neg_score, found_emojis
+
+
+def test_phrase_matcher_agrees_with_substring_scorer():
+    rng = random.Random(0)
+    phrases = list(NEGATIVE_PHRASES) + list(POSITIVE_PHRASES)
+    matcher = PhraseMatcher(phrases)
+
+    for _ in range(500):
+        parts = rng.sample(phrases, rng.randint(0, 4)) + rng.sample(_FILLER, rng.randint(1, 3))
+        rng.shuffle(parts)
+        text_lower = ". ".join(parts)
+
+        found = matcher.find(text_lower)
+        for phrase_dict in (NEGATIVE_PHRASES, POSITIVE_PHRASES):
+            old_score, old_matched = _old_score_phrases(text_lower, phrase_dict)
+            score, matched = main._score_phrases(found, phrase_dict)
+            assert sorted(matched) == sorted(old_matched), text_lower
+            assert score == pytest.approx(old_score)
+
+
+def test_phrase_matcher_respects_word_boundaries():
+    matcher = PhraseMatcher(["no anda", "de 10", "se trabó", "se trabó sifere"])
+
+    assert matcher.find("el sistema no andaba") == []
+    assert matcher.find("le pongo de 100") == []
+    assert matcher.find("no, anda bien") == []
+    assert matcher.find("se trabó sifere otra vez") == ["se trabó", "se trabó sifere"]
+
+
+def test_emoji_scanner_agrees_with_substring_count():
+    rng = random.Random(0)
+    table = list(main.POSITIVE_EMOJIS) + list(main.NEGATIVE_EMOJIS)
+    # Emojis que no son parte de otro (las secuencias ZWJ cambian a propósito)
+    single = [e for e in table if _ZWJ not in e and not any(e != o and e in o for o in table)]
+
+    for _ in range(500):
+        parts = rng.choices(single, k=rng.randint(0, 6)) + rng.sample(_FILLER, rng.randint(1, 3))
+        rng.shuffle(parts)
+        text = " ".join(parts)
+
+        old_pos, old_neg, old_found = _old_count_emojis(text)
+        pos, neg, found = main.count_emojis(text)
+        assert found == old_found, text
+        assert (pos, neg) == (pytest.approx(old_pos), pytest.approx(old_neg))
+
+
+def test_emoji_scanner_counts_sequences_once():
+    scanner = EmojiScanner({"positivo": {"👍": 1, "❤️": 1, "❤️‍🔥": 2}, "negativo": {"🔥": 0.3}})
+
+    assert scanner.scan("❤️‍🔥") == [("❤️‍🔥", "positivo", 2, 1)]
+    assert scanner.scan("👍🏽 👍") == [("👍", "positivo", 1, 2)]
+    assert scanner.scan("❤ ❤️") == [("❤️", "positivo", 1, 2)]
+    assert scanner.scan("sin emojis") == []
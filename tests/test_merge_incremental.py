@@ -0,0 +1,78 @@
+"""
+Modo incremental de main.py: fusión de los posts nuevos con el dataset
+previo y marcas de agua por keyword.
+"""
+
+import main
+
+
+def _post(post_id, date, sentiment="neutro"):
+    return {"id": post_id, "date": date, "text": f"tweet {post_id}", "sentiment": sentiment}
+
+
+def test_merge_dedups_by_id_and_sorts_by_date():
+    previous = {"keywords": [{"keyword": "sifere", "posts": [
+        _post("2", "2026-03-02T10:00:00", "negativo"),
+        _post("1", "2026-03-01T10:00:00"),
+    ]}]}
+    data = {"period": {"from": "2026-01-01"}, "keywords": [{"keyword": "sifere", "posts": [
+        _post("3", "2026-03-03T10:00:00"),
+        _post("2", "2026-03-02T10:00:00", "positivo"),
+    ]}]}
+
+    main.merge_incremental(data, previous)
+
+    kw = data["keywords"][0]
+    assert [p["id"] for p in kw["posts"]] == ["3", "2", "1"]
+    # El post repetido se queda con la versión recién bajada
+    assert kw["posts"][1]["sentiment"] == "positivo"
+    assert kw["total_found"] == 3
+    assert kw["sentiment_summary"] == {"positivo": 1, "negativo": 0, "neutro": 2}
+
+
+def test_merge_drops_stored_posts_before_period_start():
+    previous = {"keywords": [{"keyword": "sifere", "posts": [
+        _post("2", "2026-01-02T10:00:00"),
+        _post("1", "2025-12-31T23:00:00"),
+    ]}]}
+    data = {"period": {"from": "2026-01-01"}, "keywords": [{"keyword": "sifere", "posts": []}]}
+
+    main.merge_incremental(data, previous)
+
+    assert [p["id"] for p in data["keywords"][0]["posts"]] == ["2"]
+
+
+def test_merge_keeps_stored_posts_of_keyword_without_new_block():
+    previous = {"keywords": [
+        {"keyword": "comarb", "posts": [_post("1", "2026-02-01T10:00:00")]},
+        {"keyword": "sircar", "posts": [_post("2", "2026-02-02T10:00:00")]},
+    ]}
+    # Fallaron todas las cuentas antes de buscar "comarb": no hay bloque nuevo
+    data = {"period": {"from": "2026-01-01"}, "keywords": [
+        {"keyword": "sircar", "posts": [_post("3", "2026-02-03T10:00:00")]},
+    ]}
+
+    main.merge_incremental(data, previous)
+
+    assert [kw["keyword"] for kw in data["keywords"]] == ["comarb", "sircar"]
+    comarb = data["keywords"][0]
+    assert [p["id"] for p in comarb["posts"]] == ["1"]
+    assert comarb["total_found"] == 1
+    assert "error" in comarb
+    assert [p["id"] for p in data["keywords"][1]["posts"]] == ["3", "2"]
+
+
+def test_high_water_marks_use_latest_date_and_stored_ids():
+    previous = {"keywords": [
+        {"keyword": "sifere", "posts": [
+            _post(10, "2026-03-01T10:00:00"),
+            _post(12, "2026-03-05T08:00:00"),
+        ]},
+        {"keyword": "sircar", "posts": []},
+    ]}
+
+    marks = main._high_water_marks(previous)
+
+    assert marks == {"sifere": {"date": "2026-03-05T08:00:00", "ids": {"10", "12"}}}
+    assert main._is_known_tweet(12, marks["sifere"])
+    assert not main._is_known_tweet(11, marks["sifere"])
@@ -0,0 +1,50 @@
+"""
+Modo paralelo de model_registry con un pysentimiento de mentira: cada
+predicción devuelve cuántos textos recibió su llamada a `predict`.
+"""
+
+import sys
+
+import pytest
+
+import model_registry
+
+_FAKE_PYSENTIMIENTO = '''
+class _Output:
+    def __init__(self, output):
+        self.output = output
+        self.probas = {}
+
+
+class _Analyzer:
+    def predict(self, texts):
+        return [_Output(len(texts)) for _ in texts]
+
+
+def create_analyzer(task, lang):
+    return _Analyzer()
+'''
+
+
+@pytest.fixture
+def fake_models(tmp_path, monkeypatch):
+    pkg = tmp_path / "pysentimiento"
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text(_FAKE_PYSENTIMIENTO, encoding="utf-8")
+    # Los procesos del pool (spawn) heredan sys.path del proceso padre
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "pysentimiento", raising=False)
+    monkeypatch.setattr(model_registry, "_analyzers", {})
+    yield
+    model_registry._shutdown_pool()
+    monkeypatch.setattr(model_registry, "_pool", None)
+
+
+def test_classify_workers_env_does_not_nest_pools(fake_models, monkeypatch):
+    monkeypatch.setenv("CLASSIFY_WORKERS", "2")
+    texts = [f"tweet {i}" for i in range(64)]
+
+    preds = model_registry.predict("sentiment", texts)
+
+    # 2 workers × 4 shards: cada shard de 8 textos se predice entero en su proceso
+    assert [p.output for p in preds] == [8] * 64
@@ -0,0 +1,56 @@
+"""
+Reanudación desde el log crudo (raw_log.RawTweetLog) después de un corte.
+"""
+
+from raw_log import RawTweetLog
+
+
+def _crashed_log(path):
+    log = RawTweetLog(str(path), "2026-01-01", "2026-03-10")
+    log.append("sifere", {"id": "1", "text": "uno"})
+    log.mark_done("sifere")
+    log.append("sircar", {"id": "2", "text": "dos"})
+    log.close()
+    # El proceso murió a mitad de escribir el siguiente tweet
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"keyword": "sircar", "tweet": {"id": "3", "te')
+
+
+def test_replay_ignores_torn_last_line(tmp_path):
+    path = tmp_path / "raw_tweets.jsonl"
+    _crashed_log(path)
+
+    log = RawTweetLog(str(path), "2026-01-01", "2026-03-10")
+    assert log.resumed
+    assert log.ids() == {"1", "2"}
+    assert log.done == {"sifere"}
+    assert log.captured("sircar") == [{"id": "2", "text": "dos"}]
+
+    # Lo que se agrega después de reanudar queda en una línea propia
+    log.append("sircar", {"id": "3", "text": "tres"})
+    log.close()
+    replay = RawTweetLog(str(path), "2026-01-01", "2026-03-10")
+    assert [p["id"] for p in replay.captured("sircar")] == ["2", "3"]
+    replay.close()
+
+
+def test_resumes_when_new_period_covers_logged_one(tmp_path):
+    path = tmp_path / "raw_tweets.jsonl"
+    _crashed_log(path)
+
+    # Re-run después de medianoche: `until` avanzó un día
+    log = RawTweetLog(str(path), "2026-01-01", "2026-03-11")
+    assert log.ids() == {"1", "2"}
+    assert log.done == {"sifere"}
+    log.close()
+
+
+def test_discards_log_of_uncovered_period(tmp_path):
+    path = tmp_path / "raw_tweets.jsonl"
+    _crashed_log(path)
+
+    log = RawTweetLog(str(path), "2026-02-01", "2026-03-11")
+    assert not log.resumed
+    log.close()
+    with open(path, encoding="utf-8") as f:
+        assert f.read().count("\n") == 1  # solo el encabezado nuevo
@@ -0,0 +1,115 @@
+"""
+═══════════════════════════════════════════════════════════════
+  Normalización y tokenización compartida de tweets
+  Patrones compilados una vez y formas normalizadas cacheadas por post.
+═══════════════════════════════════════════════════════════════
+
+Cada texto se normaliza una sola vez por corrida y todo el pipeline usa
+esas mismas formas:
+
+    lower   texto en minúsculas (frases del léxico, sarcasmo)
+    words   lower.split() — tokens del clasificador por léxico, que
+            conservan la puntuación pegada ("malo," no es "malo")
+    terms   tokens de contenido para los n-gramas del reporte: sin urls,
+            menciones ni puntuación, hashtags como palabra, sin stopwords,
+            números ni palabras de ≤2 letras
+
+    tokens = get(post["text"], post.get("id"))
+    tokens.words, tokens.terms
+
+Las formas se calculan a demanda y quedan en un cache LRU por id de post
+(o por el texto mismo si no hay id), así clasificación y reporte no
+repiten el trabajo de regex sobre los mismos tweets.
+
+El preprocesamiento del modelo (pysentimiento.preprocess_tweet) queda
+aparte: es el que el modelo vio al entrenar y model_registry ya lo cachea.
+"""
+
+import re
+from collections import OrderedDict
+
+CACHE_SIZE = 50_000
+
+_URL_RE = re.compile(r"http\S+|www\.\S+")
+_MENTION_RE = re.compile(r"@\w+")
+_HASHTAG_RE = re.compile(r"#(\w+)")
+_PUNCT_RE = re.compile(r"[^\wáéíóúüñ\s]")
+
+# Stopwords castellano + ruido típico de Twitter (lista compacta, no exhaustiva)
+STOPWORDS = frozenset("""
+a al algo algun alguna algunas alguno algunos ante antes aquel aquella aquellas aquello aquellos aqui
+asi aun aunque cada como con contra cual cuales cuando cuanto cuantos da de del desde donde dos
+el ella ellas ello ellos en entre era eran eras eres es esa esas ese eso esos esta estaba estaban
+estado estamos estan estar estas este esto estos estoy fue fuera fueron ha habia haber habia
+habian han has hasta hay he hizo igual la las le les lo los mas me mi mis mucho muchos muy nada
+ni no nos nosotros nuestra nuestras nuestro nuestros o os otra otras otro otros para pero poco
+por porque que quien quienes se sea sean ser si sido siendo sin sobre solo son soy su sus tambien
+tanto te tener tengo ti tiene tienen toda todas todo todos tras tu tus un una unas uno unos usted
+ustedes va vamos van varios ver vos vosotros y ya yo eso ese esa esos esas mismo misma esta este
+estos estas hacer hace haces hago hizo hicieron lo la le les nos nuestro nuestra ya solo bien mal
+ahora aqui alli ahi cuando como porque cual quien donde mientras pues entonces tambien tampoco
+todavia siempre nunca jamas mientras quiza quizas tal vez asi luego despues antes hoy mañana ayer
+soy son fui fuiste fueron sere seras sera seremos seran sea seas seamos sean siendo sido le lo
+http https www com co rt via vi
+""".split())
+
+
+def content_terms(text_lower):
+    """Tokens de contenido (n-gramas del reporte) de un texto ya en minúsculas."""
+    t = _URL_RE.sub(" ", text_lower)          # urls
+    t = _MENTION_RE.sub(" ", t)               # menciones
+    t = _HASHTAG_RE.sub(r"\1", t)             # hashtags → palabra
+    t = _PUNCT_RE.sub(" ", t)                 # quitar puntuación
+    return tuple(w for w in t.split() if len(w) > 2 and not w.isdigit() and w not in STOPWORDS)
+
+
+class TextTokens:
+    """Formas normalizadas de un texto; cada una se calcula una sola vez."""
+
+    __slots__ = ("text", "_lower", "_words", "_terms")
+
+    def __init__(self, text):
+        self.text = text or ""
+        self._lower = None
+        self._words = None
+        self._terms = None
+
+    @property
+    def lower(self):
+        if self._lower is None:
+            self._lower = self.text.lower()
+        return self._lower
+
+    @property
+    def words(self):
+        if self._words is None:
+            self._words = tuple(self.lower.split())
+        return self._words
+
+    @property
+    def terms(self):
+        if self._terms is None:
+            self._terms = content_terms(self.lower) if self.text else ()
+        return self._terms
+
+
+_cache = OrderedDict()   # id de post (o texto) → TextTokens
+
+
+def get(text, post_id=None):
+    """TextTokens de `text`, cacheado por `post_id` (o por el texto si no hay id)."""
+    text = text or ""
+    key = text if post_id is None else ("id", str(post_id))
+    entry = _cache.get(key)
+    if entry is not None and entry.text == text:
+        _cache.move_to_end(key)
+        return entry
+    entry = TextTokens(text)
+    _cache[key] = entry
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return entry
+
+
+def clear_cache():
+    _cache.clear()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Almacenamiento columnar del dataset de tweets (Parquet / Arrow).
+
+Una fila por post, con las columnas tipadas: keyword, fecha, sentimiento,
+emoción, probabilidades y engagement. Lo que no es por post (generated_at,
+period y los bloques por keyword: resúmenes, emoji_stats, emociones) va en
+la metadata del archivo. Se convierte en las dos direcciones con el
+esquema de tweets_data.json sin perder nada.
+
+Las agregaciones (conteos diarios, top por likes) leen solo las columnas
+que necesitan, así un año de historia no se carga entero en memoria.
+
+Dependencia extra (opcional):
+    pip install pyarrow
+
+Uso:
+    python tweet_store.py --to-parquet tweets_data.json tweets_data.parquet
+    python tweet_store.py --to-json tweets_data.parquet tweets_data.json
+    python tweet_store.py --daily tweets_data.parquet
+
+En main.py, TWEETS_PARQUET=<ruta> guarda además el Parquet en cada corrida.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import os
+import sys
+from datetime import datetime
+from typing import Optional
+
+try:
+    sys.stdout.reconfigure(encoding="utf-8")
+except Exception:
+    pass
+
+_META_KEY = b"comarb:dataset"
+_SCHEMA_VERSION = 1
+
+# Campos que todo post tiene (se escriben siempre, aunque valgan None)
+_CORE_FIELDS = (
+    "id", "text", "user", "username", "date", "sentiment", "sentiment_score",
+    "emojis_found", "likes", "retweets", "replies", "url",
+)
+# Campos que agregan enrich_emotions / compare_classifiers (solo si están)
+_OPTIONAL_FIELDS = ("sentiment_confidence", "sentiment_rule", "emotion", "emotion_probas")
+
+
+def _require_pyarrow():
+    if importlib.util.find_spec("pyarrow") is None:
+        raise RuntimeError("El almacenamiento columnar requiere pyarrow: pip install pyarrow")
+
+
+def _schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("keyword", pa.dictionary(pa.int32(), pa.string())),
+        ("id", pa.string()),
+        ("text", pa.string()),
+        ("user", pa.string()),
+        ("username", pa.dictionary(pa.int32(), pa.string())),
+        ("date", pa.string()),                       # texto original (round-trip exacto)
+        ("created_at", pa.timestamp("s", tz="UTC")),  # misma fecha, tipada
+        ("sentiment", pa.dictionary(pa.int8(), pa.string())),
+        ("sentiment_score", pa.float64()),
+        ("sentiment_confidence", pa.float64()),
+        ("sentiment_rule", pa.dictionary(pa.int8(), pa.string())),
+        ("emotion", pa.dictionary(pa.int8(), pa.string())),
+        ("emotion_probas", pa.map_(pa.string(), pa.float64())),
+        ("emojis_found", pa.list_(pa.struct([
+            ("emoji", pa.string()), ("type", pa.string()), ("count", pa.int32()),
+        ]))),
+        ("likes", pa.int64()),
+        ("retweets", pa.int64()),
+        ("replies", pa.int64()),
+        ("url", pa.string()),
+        # Claves fuera del esquema (u opcionales en None), como JSON
+        ("extra", pa.string()),
+    ])
+
+
+def _parse_date(value) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(str(value))
+    except (TypeError, ValueError):
+        return None
+
+
+# ═══════════════════════════════════════════════════════════════
+#  CONVERSIÓN JSON ⇄ ARROW
+# ═══════════════════════════════════════════════════════════════
+
+def to_table(data: dict):
+    """Dataset con el esquema de tweets_data.json → pyarrow.Table (una fila por post)."""
+    _require_pyarrow()
+    import pyarrow as pa
+
+    cols = {name: [] for name in _schema().names}
+    blocks = []
+    for kw in data.get("keywords", []):
+        blocks.append({k: v for k, v in kw.items() if k != "posts"})
+        for post in kw.get("posts", []):
+            cols["keyword"].append(kw["keyword"])
+            for field in _CORE_FIELDS:
+                value = post.get(field)
+                if field == "id" and value is not None:
+                    value = str(value)
+                cols[field].append(value)
+            cols["created_at"].append(_parse_date(post.get("date")))
+            extra = {}
+            for field in _OPTIONAL_FIELDS:
+                value = post.get(field)
+                if value is None and field in post:
+                    extra[field] = None
+                if field == "emotion_probas" and value is not None:
+                    value = list(value.items())
+                cols[field].append(value)
+            for key, value in post.items():
+                if key not in _CORE_FIELDS and key not in _OPTIONAL_FIELDS:
+                    extra[key] = value
+                elif key == "id" and not isinstance(value, str):
+                    extra["id"] = value  # id no-string: se conserva el tipo original
+            cols["extra"].append(json.dumps(extra, ensure_ascii=False) if extra else None)
+
+    meta = {k: v for k, v in data.items() if k != "keywords"}
+    meta["keywords"] = blocks
+    meta["_version"] = _SCHEMA_VERSION
+    schema = _schema().with_metadata({_META_KEY: json.dumps(meta, ensure_ascii=False)})
+    return pa.Table.from_pydict(cols, schema=schema)
+
+
+def from_table(table) -> dict:
+    """pyarrow.Table (de to_table / read_parquet) → dataset con el esquema de tweets_data.json."""
+    meta = json.loads(table.schema.metadata[_META_KEY])
+    meta.pop("_version", None)
+    blocks = meta.pop("keywords")
+    data = dict(meta)
+
+    posts_by_kw = {block["keyword"]: [] for block in blocks}
+    for row in table.select([n for n in table.schema.names if n != "created_at"]).to_pylist():
+        post = {field: row[field] for field in _CORE_FIELDS}
+        for field in _OPTIONAL_FIELDS:
+            value = row[field]
+            if value is not None:
+                post[field] = dict(value) if field == "emotion_probas" else value
+        if row["extra"]:
+            post.update(json.loads(row["extra"]))
+        posts_by_kw[row["keyword"]].append(post)
+
+    data["keywords"] = []
+    for block in blocks:
+        kw = {"keyword": block["keyword"], "posts": posts_by_kw[block["keyword"]]}
+        kw.update((k, v) for k, v in block.items() if k != "keyword")
+        data["keywords"].append(kw)
+    return data
+
+
+def write_parquet(data: dict, path: str) -> None:
+    import pyarrow.parquet as pq
+
+    pq.write_table(to_table(data), path, compression="zstd")
+
+
+def read_parquet(path: str) -> dict:
+    _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    return from_table(pq.read_table(path))
+
+
+def load_dataset(path: str, since: Optional[str] = None, until: Optional[str] = None) -> dict:
+    """
+    Carga el dataset desde .parquet, .json o el almacén SQLite (.sqlite/.db)
+    según la extensión. `since`/`until` (YYYY-MM-DD) solo aplican al almacén.
+    """
+    if path.endswith((".sqlite", ".db")):
+        from tweet_warehouse import TweetWarehouse
+        return TweetWarehouse(path).load(since, until)
+    if since or until:
+        raise SystemExit("❌ --since/--until requieren el almacén SQLite (--data tweets.sqlite)")
+    if path.endswith(".parquet"):
+        return read_parquet(path)
+    from tweet_stream import load_json
+    return load_json(path)
+
+
+# ═══════════════════════════════════════════════════════════════
+#  AGREGACIONES (leen solo las columnas necesarias)
+# ═══════════════════════════════════════════════════════════════
+
+def daily_counts(path: str, keyword: Optional[str] = None) -> dict:
+    """{"YYYY-MM-DD": {"positivo": n, "negativo": n, "neutro": n}} en orden de fecha."""
+    _require_pyarrow()
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    filters = [("keyword", "=", keyword)] if keyword else None
+    table = pq.read_table(path, columns=["created_at", "sentiment"], filters=filters)
+    table = table.filter(pc.is_valid(table["created_at"]))
+    day = pc.strftime(table["created_at"], format="%Y-%m-%d")
+    grouped = (
+        table.set_column(0, "day", day)
+        .group_by(["day", "sentiment"])
+        .aggregate([([], "count_all")])
+        .to_pylist()
+    )
+    out = {}
+    for row in sorted(grouped, key=lambda r: r["day"]):
+        counts = out.setdefault(row["day"], {"positivo": 0, "negativo": 0, "neutro": 0})
+        if row["sentiment"] is not None:
+            counts[row["sentiment"]] = row["count_all"]
+    return out
+
+
+def top_liked(path: str, n: int = 10, keyword: Optional[str] = None) -> list[dict]:
+    """Los `n` posts con más likes (sin cargar el resto de las columnas)."""
+    _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    filters = [("keyword", "=", keyword)] if keyword else None
+    table = pq.read_table(
+        path,
+        columns=["keyword", "id", "username", "text", "likes", "retweets", "url"],
+        filters=filters,
+    )
+    return table.sort_by([("likes", "descending")]).slice(0, n).to_pylist()
+
+
+def main():
+    p = argparse.ArgumentParser(description="Dataset de tweets en Parquet")
+    p.add_argument("--to-parquet", nargs=2, metavar=("JSON", "PARQUET"))
+    p.add_argument("--to-json", nargs=2, metavar=("PARQUET", "JSON"))
+    p.add_argument("--daily", metavar="PARQUET", help="Conteos diarios por sentimiento")
+    p.add_argument("--top", metavar="PARQUET", help="Top 10 por likes")
+    args = p.parse_args()
+
+    if args.to_parquet:
+        src, dst = args.to_parquet
+        if not os.path.exists(src):
+            raise SystemExit(f"❌ No existe: {src}")
+        data = load_dataset(src)
+        write_parquet(data, dst)
+        print(f"✅ {dst}: {os.path.getsize(dst) / 1024:.1f} KB (JSON: {os.path.getsize(src) / 1024:.1f} KB)")
+        return
+
+    if args.to_json:
+        src, dst = args.to_json
+        if not os.path.exists(src):
+            raise SystemExit(f"❌ No existe: {src}")
+        with open(dst, "w", encoding="utf-8") as f:
+            json.dump(read_parquet(src), f, ensure_ascii=False, indent=2)
+        print(f"✅ {dst}")
+        return
+
+    if args.daily:
+        for day, c in daily_counts(args.daily).items():
+            print(f"   {day}  😊 {c['positivo']:>4}  😠 {c['negativo']:>4}  😐 {c['neutro']:>4}")
+        return
+
+    if args.top:
+        for post in top_liked(args.top):
+            print(f"   ❤️ {post['likes']:>5}  @{post['username']}: {(post['text'] or '')[:80]}")
+        return
+
+    p.print_help()
+
+
+if __name__ == "__main__":
+    main()
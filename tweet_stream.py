@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Lectura y escritura en streaming del dataset de tweets (tweets_data.json).
+
+`json.load` arma el documento entero en memoria (y antes lee el archivo
+entero como texto). Acá el JSON se recorre de a un post por vez, así las
+herramientas que procesan el archivo (compare_classifiers,
+enrich_emotions) usan memoria constante sin importar el tamaño del
+archivo.
+
+Lectura — iter_dataset(path) genera eventos en el orden del archivo:
+    ("meta", clave, valor)       campo de primer nivel (generated_at, period, ...)
+    ("post", keyword, post)      un post
+    ("keyword", bloque)          fin de una keyword: sus campos sin "posts"
+
+    for kw, post in iter_posts("tweets_data.json"): ...
+
+Escritura — DatasetWriter escribe lo mismo que json.dump(..., indent=2)
+a medida que llegan los posts:
+    with DatasetWriter("salida.json") as w:
+        w.meta("generated_at", ...)
+        w.post("sifere", post)
+        w.keyword_done({"keyword": "sifere", "sentiment_summary": {...}})
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Iterator, Optional
+
+_CHUNK = 1 << 16
+_WS = re.compile(r"\s*")
+_decoder = json.JSONDecoder()
+
+
+class _Scanner:
+    """Lee un archivo JSON de a pedazos y decodifica valores completos con raw_decode."""
+
+    def __init__(self, f):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> None:
+        data = self.f.read(_CHUNK)
+        if not data:
+            self.eof = True
+            return
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+
+    def peek(self) -> str:
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof:
+                raise ValueError("JSON incompleto: fin de archivo inesperado")
+            self._fill()
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"JSON inválido: se esperaba {char!r} en {self.buf[self.pos:self.pos + 40]!r}")
+        self.pos += 1
+
+    def accept(self, char: str) -> bool:
+        if self.peek() == char:
+            self.pos += 1
+            return True
+        return False
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self._fill()
+                continue
+            # Un número al final del buffer puede seguir en el próximo pedazo
+            if end == len(self.buf) and not self.eof:
+                self._fill()
+                continue
+            self.pos = end
+            return value
+
+    def members(self) -> Iterator[str]:
+        """Claves de un objeto (después de cada una, el llamador consume el valor)."""
+        self.expect("{")
+        if self.accept("}"):
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.accept("}"):
+                return
+            self.expect(",")
+
+    def items(self) -> Iterator[None]:
+        """Elementos de un array (el llamador consume cada uno)."""
+        self.expect("[")
+        if self.accept("]"):
+            return
+        while True:
+            yield None
+            if self.accept("]"):
+                return
+            self.expect(",")
+
+
+def _iter_json(path: str) -> Iterator[tuple]:
+    with open(path, "r", encoding="utf-8") as f:
+        sc = _Scanner(f)
+        for key in sc.members():
+            if key != "keywords":
+                yield ("meta", key, sc.value())
+                continue
+            for _ in sc.items():
+                block = {}
+                pending = []  # posts que aparecen antes que la clave "keyword"
+                for kw_key in sc.members():
+                    if kw_key != "posts":
+                        block[kw_key] = sc.value()
+                        continue
+                    for _ in sc.items():
+                        post = sc.value()
+                        if "keyword" in block:
+                            yield ("post", block["keyword"], post)
+                        else:
+                            pending.append(post)
+                for post in pending:
+                    yield ("post", block.get("keyword"), post)
+                yield ("keyword", block)
+
+
+def _iter_data(data: dict) -> Iterator[tuple]:
+    for key, value in data.items():
+        if key == "keywords":
+            continue
+        yield ("meta", key, value)
+    for kw in data.get("keywords", []):
+        for post in kw.get("posts", []):
+            yield ("post", kw["keyword"], post)
+        yield ("keyword", {k: v for k, v in kw.items() if k != "posts"})
+
+
+def iter_dataset(path: str, since: Optional[str] = None, until: Optional[str] = None) -> Iterator[tuple]:
+    """
+    Eventos ("meta" / "post" / "keyword") del dataset en `path`. Los .json se
+    leen en streaming; Parquet y el almacén SQLite se cargan con
+    tweet_store.load_dataset (que ya es columnar / por rango).
+    """
+    if path.endswith((".sqlite", ".db", ".parquet")) or since or until:
+        from tweet_store import load_dataset
+        yield from _iter_data(load_dataset(path, since, until))
+    else:
+        yield from _iter_json(path)
+
+
+def iter_posts(path: str) -> Iterator[tuple]:
+    """(keyword, post) de a uno."""
+    for event in iter_dataset(path):
+        if event[0] == "post":
+            yield event[1], event[2]
+
+
+def load_json(path: str) -> dict:
+    """Como json.load, pero sin tener el texto del archivo entero en memoria a la vez."""
+    data = {}
+    posts = []
+    keywords = []
+    for event in _iter_json(path):
+        if event[0] == "meta":
+            data[event[1]] = event[2]
+        elif event[0] == "post":
+            posts.append(event[2])
+        else:
+            block = dict(event[1])
+            keywords.append({"keyword": block.pop("keyword", None), "posts": posts, **block})
+            posts = []
+    data["keywords"] = keywords
+    return data
+
+
+def _dumps(value, depth: int) -> str:
+    text = json.dumps(value, ensure_ascii=False, indent=2)
+    return text.replace("\n", "\n" + "  " * depth) if depth else text
+
+
+class DatasetWriter:
+    """
+    Escribe un dataset con el formato de json.dump(data, indent=2,
+    ensure_ascii=False) a medida que se le pasan los campos y los posts.
+    Las claves de cada keyword quedan: "keyword", "posts", y después el
+    resto del bloque que se pase a keyword_done().
+    """
+
+    def __init__(self, path: str):
+        self.f = open(path, "w", encoding="utf-8")
+        self.f.write("{")
+        self._top = 0              # campos escritos en el primer nivel
+        self._in_keywords = False
+        self._keywords_written = False
+        self._blocks = 0           # bloques de keyword escritos
+        self._keyword = None       # keyword con el bloque abierto
+        self._posts = 0            # posts escritos en el bloque abierto
+
+    def _top_field(self, key: str) -> None:
+        self.f.write(("," if self._top else "") + "\n  " + json.dumps(key, ensure_ascii=False) + ": ")
+        self._top += 1
+
+    def _close_keywords(self) -> None:
+        if self._in_keywords:
+            self.f.write("\n  ]" if self._blocks else "]")
+            self._in_keywords = False
+
+    def meta(self, key: str, value) -> None:
+        self._close_keywords()
+        self._top_field(key)
+        self.f.write(_dumps(value, 1))
+
+    def _open_keywords(self) -> None:
+        if not self._in_keywords:
+            self._top_field("keywords")
+            self.f.write("[")
+            self._in_keywords = True
+            self._keywords_written = True
+
+    def _open_block(self, keyword) -> None:
+        self._open_keywords()
+        self.f.write(("," if self._blocks else "") + "\n    {\n      \"keyword\": "
+                     + json.dumps(keyword, ensure_ascii=False) + ",\n      \"posts\": [")
+        self._blocks += 1
+        self._keyword = keyword
+        self._posts = 0
+
+    def post(self, keyword, post: dict) -> None:
+        if self._keyword != keyword or not self._in_keywords:
+            if self._keyword is not None:
+                raise ValueError(f"keyword_done() pendiente para {self._keyword!r}")
+            self._open_block(keyword)
+        self.f.write(("," if self._posts else "") + "\n        " + _dumps(post, 4))
+        self._posts += 1
+
+    def keyword_done(self, block: dict) -> None:
+        if self._keyword is None:
+            self._open_block(block.get("keyword"))
+        self.f.write("\n      ]" if self._posts else "]")
+        for key, value in block.items():
+            if key in ("keyword", "posts"):
+                continue
+            self.f.write(",\n      " + json.dumps(key, ensure_ascii=False) + ": " + _dumps(value, 3))
+        self.f.write("\n    }")
+        self._keyword = None
+
+    def close(self) -> None:
+        if self.f.closed:
+            return
+        if self._keyword is not None:
+            self.keyword_done({"keyword": self._keyword})
+        if not self._keywords_written:
+            self._open_keywords()  # "keywords" siempre presente, aunque esté vacío
+        self._close_keywords()
+        self.f.write("\n}" if self._top else "}")
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
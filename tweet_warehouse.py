@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Almacén histórico de tweets (SQLite).
+
+Cada corrida pisa tweets_data.json; el almacén en cambio acumula: hace
+upsert de cada post por (id, keyword) (actualiza engagement y la última
+clasificación) y guarda la clasificación de cada corrida por separado.
+Un tweet que aparece en dos keywords queda en las dos, como en el JSON.
+Así se pueden tener años de tweets y armar el reporte de un rango de
+fechas leyendo solo esas filas.
+
+Tablas:
+    posts            → un registro por tweet y keyword (última versión)
+    runs             → una fila por corrida ingerida
+    classifications  → (run_id, tweet_id) → sentimiento / emoción de esa corrida
+
+Índices: posts(keyword, date), posts(username), posts(sentiment).
+
+Configuración:
+    TWEETS_DB=<ruta>   main.py ingiere cada corrida en ese archivo (default: desactivado)
+
+Uso:
+    python tweet_warehouse.py --ingest tweets_data.json
+    python tweet_warehouse.py --export rango.json --since 2025-01-01 --until 2025-03-31
+    python tweet_warehouse.py --stats
+    python render_from_cache.py --data tweets.sqlite --since 2025-01-01
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+try:
+    sys.stdout.reconfigure(encoding="utf-8")
+except Exception:
+    pass
+
+DEFAULT_PATH = "tweets.sqlite"
+
+# Columnas propias de posts; cualquier otra clave del post va a `extra` (JSON)
+_POST_COLUMNS = (
+    "id", "keyword", "text", "user", "username", "date",
+    "sentiment", "sentiment_score", "emotion", "emotion_probas",
+    "emojis_found", "likes", "retweets", "replies", "url",
+)
+_JSON_COLUMNS = ("emotion_probas", "emojis_found")
+# Campos de un post que no son columnas de posts pero no van a `extra`
+_NOT_EXTRA = set(_POST_COLUMNS) | {"sentiment_confidence", "sentiment_rule"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id       INTEGER PRIMARY KEY AUTOINCREMENT,
+    generated_at TEXT,
+    period_from  TEXT,
+    period_to    TEXT,
+    keywords     TEXT,
+    ingested_at  TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS posts (
+    id              TEXT NOT NULL,
+    keyword         TEXT NOT NULL,
+    text            TEXT,
+    user            TEXT,
+    username        TEXT,
+    date            TEXT,
+    sentiment       TEXT,
+    sentiment_score REAL,
+    emotion         TEXT,
+    emotion_probas  TEXT,
+    emojis_found    TEXT,
+    likes           INTEGER,
+    retweets        INTEGER,
+    replies         INTEGER,
+    url             TEXT,
+    extra           TEXT,
+    first_run       INTEGER REFERENCES runs(run_id),
+    last_run        INTEGER REFERENCES runs(run_id),
+    PRIMARY KEY (id, keyword)
+);
+CREATE TABLE IF NOT EXISTS classifications (
+    run_id               INTEGER NOT NULL REFERENCES runs(run_id),
+    tweet_id             TEXT NOT NULL,
+    sentiment            TEXT,
+    sentiment_score      REAL,
+    sentiment_confidence REAL,
+    sentiment_rule       TEXT,
+    emotion              TEXT,
+    emotion_probas       TEXT,
+    PRIMARY KEY (run_id, tweet_id)
+);
+CREATE INDEX IF NOT EXISTS idx_posts_keyword_date ON posts(keyword, date);
+CREATE INDEX IF NOT EXISTS idx_posts_username ON posts(username);
+CREATE INDEX IF NOT EXISTS idx_posts_sentiment ON posts(sentiment);
+CREATE INDEX IF NOT EXISTS idx_classifications_tweet ON classifications(tweet_id);
+"""
+
+_UPSERT = f"""
+INSERT INTO posts ({", ".join(_POST_COLUMNS)}, extra, first_run, last_run)
+VALUES ({", ".join("?" * (len(_POST_COLUMNS) + 3))})
+ON CONFLICT(id, keyword) DO UPDATE SET
+    text = excluded.text,
+    user = excluded.user,
+    username = excluded.username,
+    date = excluded.date,
+    sentiment = COALESCE(excluded.sentiment, posts.sentiment),
+    sentiment_score = COALESCE(excluded.sentiment_score, posts.sentiment_score),
+    emotion = COALESCE(excluded.emotion, posts.emotion),
+    emotion_probas = COALESCE(excluded.emotion_probas, posts.emotion_probas),
+    emojis_found = excluded.emojis_found,
+    likes = excluded.likes,
+    retweets = excluded.retweets,
+    replies = excluded.replies,
+    url = excluded.url,
+    extra = excluded.extra,
+    last_run = excluded.last_run
+"""
+
+
+def _day_after(day: str) -> str:
+    return (date.fromisoformat(day) + timedelta(days=1)).isoformat()
+
+
+class TweetWarehouse:
+    """Almacén SQLite de posts + clasificaciones por corrida."""
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    # ── Escritura ──
+
+    def ingest(self, data: dict) -> int:
+        """Upsert de todos los posts de `data` (formato tweets_data.json). Devuelve el run_id."""
+        period = data.get("period") or {}
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO runs (generated_at, period_from, period_to, keywords, ingested_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    data.get("generated_at"), period.get("from"), period.get("to"),
+                    json.dumps([kw["keyword"] for kw in data.get("keywords", [])]),
+                    datetime.now().isoformat(),
+                ),
+            )
+            run_id = cur.lastrowid
+
+            post_rows = []
+            class_rows = []
+            for kw in data.get("keywords", []):
+                for post in kw.get("posts", []):
+                    tweet_id = str(post["id"])
+                    row = {col: post.get(col) for col in _POST_COLUMNS}
+                    row["id"] = tweet_id
+                    row["keyword"] = kw["keyword"]
+                    for col in _JSON_COLUMNS:
+                        if row[col] is not None:
+                            row[col] = json.dumps(row[col], ensure_ascii=False)
+                    extra = {k: v for k, v in post.items() if k not in _NOT_EXTRA}
+                    post_rows.append((
+                        *row.values(),
+                        json.dumps(extra, ensure_ascii=False) if extra else None,
+                        run_id, run_id,
+                    ))
+                    class_rows.append((
+                        run_id, tweet_id, post.get("sentiment"), post.get("sentiment_score"),
+                        post.get("sentiment_confidence"), post.get("sentiment_rule"),
+                        post.get("emotion"), row["emotion_probas"],
+                    ))
+
+            self._conn.executemany(_UPSERT, post_rows)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO classifications VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                class_rows,
+            )
+            self._conn.commit()
+        return run_id
+
+    # ── Lectura ──
+
+    def _where(self, since: Optional[str], until: Optional[str], keyword: Optional[str] = None):
+        clauses, params = [], []
+        if keyword is not None:
+            clauses.append("keyword = ?")
+            params.append(keyword)
+        if since:
+            clauses.append("date >= ?")
+            params.append(since)
+        if until:
+            clauses.append("date < ?")
+            params.append(_day_after(until))  # until es inclusivo (día completo)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _keyword_order(self) -> list[str]:
+        """Keywords en el orden de la última corrida; después las que ya no se buscan."""
+        last = self._conn.execute("SELECT keywords FROM runs ORDER BY run_id DESC LIMIT 1").fetchone()
+        order = json.loads(last["keywords"]) if last and last["keywords"] else []
+        others = [r[0] for r in self._conn.execute("SELECT DISTINCT keyword FROM posts ORDER BY keyword")]
+        return order + [kw for kw in others if kw not in order]
+
+    def load(self, since: Optional[str] = None, until: Optional[str] = None,
+             keywords: Optional[list] = None) -> dict:
+        """
+        Dataset con el esquema de tweets_data.json para los tweets entre
+        `since` y `until` (YYYY-MM-DD, inclusivos). Los resúmenes por keyword
+        se recalculan sobre ese rango.
+        """
+        with self._lock:
+            runs = self._conn.execute(
+                "SELECT MAX(generated_at) AS generated_at, MIN(period_from) AS period_from, "
+                "MAX(period_to) AS period_to FROM runs"
+            ).fetchone()
+            data = {
+                "generated_at": runs["generated_at"],
+                "period": {"from": since or runs["period_from"], "to": until or runs["period_to"]},
+                "keywords": [],
+            }
+            for keyword in keywords or self._keyword_order():
+                where, params = self._where(since, until, keyword)
+                # Confianza y regla salen de la última clasificación del tweet
+                rows = self._conn.execute(
+                    "SELECT p.*, c.sentiment_confidence, c.sentiment_rule FROM posts p "
+                    "LEFT JOIN classifications c ON c.tweet_id = p.id AND c.run_id = "
+                    "(SELECT MAX(run_id) FROM classifications WHERE tweet_id = p.id)"
+                    f"{where} ORDER BY date DESC, id DESC", params
+                ).fetchall()
+                summary = {"positivo": 0, "negativo": 0, "neutro": 0}
+                for sentiment, n in self._conn.execute(
+                    f"SELECT sentiment, COUNT(*) FROM posts{where} GROUP BY sentiment", params
+                ):
+                    if sentiment in summary:
+                        summary[sentiment] = n
+                posts = [self._row_to_post(row) for row in rows]
+                data["keywords"].append({
+                    "keyword": keyword,
+                    "posts": posts,
+                    "sentiment_summary": summary,
+                    "emoji_stats": _emoji_stats(posts),
+                    "total_found": len(posts),
+                })
+
+        if any("emotion" in post for kw in data["keywords"] for post in kw["posts"]):
+            from enrich_emotions import summarize_emotions
+            summarize_emotions(data)
+        return data
+
+    @staticmethod
+    def _row_to_post(row) -> dict:
+        post = {
+            "id": row["id"],
+            "text": row["text"],
+            "user": row["user"],
+            "username": row["username"],
+            "date": row["date"],
+            "sentiment": row["sentiment"],
+            "sentiment_score": row["sentiment_score"],
+            "emojis_found": json.loads(row["emojis_found"]) if row["emojis_found"] else [],
+            "likes": row["likes"],
+            "retweets": row["retweets"],
+            "replies": row["replies"],
+            "url": row["url"],
+        }
+        if row["sentiment_confidence"] is not None:
+            post["sentiment_confidence"] = row["sentiment_confidence"]
+            post["sentiment_rule"] = row["sentiment_rule"]
+        if row["emotion"] is not None:
+            post["emotion"] = row["emotion"]
+            post["emotion_probas"] = json.loads(row["emotion_probas"]) if row["emotion_probas"] else {}
+        if row["extra"]:
+            post.update(json.loads(row["extra"]))
+        return post
+
+    def history(self, tweet_id) -> list[dict]:
+        """Clasificaciones de un tweet en cada corrida, de la más vieja a la más nueva."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT c.*, r.generated_at FROM classifications c JOIN runs r USING (run_id) "
+                "WHERE c.tweet_id = ? ORDER BY c.run_id",
+                (str(tweet_id),),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def stats(self) -> dict:
+        with self._lock:
+            one = lambda sql: self._conn.execute(sql).fetchone()[0]  # noqa: E731
+            return {
+                "runs": one("SELECT COUNT(*) FROM runs"),
+                "posts": one("SELECT COUNT(DISTINCT id) FROM posts"),
+                "classifications": one("SELECT COUNT(*) FROM classifications"),
+                "first_date": one("SELECT MIN(date) FROM posts"),
+                "last_date": one("SELECT MAX(date) FROM posts"),
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _emoji_stats(posts: list[dict]) -> dict:
+    """Mismo cálculo que main._summarize_keyword (totales por tipo + top 10)."""
+    stats = {"total_positive_emojis": 0, "total_negative_emojis": 0, "top_emojis": {}}
+    counter = {}
+    for post in posts:
+        for ed in post.get("emojis_found", []):
+            counter[ed["emoji"]] = counter.get(ed["emoji"], 0) + ed["count"]
+            if ed["type"] == "positivo":
+                stats["total_positive_emojis"] += ed["count"]
+            else:
+                stats["total_negative_emojis"] += ed["count"]
+    stats["top_emojis"] = dict(sorted(counter.items(), key=lambda x: x[1], reverse=True)[:10])
+    return stats
+
+
+def main():
+    p = argparse.ArgumentParser(description="Almacén histórico de tweets (SQLite)")
+    p.add_argument("--db", default=os.environ.get("TWEETS_DB") or DEFAULT_PATH)
+    p.add_argument("--ingest", metavar="JSON", help="Ingerir un tweets_data.json")
+    p.add_argument("--export", metavar="JSON", help="Exportar un rango a JSON")
+    p.add_argument("--since", help="Desde (YYYY-MM-DD, inclusivo)")
+    p.add_argument("--until", help="Hasta (YYYY-MM-DD, inclusivo)")
+    p.add_argument("--stats", action="store_true")
+    args = p.parse_args()
+
+    wh = TweetWarehouse(args.db)
+
+    if args.ingest:
+        if not os.path.exists(args.ingest):
+            raise SystemExit(f"❌ No existe: {args.ingest}")
+        with open(args.ingest, "r", encoding="utf-8") as f:
+            run_id = wh.ingest(json.load(f))
+        print(f"✅ Corrida #{run_id} ingerida en {args.db}")
+
+    if args.export:
+        data = wh.load(args.since, args.until)
+        with open(args.export, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        n = sum(kw["total_found"] for kw in data["keywords"])
+        print(f"✅ {n} tweets exportados a {args.export}")
+
+    if args.stats or not (args.ingest or args.export):
+        s = wh.stats()
+        print(f"📦 {args.db}: {s['posts']} tweets, {s['runs']} corridas, {s['classifications']} clasificaciones")
+        if s["first_date"]:
+            print(f"   Desde {s['first_date']} hasta {s['last_date']}")
+
+
+if __name__ == "__main__":
+    main()